@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.about_us import AboutUs
 from app.schemas.about_us import AboutUsResponse
 
@@ -8,9 +9,9 @@ router = APIRouter(prefix="/api/about", tags=["about"])
 
 
 @router.get("", response_model=AboutUsResponse)
-def get_about_us(db: Session = Depends(get_db)):
+async def get_about_us(db: AsyncSession = Depends(get_async_db)):
     """獲取關於我們內容"""
-    about = db.query(AboutUs).first()
+    about = (await db.execute(select(AboutUs).limit(1))).scalars().first()
     
     if not about:
         raise HTTPException(
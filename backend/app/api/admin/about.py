@@ -8,6 +8,7 @@ from app.schemas.admin import (
     AboutUsCreateAdmin, AboutUsUpdateAdmin, AboutUsResponseAdmin
 )
 from app.dependencies import get_current_admin
+from app.core.content_version import ABOUT, bump_content_versions
 
 router = APIRouter()
 
@@ -47,6 +48,7 @@ def create_about_us(
         )
         db.add(about)
     db.commit()
+    bump_content_versions(ABOUT)
     db.refresh(about)
     return AboutUsResponseAdmin.model_validate(about)
 
@@ -70,6 +72,7 @@ def update_about_us(
         about.image = about_data.image
     
     db.commit()
+    bump_content_versions(ABOUT)
     db.refresh(about)
     return AboutUsResponseAdmin.model_validate(about)
 
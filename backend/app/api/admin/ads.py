@@ -7,9 +7,11 @@ from app.database import get_db
 from app.models.user import User
 from app.models.ad import Ad
 from app.schemas.admin import (
-    AdCreate, AdUpdate, AdResponseAdmin, AdListResponseAdmin
+    AdCreate, AdUpdate, AdResponseAdmin, AdListResponseAdmin, AdReorder
 )
 from app.dependencies import get_current_admin
+from app.core.content_version import ADS, bump_content_versions
+from app.services.reorder import bulk_reorder, ReorderError
 
 router = APIRouter()
 
@@ -66,6 +68,7 @@ def create_banner(
     )
     db.add(new_banner)
     db.commit()
+    bump_content_versions(ADS)
     db.refresh(new_banner)
     
     return AdResponseAdmin.model_validate(new_banner)
@@ -87,6 +90,27 @@ def get_banner(
     return AdResponseAdmin.model_validate(banner)
 
 
+@router.put("/banners/reorder")
+def reorder_banners(
+    reorder_data: AdReorder,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """批次排序 Banner（依列表順序寫入 order_index，必須在 /banners/{banner_id} 之前註冊）"""
+    try:
+        bulk_reorder(db, Ad, Ad.order_index, reorder_data.banner_ids)
+    except ReorderError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.detail
+        )
+    
+    db.commit()
+    bump_content_versions(ADS)
+    return {"message": "Banner 排序已更新"}
+
+
 @router.put("/banners/{banner_id}", response_model=AdResponseAdmin)
 def update_banner(
     banner_id: int,
@@ -115,6 +139,7 @@ def update_banner(
         banner.is_active = banner_data.is_active
     
     db.commit()
+    bump_content_versions(ADS)
     db.refresh(banner)
     
     return AdResponseAdmin.model_validate(banner)
@@ -136,6 +161,7 @@ def delete_banner(
     
     db.delete(banner)
     db.commit()
+    bump_content_versions(ADS)
     return None
 
 
@@ -155,6 +181,7 @@ def toggle_banner_status(
     
     banner.is_active = not banner.is_active
     db.commit()
+    bump_content_versions(ADS)
     db.refresh(banner)
     
     return AdResponseAdmin.model_validate(banner)
@@ -8,9 +8,15 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.product_category import ProductCategory
 from app.schemas.admin import (
-    CategoryCreateAdmin, CategoryUpdateAdmin, CategoryResponseAdmin, CategoryListResponseAdmin
+    CategoryCreateAdmin, CategoryUpdateAdmin, CategoryResponseAdmin, CategoryListResponseAdmin,
+    CategoryReorderAdmin
 )
 from app.dependencies import get_current_admin
+from app.core.cache import invalidate_catalog_cache
+from app.core.content_version import CATEGORIES, bump_content_versions
+from app.services.reorder import apply_order, check_unique_ids, ReorderError
+from app.services.suggest import suggest_index
+from app.services.category_tree import move_category, invalidate_category_tree, CategoryTreeError
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -86,6 +92,9 @@ def create_category(
         db.add(new_category)
         db.commit()
         db.refresh(new_category)
+        invalidate_category_tree()
+        bump_content_versions(CATEGORIES)
+        suggest_index.set_category(new_category)
         return CategoryResponseAdmin.model_validate(new_category)
     except HTTPException:
         raise
@@ -133,6 +142,46 @@ def get_category(
         )
 
 
+@router.put("/categories/reorder")
+def reorder_categories(
+    reorder_data: CategoryReorderAdmin,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """批次排序同一父分類下的分類（依列表順序寫入 sort_order，必須在 /categories/{category_id} 之前註冊）"""
+    try:
+        category_ids = reorder_data.category_ids
+        check_unique_ids(category_ids)
+        
+        # 一次查詢驗證分類存在且屬於同一父分類
+        rows = db.query(ProductCategory.id, ProductCategory.parent_id).filter(
+            ProductCategory.id.in_(category_ids)
+        ).all()
+        found = {row.id for row in rows}
+        missing = [category_id for category_id in category_ids if category_id not in found]
+        if missing:
+            raise ReorderError(f"Invalid ids: {', '.join(map(str, missing))}")
+        if len({row.parent_id for row in rows}) > 1:
+            raise ReorderError("Categories must share the same parent")
+        
+        apply_order(db, ProductCategory, ProductCategory.sort_order, category_ids)
+        db.commit()
+        invalidate_catalog_cache()
+        invalidate_category_tree()
+        bump_content_versions(CATEGORIES)
+        return {"message": "分类排序已更新"}
+    except ReorderError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
+    except SQLAlchemyError as e:
+        logger.error(f"数据库操作错误: {e}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="更新分类排序失败"
+        )
+
+
 @router.put("/categories/{category_id}", response_model=CategoryResponseAdmin)
 def update_category(
     category_id: int,
@@ -157,7 +206,8 @@ def update_category(
                 if not parent:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parent category not found")
                 category.image = None  # 子分類不能有 image
-            category.parent_id = parent_id_value
+            # 同時改寫整個子樹的物化路徑（不能移動到自己的子樹下）
+            move_category(db, category, parent_id_value)
         if category_data.image is not None:
             # 只有根分類（parent_id 為 None）可以有 image
             if category.parent_id is None:
@@ -169,9 +219,17 @@ def update_category(
         
         db.commit()
         db.refresh(category)
+        # 分類名稱會出現在產品列表的 category_name 中
+        invalidate_catalog_cache()
+        invalidate_category_tree()
+        bump_content_versions(CATEGORIES)
+        suggest_index.set_category(category)
         return CategoryResponseAdmin.model_validate(category)
     except HTTPException:
         raise
+    except CategoryTreeError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.detail)
     except SQLAlchemyError as e:
         logger.error(f"数据库操作错误: {e}", exc_info=True)
         db.rollback()
@@ -212,6 +270,10 @@ def delete_category(
         
         db.delete(category)
         db.commit()
+        invalidate_catalog_cache()
+        invalidate_category_tree()
+        bump_content_versions(CATEGORIES)
+        suggest_index.remove_category(category_id)
         return None
     except HTTPException:
         raise
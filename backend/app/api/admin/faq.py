@@ -8,6 +8,7 @@ from app.schemas.admin import (
     FAQCreateAdmin, FAQUpdateAdmin, FAQResponseAdmin, FAQListResponseAdmin
 )
 from app.dependencies import get_current_admin
+from app.core.content_version import FAQS, bump_content_versions
 
 router = APIRouter()
 
@@ -39,6 +40,7 @@ def create_faq(
     )
     db.add(new_faq)
     db.commit()
+    bump_content_versions(FAQS)
     db.refresh(new_faq)
     return FAQResponseAdmin.model_validate(new_faq)
 
@@ -76,6 +78,7 @@ def update_faq(
         faq.order_index = faq_data.order_index
     
     db.commit()
+    bump_content_versions(FAQS)
     db.refresh(faq)
     return FAQResponseAdmin.model_validate(faq)
 
@@ -92,5 +95,6 @@ def delete_faq(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="FAQ not found")
     db.delete(faq)
     db.commit()
+    bump_content_versions(FAQS)
     return None
 
@@ -11,6 +11,7 @@ from app.schemas.admin import (
     NewsCreateAdmin, NewsUpdateAdmin, NewsResponseAdmin, NewsListResponseAdmin
 )
 from app.dependencies import get_current_admin
+from app.core.content_version import NEWS, bump_content_versions
 
 router = APIRouter()
 
@@ -73,6 +74,7 @@ def create_news(
     )
     db.add(new_news)
     db.commit()
+    bump_content_versions(NEWS)
     db.refresh(new_news)
     news_dict = {
         "id": new_news.id,
@@ -132,6 +134,7 @@ def update_news(
         news_item.date = dt.strptime(news_data.date, "%Y-%m-%d").date()
     
     db.commit()
+    bump_content_versions(NEWS)
     db.refresh(news_item)
     news_dict = {
         "id": news_item.id,
@@ -157,5 +160,6 @@ def delete_news(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="News not found")
     db.delete(news_item)
     db.commit()
+    bump_content_versions(NEWS)
     return None
 
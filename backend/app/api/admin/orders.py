@@ -10,6 +10,7 @@ from app.schemas.admin import (
     OrderResponseAdmin, OrderListResponseAdmin, OrderStatusUpdate
 )
 from app.dependencies import get_current_admin
+from app.core.pagination import apply_keyset, split_keyset_page, count_total
 
 router = APIRouter()
 
@@ -19,29 +20,44 @@ def get_orders(
     status_filter: Optional[str] = Query(None, description="狀態篩選"),
     page: int = Query(1, ge=1, description="頁碼"),
     page_size: int = Query(10, ge=1, le=100, description="每頁筆數"),
+    cursor: Optional[str] = Query(None, description="游標分頁（使用上一頁的 next_cursor，設定後忽略 page）"),
+    estimate_total: bool = Query(False, description="使用預估總數（避免大表 COUNT）"),
+    include_total: bool = Query(False, description="游標分頁時同時返回 total / total_pages（執行 COUNT）"),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """獲取訂單列表"""
     query = db.query(Order)
+    filtered = False
     
     if status_filter:
         try:
             status_enum = OrderStatus(status_filter)
             query = query.filter(Order.status == status_enum)
+            filtered = True
         except ValueError:
             pass
     
-    total = query.count()
-    total_pages = ceil(total / page_size) if total > 0 else 0
-    orders = query.order_by(Order.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    # 游標模式預設不計算總數，每一頁的成本與頁數深度無關
+    total = total_pages = None
+    if cursor is None or include_total:
+        total = count_total(db, query, Order, estimate=estimate_total, filtered=filtered)
+        total_pages = ceil(total / page_size) if total > 0 else 0
+    
+    next_cursor = None
+    if cursor is not None:
+        rows = apply_keyset(query, Order, cursor).limit(page_size + 1).all()
+        orders, next_cursor = split_keyset_page(rows, page_size)
+    else:
+        orders = query.order_by(Order.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
     
     return OrderListResponseAdmin(
         orders=[OrderResponseAdmin.model_validate(o) for o in orders],
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
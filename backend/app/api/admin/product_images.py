@@ -2,9 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List
-from pydantic import BaseModel
-from pathlib import Path
-import os
+from pydantic import BaseModel, Field
 import logging
 
 from app.database import get_db
@@ -12,16 +10,21 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.product_image import ProductImage
 from app.dependencies import get_current_admin
-
-# 获取上传目录路径（与 upload.py 保持一致）
-BASE_DIR = Path(__file__).parent.parent.parent
-UPLOAD_DIR = BASE_DIR / "static" / "uploads"
+from app.core.cache import invalidate_catalog_cache
+from app.core.content_version import PRODUCTS, bump_content_versions
+from app.services.uploads import delete_upload_if_unreferenced
+from app.services.product_images import attach_product_images
+from app.services.reorder import apply_order
 
 
 class ProductImageAdd(BaseModel):
     image_url: str
 
 
+class ProductImageBatchAdd(BaseModel):
+    image_urls: List[str] = Field(..., min_length=1)
+
+
 class ProductImageReorder(BaseModel):
     image_ids: List[int]
 
@@ -109,6 +112,8 @@ def add_product_image(
         db.add(new_image)
         db.commit()
         db.refresh(new_image)
+        invalidate_catalog_cache()
+        bump_content_versions(PRODUCTS)
         
         return {
             "id": new_image.id,
@@ -134,6 +139,46 @@ def add_product_image(
         )
 
 
+@router.post("/products/{product_id}/images/batch")
+def add_product_images_batch(
+    product_id: int,
+    image_data: ProductImageBatchAdd,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """為產品批次添加圖片（單一交易，依列表順序編排 order_index）"""
+    try:
+        product = db.query(Product).filter(Product.id == product_id).first()
+        if not product:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        
+        images = attach_product_images(db, product_id, image_data.image_urls)
+        # 在提交前組裝回應（flush 後已有 ID），提交後讀取屬性會逐筆重新查詢
+        result = [
+            {
+                "id": img.id,
+                "product_id": img.product_id,
+                "image_url": img.image_url,
+                "order_index": img.order_index
+            }
+            for img in images
+        ]
+        db.commit()
+        invalidate_catalog_cache()
+        bump_content_versions(PRODUCTS)
+        
+        return {"images": result}
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        logger.error(f"数据库操作错误: {e}", exc_info=True)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量添加产品图片失败"
+        )
+
+
 @router.put("/products/{product_id}/images/reorder")
 def reorder_product_images(
     product_id: int,
@@ -147,16 +192,15 @@ def reorder_product_images(
         if not product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
         
-        # 更新每個圖片的 order_index
-        for index, image_id in enumerate(reorder_data.image_ids):
-            image = db.query(ProductImage).filter(
-                ProductImage.id == image_id,
-                ProductImage.product_id == product_id
-            ).first()
-            if image:
-                image.order_index = index
+        # 單一 UPDATE ... CASE 寫入 order_index；不屬於該產品或不存在的圖片 ID 略過（與逐筆更新時的行為相同）
+        apply_order(
+            db, ProductImage, ProductImage.order_index, reorder_data.image_ids,
+            criteria=(ProductImage.product_id == product_id,)
+        )
         
         db.commit()
+        invalidate_catalog_cache()
+        bump_content_versions(PRODUCTS)
         return {"message": "图片排序已更新"}
     except HTTPException:
         raise
@@ -183,7 +227,7 @@ def delete_product_image(
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """刪除產品圖片（同時刪除文件）"""
+    """刪除產品圖片（文件沒有其他引用時同時刪除）"""
     try:
         image = db.query(ProductImage).filter(
             ProductImage.id == image_id,
@@ -193,30 +237,19 @@ def delete_product_image(
         if not image:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
         
-        # 刪除實際文件
-        image_url = image.image_url
-        if image_url:
-            # 從 URL 中提取文件名（例如：/backend/static/uploads/filename.webp 或 /static/uploads/filename.webp）
-            if image_url.startswith('/backend/static/uploads/'):
-                filename = image_url.replace('/backend/static/uploads/', '')
-            elif image_url.startswith('/static/uploads/'):
-                filename = image_url.replace('/static/uploads/', '')
-                file_path = UPLOAD_DIR / filename
-                
-                # 檢查文件是否存在並刪除
-                if file_path.exists() and file_path.is_file():
-                    try:
-                        os.remove(file_path)
-                        logger.info(f"已刪除文件: {file_path}")
-                    except OSError as e:
-                        logger.warning(f"刪除文件失敗: {file_path}, 錯誤: {e}")
-                        # 文件刪除失敗不影響數據庫記錄的刪除，繼續執行
-                else:
-                    logger.warning(f"文件不存在: {file_path}")
-        
         # 刪除數據庫記錄
+        image_url = image.image_url
         db.delete(image)
         db.commit()
+        invalidate_catalog_cache()
+        bump_content_versions(PRODUCTS)
+        
+        # 上傳檔案以內容雜湊命名，可能被其他產品、Banner、新聞共用：沒有其他引用時才刪除實際文件
+        try:
+            delete_upload_if_unreferenced(db, image_url)
+        except OSError as e:
+            # 文件刪除失敗不影響數據庫記錄的刪除
+            logger.warning(f"刪除文件失敗: {image_url}, 錯誤: {e}")
         return None
     except HTTPException:
         raise
@@ -11,6 +11,12 @@ from app.schemas.admin import (
     ProductCreateAdmin, ProductUpdateAdmin, ProductResponseAdmin, ProductListResponseAdmin
 )
 from app.dependencies import get_current_admin
+from app.serializers.product import serialize_products_admin, serialize_product_admin
+from app.core.cache import invalidate_catalog_cache
+from app.core.content_version import PRODUCTS, bump_content_versions
+from app.core.pagination import apply_keyset, split_keyset_page, count_total
+from app.services.search import search_backend
+from app.services.suggest import suggest_index
 
 router = APIRouter()
 
@@ -22,6 +28,9 @@ def get_products(
     status_filter: Optional[str] = Query(None, description="狀態篩選 (true/false)"),
     page: int = Query(1, ge=1, description="頁碼"),
     page_size: int = Query(10, ge=1, le=100, description="每頁筆數"),
+    cursor: Optional[str] = Query(None, description="游標分頁（使用上一頁的 next_cursor，設定後忽略 page）"),
+    estimate_total: bool = Query(False, description="使用預估總數（避免大表 COUNT）"),
+    include_total: bool = Query(False, description="游標分頁時同時返回 total / total_pages（執行 COUNT）"),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -36,34 +45,30 @@ def get_products(
         is_active = status_filter.lower() == 'true'
         query = query.filter(Product.is_active == is_active)
     
-    total = query.count()
-    total_pages = ceil(total / page_size) if total > 0 else 0
-    products = query.order_by(Product.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    filtered = bool(search or category_id or (status_filter is not None and status_filter != ''))
+    # 游標模式預設不計算總數，每一頁的成本與頁數深度無關
+    total = total_pages = None
+    if cursor is None or include_total:
+        total = count_total(db, query, Product, estimate=estimate_total, filtered=filtered)
+        total_pages = ceil(total / page_size) if total > 0 else 0
+    
+    next_cursor = None
+    if cursor is not None:
+        rows = apply_keyset(query, Product, cursor).limit(page_size + 1).all()
+        products, next_cursor = split_keyset_page(rows, page_size)
+    else:
+        products = query.order_by(Product.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
     
     # 構建包含分類名稱的產品響應
-    product_responses = []
-    for p in products:
-        product_dict = {
-            "id": p.id,
-            "title": p.title,
-            "price": p.price,
-            "description": p.description,
-            "image": p.image,
-            "category_id": p.category_id,
-            "category_name": p.category.name if p.category else None,
-            "stock": p.stock,
-            "is_active": p.is_active,
-            "is_hot": p.is_hot,
-            "created_at": p.created_at
-        }
-        product_responses.append(ProductResponseAdmin(**product_dict))
+    product_responses = serialize_products_admin(products)
     
     return ProductListResponseAdmin(
         products=product_responses,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -92,24 +97,15 @@ def create_product(
     db.add(new_product)
     db.commit()
     db.refresh(new_product)
+    invalidate_catalog_cache()
+    bump_content_versions(PRODUCTS)
+    search_backend.index_product(new_product)
+    suggest_index.set_product(new_product)
     
     # 重新加載分類關係
     db.refresh(new_product, ["category"])
     
-    product_dict = {
-        "id": new_product.id,
-        "title": new_product.title,
-        "price": new_product.price,
-        "description": new_product.description,
-        "image": new_product.image,
-        "category_id": new_product.category_id,
-        "category_name": new_product.category.name if new_product.category else None,
-        "stock": new_product.stock,
-        "is_active": new_product.is_active,
-        "is_hot": new_product.is_hot,
-        "created_at": new_product.created_at
-    }
-    return ProductResponseAdmin(**product_dict)
+    return serialize_product_admin(new_product)
 
 
 @router.get("/products/{product_id}", response_model=ProductResponseAdmin)
@@ -123,20 +119,7 @@ def get_product(
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     
-    product_dict = {
-        "id": product.id,
-        "title": product.title,
-        "price": product.price,
-        "description": product.description,
-        "image": product.image,
-        "category_id": product.category_id,
-        "category_name": product.category.name if product.category else None,
-        "stock": product.stock,
-        "is_active": product.is_active,
-        "is_hot": product.is_hot,
-        "created_at": product.created_at
-    }
-    return ProductResponseAdmin(**product_dict)
+    return serialize_product_admin(product)
 
 
 @router.put("/products/{product_id}", response_model=ProductResponseAdmin)
@@ -172,22 +155,13 @@ def update_product(
         product.is_hot = product_data.is_hot
     
     db.commit()
+    invalidate_catalog_cache()
+    bump_content_versions(PRODUCTS)
     db.refresh(product, ["category"])
+    search_backend.index_product(product)
+    suggest_index.set_product(product)
     
-    product_dict = {
-        "id": product.id,
-        "title": product.title,
-        "price": product.price,
-        "description": product.description,
-        "image": product.image,
-        "category_id": product.category_id,
-        "category_name": product.category.name if product.category else None,
-        "stock": product.stock,
-        "is_active": product.is_active,
-        "is_hot": product.is_hot,
-        "created_at": product.created_at
-    }
-    return ProductResponseAdmin(**product_dict)
+    return serialize_product_admin(product)
 
 
 @router.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -202,5 +176,9 @@ def delete_product(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     db.delete(product)
     db.commit()
+    invalidate_catalog_cache()
+    bump_content_versions(PRODUCTS)
+    search_backend.remove_product(product_id)
+    suggest_index.remove_product(product_id)
     return None
 
@@ -1,110 +1,240 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-import uuid
-import os
+from starlette.concurrency import run_in_threadpool
+import asyncio
 from pathlib import Path
-from PIL import Image
-import io
-from typing import Optional
+from typing import List, Optional
 
 from app.database import get_db
 from app.dependencies import get_current_admin
 from app.models.user import User
+from app.models.product import Product
 from app.config import settings
+from app.core.cache import invalidate_catalog_cache
+from app.core.content_version import PRODUCTS, bump_content_versions
+from app.core.locks import KeyedLocks
+from app.services.images import image_service, ImageProcessingError, ImageQueueFullError, ImageTimeoutError
+from app.services.image_variants import variant_cache
+from app.services.uploads import (
+    build_reference_index, content_filename, delete_upload, find_references, list_uploads,
+    store_upload, stored_size, upload_url
+)
+from app.services.product_images import attach_product_images
 
 router = APIRouter()
 
-# 确保上传目录存在（相对于项目根目录）
-BASE_DIR = Path(__file__).parent.parent.parent
-UPLOAD_DIR = BASE_DIR / "static" / "uploads"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 # 允许的图片格式
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
 
+# 上传文件大小上限（10MB）
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
 
-def convert_to_webp(image_file: UploadFile) -> tuple[bytes, str]:
-    """将图片转换为 webp 格式"""
-    try:
-        # 读取图片数据
-        image_data = image_file.file.read()
-        image_file.file.seek(0)  # 重置文件指针
-        
-        # 使用 PIL 打开图片
-        image = Image.open(io.BytesIO(image_data))
-        
-        # 如果是 RGBA 模式，转换为 RGB（webp 支持透明度，但为了兼容性可以转换）
-        if image.mode in ("RGBA", "LA", "P"):
-            # 保持透明度，使用 RGBA
-            if image.mode == "P":
-                image = image.convert("RGBA")
-        elif image.mode != "RGB":
-            image = image.convert("RGB")
-        
-        # 转换为 webp
-        webp_buffer = io.BytesIO()
-        image.save(webp_buffer, format="WEBP", quality=85, method=6)
-        webp_data = webp_buffer.getvalue()
-        
-        # 生成 UUID 文件名
-        filename = f"{uuid.uuid4()}.webp"
-        
-        return webp_data, filename
-    except Exception as e:
+# 同一 worker 内同时上传同一张图片时只转档一次
+_upload_locks = KeyedLocks()
+
+
+async def read_upload(file: UploadFile) -> bytes:
+    """检查文件扩展名与大小并读取内容，不符合时抛出 400"""
+    file_ext = Path(file.filename or "").suffix.lower()
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的文件格式。允许的格式: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    
+    # 检查文件大小（限制为 10MB）：最多读取上限 + 1 字节，超过即拒绝，不把超大文件整个读入内存
+    data = await file.read(MAX_UPLOAD_SIZE + 1)
+    if len(data) > MAX_UPLOAD_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"图片处理失败: {str(e)}"
+            detail="文件大小不能超过 10MB"
         )
+    return data
+
+
+async def store_image(data: bytes, background_tasks: BackgroundTasks) -> dict:
+    """
+    转换为 webp 并保存，返回上传结果
+    
+    以原始内容的哈希命名：同一张图片重复上传时直接返回已有的文件，不解码、不转档；
+    转档失败时抛出 ImageQueueFullError / ImageTimeoutError / ImageProcessingError
+    """
+    filename = content_filename(data)
+    async with _upload_locks.hold(filename):
+        existing_size = await run_in_threadpool(stored_size, filename)
+        if existing_size is not None:
+            return {
+                "url": upload_url(filename),
+                "filename": filename,
+                "size": existing_size,
+                "deduplicated": True
+            }
+        
+        # 转换为 webp（在图片服务的进程池中执行，不占用 worker 的 GIL 与线程池）
+        webp_data = await image_service.to_webp(data)
+        await run_in_threadpool(store_upload, webp_data, filename)
+    
+    # 响应发送后预先生成产品列表使用的缩图
+    background_tasks.add_task(variant_cache.pregenerate, filename, webp_data)
+    
+    return {
+        "url": upload_url(filename),
+        "filename": filename,
+        "size": len(webp_data),
+        "deduplicated": False
+    }
+
+
+def image_error_to_http(error: Exception) -> HTTPException:
+    """将图片服务的错误转换为 HTTPException"""
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, ImageQueueFullError):
+        return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=error.detail)
+    if isinstance(error, ImageTimeoutError):
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=error.detail)
+    if isinstance(error, ImageProcessingError):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"图片处理失败: {error.detail}")
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"上传失败: {str(error)}")
 
 
 @router.post("/upload")
 async def upload_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    current_admin: User = Depends(get_current_admin)
+):
+    """上传图片并转换为 webp 格式"""
+    data = await read_upload(file)
+    try:
+        return await store_image(data, background_tasks)
+    except Exception as e:
+        raise image_error_to_http(e)
+
+
+@router.post("/upload/batch")
+async def upload_images_batch(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    product_id: Optional[int] = Form(None, description="设置后将上传成功的图片依序加入该产品"),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """上传图片并转换为 webp 格式"""
-    # 检查文件扩展名
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in ALLOWED_EXTENSIONS:
+    """
+    批量上传图片
+    
+    各文件并行转档（同时进行的数量等于图片服务的进程数，不会占满转档队列），返回每个文件的结果；
+    单个文件失败不影响其他文件。设置 product_id 时，所有上传成功的图片在同一个事务中加入产品
+    """
+    if len(files) > settings.image_batch_max_files:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"不支持的文件格式。允许的格式: {', '.join(ALLOWED_EXTENSIONS)}"
+            detail=f"一次最多上传 {settings.image_batch_max_files} 个文件"
         )
     
-    # 检查文件大小（限制为 10MB）
-    file.file.seek(0, 2)  # 移动到文件末尾
-    file_size = file.file.tell()
-    file.file.seek(0)  # 重置文件指针
+    # 先确认产品存在，避免转档后才发现无法加入
+    if product_id is not None:
+        product = await run_in_threadpool(db.get, Product, product_id)
+        if product is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     
-    if file_size > 10 * 1024 * 1024:  # 10MB
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="文件大小不能超过 10MB"
-        )
+    semaphore = asyncio.Semaphore(image_service.workers)
     
+    async def process(file: UploadFile) -> dict:
+        async with semaphore:
+            try:
+                data = await read_upload(file)
+                result = await store_image(data, background_tasks)
+            except Exception as e:
+                error = image_error_to_http(e)
+                return {"file": file.filename, "ok": False, "status_code": error.status_code, "error": error.detail}
+        return {"file": file.filename, "ok": True, **result}
+    
+    results = await asyncio.gather(*(process(file) for file in files))
+    
+    images = None
+    if product_id is not None:
+        image_urls = [result["url"] for result in results if result["ok"]]
+        if image_urls:
+            images = await run_in_threadpool(_attach_to_product, db, product_id, image_urls)
+        else:
+            images = []
+    
+    return {
+        "results": results,
+        "succeeded": sum(1 for result in results if result["ok"]),
+        "failed": sum(1 for result in results if not result["ok"]),
+        "images": images
+    }
+
+
+def _attach_to_product(db: Session, product_id: int, image_urls: List[str]) -> List[dict]:
+    """在同一个事务中将图片加入产品（在线程池中执行）"""
     try:
-        # 转换为 webp
-        webp_data, filename = convert_to_webp(file)
-        
-        # 保存文件
-        file_path = UPLOAD_DIR / filename
-        with open(file_path, "wb") as f:
-            f.write(webp_data)
-        
-        # 返回文件 URL（使用 /backend/static/ 路徑）
-        file_url = f"/backend/static/uploads/{filename}"
-        
-        return {
-            "url": file_url,
-            "filename": filename,
-            "size": len(webp_data)
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
+        images = attach_product_images(db, product_id, image_urls)
+        result = [
+            {
+                "id": img.id,
+                "product_id": img.product_id,
+                "image_url": img.image_url,
+                "order_index": img.order_index
+            }
+            for img in images
+        ]
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"上传失败: {str(e)}"
+            detail="批量添加产品图片失败"
         )
+    invalidate_catalog_cache()
+    bump_content_versions(PRODUCTS)
+    return result
+
+
+@router.get("/upload/orphans")
+def list_orphan_uploads(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """列出没有被产品、产品图片、Banner、新闻引用的上传文件"""
+    index = build_reference_index(db)
+    return {"orphans": [filename for filename in list_uploads() if filename not in index]}
+
+
+@router.get("/upload/{filename}/references")
+def get_upload_references(
+    filename: str,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """查询引用某个上传文件的数据"""
+    return {
+        "filename": filename,
+        "references": [reference._asdict() for reference in find_references(db, filename)]
+    }
+
+
+@router.delete("/upload/{filename}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_upload_file(
+    filename: str,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """删除上传文件（仍被引用时拒绝删除）"""
+    if filename != Path(filename).name or filename.startswith("."):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    
+    references = find_references(db, filename)
+    if references:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"文件仍被引用: {', '.join(f'{r.kind}#{r.id}' for r in references)}"
+        )
+    
+    if not delete_upload(filename):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    return None
 
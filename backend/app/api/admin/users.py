@@ -10,7 +10,9 @@ from app.schemas.admin import (
     UserCreateAdmin, UserUpdateAdmin, UserResponseAdmin, UserListResponseAdmin
 )
 from app.core.security import get_password_hash
+from app.core.identity import invalidate_user
 from app.dependencies import get_current_admin
+from app.core.pagination import apply_keyset, split_keyset_page, count_total
 
 router = APIRouter()
 
@@ -22,6 +24,9 @@ def get_users(
     status_filter: Optional[str] = Query(None, description="狀態篩選"),
     page: int = Query(1, ge=1, description="頁碼"),
     page_size: int = Query(10, ge=1, le=100, description="每頁筆數"),
+    cursor: Optional[str] = Query(None, description="游標分頁（使用上一頁的 next_cursor，設定後忽略 page）"),
+    estimate_total: bool = Query(False, description="使用預估總數（避免大表 COUNT）"),
+    include_total: bool = Query(False, description="游標分頁時同時返回 total / total_pages（執行 COUNT）"),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -53,19 +58,29 @@ def get_users(
         except ValueError:
             pass
     
-    # 計算總數
-    total = query.count()
-    total_pages = ceil(total / page_size) if total > 0 else 0
+    # 計算總數（有篩選條件時一律精確計算）
+    filtered = bool(search or role or status_filter)
+    # 游標模式預設不計算總數，每一頁的成本與頁數深度無關
+    total = total_pages = None
+    if cursor is None or include_total:
+        total = count_total(db, query, User, estimate=estimate_total, filtered=filtered)
+        total_pages = ceil(total / page_size) if total > 0 else 0
     
-    # 分頁
-    users = query.order_by(User.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    # 分頁（游標模式依 created_at, id 定位，避免大表 OFFSET）
+    next_cursor = None
+    if cursor is not None:
+        rows = apply_keyset(query, User, cursor).limit(page_size + 1).all()
+        users, next_cursor = split_keyset_page(rows, page_size)
+    else:
+        users = query.order_by(User.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
     
     return UserListResponseAdmin(
         users=[UserResponseAdmin.model_validate(u) for u in users],
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -151,6 +166,7 @@ def update_user(
         user.password_hash = get_password_hash(user_data.password)
     
     db.commit()
+    invalidate_user(user_id)
     db.refresh(user)
     
     return UserResponseAdmin.model_validate(user)
@@ -179,5 +195,6 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    invalidate_user(user_id)
     return None
 
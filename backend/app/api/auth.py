@@ -7,7 +7,8 @@ from app.models.cart import Cart
 from app.schemas.user import UserCreate, UserResponse, UserLogin, UserUpdate, UserPasswordUpdate
 from app.core.security import verify_password, get_password_hash
 from app.core.session import set_session_user, clear_session
-from app.dependencies import get_current_user
+from app.core.identity import invalidate_user
+from app.dependencies import get_current_user, get_current_user_for_update
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -79,7 +80,7 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserResponse)
 def update_current_user_profile(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),
     db: Session = Depends(get_db)
 ):
     """更新當前用戶資料（不包含密碼）"""
@@ -107,6 +108,7 @@ def update_current_user_profile(
         current_user.zipcode = user_data.zipcode
     
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
     
     return current_user
@@ -115,7 +117,7 @@ def update_current_user_profile(
 @router.put("/me/password", response_model=UserResponse)
 def update_current_user_password(
     password_data: UserPasswordUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_for_update),
     db: Session = Depends(get_db)
 ):
     """更新當前用戶密碼"""
@@ -130,6 +132,7 @@ def update_current_user_password(
     current_user.password_hash = get_password_hash(password_data.new_password)
     
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
     
     return current_user
@@ -5,8 +5,10 @@ from app.models.user import User
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.models.product import Product
-from app.schemas.cart import CartItemCreate, CartItemUpdate, CartResponse, CartItemResponse
+from app.schemas.cart import CartItemCreate, CartItemUpdate, CartResponse
 from app.dependencies import get_current_user
+from app.repositories.cart import load_cart, cart_total
+from app.serializers.cart import serialize_cart
 
 router = APIRouter(prefix="/api/cart", tags=["cart"])
 
@@ -22,22 +24,18 @@ def get_or_create_cart(user: User, db: Session) -> Cart:
     return cart
 
 
+def build_cart_response(db: Session, cart_id: int) -> CartResponse:
+    """載入購物車並計算總價（查詢數固定，不隨購物車項目數增加）"""
+    cart = load_cart(db, cart_id)
+    return serialize_cart(cart, cart_total(db, cart_id))
+
+
 @router.get("", response_model=CartResponse)
 def get_cart(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """獲取當前用戶購物車"""
     cart = get_or_create_cart(current_user, db)
     
-    # 計算總價
-    total = sum(item.product.price * item.quantity for item in cart.items)
-    
-    return CartResponse(
-        id=cart.id,
-        user_id=cart.user_id,
-        items=[CartItemResponse.model_validate(item) for item in cart.items],
-        total=total,
-        created_at=cart.created_at,
-        updated_at=cart.updated_at
-    )
+    return build_cart_response(db, cart.id)
 
 
 @router.post("/items", response_model=CartResponse)
@@ -83,19 +81,8 @@ def add_to_cart(
         db.add(new_item)
     
     db.commit()
-    db.refresh(cart)
     
-    # 計算總價
-    total = sum(item.product.price * item.quantity for item in cart.items)
-    
-    return CartResponse(
-        id=cart.id,
-        user_id=cart.user_id,
-        items=[CartItemResponse.model_validate(item) for item in cart.items],
-        total=total,
-        created_at=cart.created_at,
-        updated_at=cart.updated_at
-    )
+    return build_cart_response(db, cart.id)
 
 
 @router.put("/items/{item_id}", response_model=CartResponse)
@@ -127,19 +114,8 @@ def update_cart_item(
     
     item.quantity = item_data.quantity
     db.commit()
-    db.refresh(cart)
-    
-    # 計算總價
-    total = sum(item.product.price * item.quantity for item in cart.items)
     
-    return CartResponse(
-        id=cart.id,
-        user_id=cart.user_id,
-        items=[CartItemResponse.model_validate(item) for item in cart.items],
-        total=total,
-        created_at=cart.created_at,
-        updated_at=cart.updated_at
-    )
+    return build_cart_response(db, cart.id)
 
 
 @router.delete("/items/{item_id}", response_model=CartResponse)
@@ -164,19 +140,8 @@ def remove_cart_item(
     
     db.delete(item)
     db.commit()
-    db.refresh(cart)
-    
-    # 計算總價
-    total = sum(item.product.price * item.quantity for item in cart.items)
-    
-    return CartResponse(
-        id=cart.id,
-        user_id=cart.user_id,
-        items=[CartItemResponse.model_validate(item) for item in cart.items],
-        total=total,
-        created_at=cart.created_at,
-        updated_at=cart.updated_at
-    )
+    
+    return build_cart_response(db, cart.id)
 
 
 @router.delete("", response_model=dict)
@@ -1,71 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 from typing import List
-from app.database import get_db
+from math import ceil
+from app.database import get_async_db
 from app.models.product_category import ProductCategory
 from app.models.product import Product
 from app.schemas.category import CategoryResponse, CategoryTreeResponse
-from app.schemas.product import ProductResponse
+from app.schemas.product import ProductListResponse
+from app.serializers.product import serialize_products
+from app.core.cache import catalog_cache
+from app.core.http_cache import snapshot_response
+from app.core.responses import PrevalidatedJSONResponse
+from app.core.pagination import count_total
+from app.repositories.product import product_listing_stmt, product_count_stmt
+from app.services.category_tree import subtree_ids_stmt, category_tree_cache, serialize_category_tree
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
 
 @router.get("", response_model=List[CategoryTreeResponse])
-def get_categories(db: Session = Depends(get_db)):
-    """獲取所有分類（樹狀結構）"""
-    # 按 sort_order 排序，相同時按 created_at 排序
-    all_categories = db.query(ProductCategory).order_by(
-        ProductCategory.sort_order.asc(),
-        ProductCategory.created_at.asc()
-    ).all()
+async def get_categories(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    獲取所有分類（樹狀結構）
     
-    # 建立分類字典，並確保每個分類的 children 列表是空的（避免 SQLAlchemy relationship 自動填充）
-    category_dict = {}
-    for cat in all_categories:
-        category_node = CategoryTreeResponse.model_validate(cat)
-        category_node.children = []  # 明確設置為空列表，避免 SQLAlchemy 自動填充
-        category_dict[cat.id] = category_node
+    返回預先序列化的快照，後台修改分類後才重建；回應帶強 ETag，客戶端以 If-None-Match 驗證時返回 304
+    """
+    async def build() -> bytes:
+        # 按 sort_order 排序，相同時按 created_at 排序；children 關聯不載入（noload），樹狀結構自行組裝
+        categories = (await db.execute(
+            select(ProductCategory).options(noload(ProductCategory.children)).order_by(
+                ProductCategory.sort_order.asc(),
+                ProductCategory.created_at.asc()
+            )
+        )).scalars().all()
+        return serialize_category_tree(categories)
     
-    # 建立樹狀結構
-    root_categories = []
-    children_ids_by_parent = {}  # 追蹤每個父分類已經添加的子分類 ID
-    
-    for cat in all_categories:
-        category_node = category_dict[cat.id]
-        if cat.parent_id is None:  # 根分類的 parent_id 為 None
-            root_categories.append(category_node)
-        else:
-            # 子分類添加到父分類的 children 中
-            if cat.parent_id in category_dict:
-                # 初始化父分類的子分類 ID 集合
-                if cat.parent_id not in children_ids_by_parent:
-                    children_ids_by_parent[cat.parent_id] = set()
-                
-                # 確保不會重複添加（使用 ID 檢查）
-                if cat.id not in children_ids_by_parent[cat.parent_id]:
-                    category_dict[cat.parent_id].children.append(category_node)
-                    children_ids_by_parent[cat.parent_id].add(cat.id)
-    
-    # 對根分類和子分類進行排序
-    root_categories.sort(key=lambda x: (x.sort_order, x.created_at))
-    for root_cat in root_categories:
-        if root_cat.children:
-            # 最終去重並排序（以防萬一）
-            seen_ids = set()
-            unique_children = []
-            for child in root_cat.children:
-                if child.id not in seen_ids:
-                    seen_ids.add(child.id)
-                    unique_children.append(child)
-            root_cat.children = sorted(unique_children, key=lambda x: (x.sort_order, x.created_at))
-    
-    return root_categories
+    snapshot = await category_tree_cache.get(build)
+    return snapshot_response(request, snapshot)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+async def get_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
     """獲取分類詳情"""
-    category = db.query(ProductCategory).filter(ProductCategory.id == category_id).first()
+    category = await db.get(ProductCategory, category_id)
     
     if not category:
         raise HTTPException(
@@ -76,10 +55,23 @@ def get_category(category_id: int, db: Session = Depends(get_db)):
     return CategoryResponse.model_validate(category)
 
 
-@router.get("/{category_id}/products", response_model=List[ProductResponse])
-def get_category_products(category_id: int, db: Session = Depends(get_db)):
-    """獲取分類下的產品"""
-    category = db.query(ProductCategory).filter(ProductCategory.id == category_id).first()
+@router.get("/{category_id}/products", response_model=ProductListResponse)
+async def get_category_products(
+    category_id: int,
+    include_subcategories: bool = Query(True, description="Include products of all descendant categories"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(9, ge=1, le=100, description="Items per page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """獲取分類下的產品（預設包含所有子孫分類，以物化路徑查詢，查詢次數與分類樹深度無關）"""
+    cache_key = ("category", category_id, include_subcategories, page, page_size)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return PrevalidatedJSONResponse(cached)
+    # 查詢期間有寫入清除快取時不保存結果（寫入前的資料）
+    cache_version = catalog_cache.version
+    
+    category = await db.get(ProductCategory, category_id)
     
     if not category:
         raise HTTPException(
@@ -87,15 +79,27 @@ def get_category_products(category_id: int, db: Session = Depends(get_db)):
             detail="Category not found"
         )
     
-    # 獲取該分類及其子分類的所有產品
-    category_ids = [category_id]
-    # 簡單實現：只獲取直接分類的產品
-    # 如果需要遞歸獲取子分類產品，需要更複雜的查詢
+    # 子樹條件為 category_id IN (SELECT id FROM product_categories WHERE path LIKE '/1/%')
+    if include_subcategories:
+        filters = [Product.category_id.in_(subtree_ids_stmt(category.path)), Product.is_active == True]
+    else:
+        filters = [Product.category_id == category_id, Product.is_active == True]
     
-    products = db.query(Product).filter(
-        Product.category_id.in_(category_ids),
-        Product.is_active == True
-    ).all()
+    total = await db.run_sync(count_total, product_count_stmt(*filters), Product, filtered=True)
+    products = (await db.execute(
+        product_listing_stmt(*filters)
+        .order_by(Product.created_at.desc(), Product.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )).scalars().all()
     
-    return [ProductResponse.model_validate(p) for p in products]
-
+    response = ProductListResponse(
+        products=serialize_products(products, excerpt=True),
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=ceil(total / page_size) if total > 0 else 0
+    )
+    response = PrevalidatedJSONResponse(response)
+    catalog_cache.set(cache_key, response.body, cache_version)
+    return response
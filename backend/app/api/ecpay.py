@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
 from fastapi.responses import PlainTextResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import Optional
 from datetime import datetime
 import hashlib
@@ -12,6 +12,7 @@ from app.models.order_item import OrderItem
 from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.dependencies import get_current_user
+from app.services.inventory import InsufficientStockError, bump_stock_version, cart_quantities, reserve_stock
 from app.config import settings
 from pydantic import BaseModel
 
@@ -92,8 +93,10 @@ def create_ecpay_order(
     db: Session = Depends(get_db)
 ):
     """创建订单并生成绿界金流表单数据"""
-    # 获取用户购物车
-    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    # 获取用户购物车（一并加载购物车项目与产品，避免逐项延迟查询）
+    cart = db.query(Cart).options(
+        selectinload(Cart.items).joinedload(CartItem.product)
+    ).filter(Cart.user_id == current_user.id).first()
     
     if not cart or not cart.items:
         raise HTTPException(
@@ -104,13 +107,14 @@ def create_ecpay_order(
     # 计算总金额
     total_amount = sum(item.product.price * item.quantity for item in cart.items)
     
-    # 检查库存
-    for item in cart.items:
-        if item.product.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for product: {item.product.title}"
-            )
+    # 原子扣减库存（单一条件式 UPDATE，库存不足时回滚并列出所有不足的产品）
+    try:
+        sold_out = reserve_stock(db, cart_quantities(cart.items))
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.detail
+        )
     
     # 创建订单
     new_order = Order(
@@ -126,7 +130,7 @@ def create_ecpay_order(
     db.add(new_order)
     db.flush()  # 获取 order.id
     
-    # 创建订单项目並更新庫存
+    # 创建订单项目（库存已于上方扣减）
     item_names = []
     for cart_item in cart.items:
         order_item = OrderItem(
@@ -137,14 +141,13 @@ def create_ecpay_order(
         )
         db.add(order_item)
         item_names.append(f"{cart_item.product.title} x{cart_item.quantity}")
-        
-        # 更新產品庫存
-        cart_item.product.stock -= cart_item.quantity
     
     # 清空購物車
     db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
     
     db.commit()
+    # 庫存已扣減：有產品售完時立即使產品快取與 ETag 失效，否則合併為定期遞增（見 app/services/inventory.py）
+    bump_stock_version(sold_out)
     db.refresh(new_order)
     
     # 生成订单编号（使用订单ID）
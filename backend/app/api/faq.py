@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.faq import FAQ
 from app.schemas.faq import FAQResponse
 
@@ -9,9 +10,9 @@ router = APIRouter(prefix="/api/faq", tags=["faq"])
 
 
 @router.get("", response_model=List[FAQResponse])
-def get_faq_list(db: Session = Depends(get_db)):
+async def get_faq_list(db: AsyncSession = Depends(get_async_db)):
     """獲取常見問題列表"""
-    faqs = db.query(FAQ).order_by(FAQ.order_index.asc()).all()
+    faqs = (await db.execute(select(FAQ).order_by(FAQ.order_index.asc()))).scalars().all()
     
     return [FAQResponse.model_validate(faq) for faq in faqs]
 
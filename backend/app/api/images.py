@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.static_delivery import IMMUTABLE_CACHE_CONTROL, static_delivery
+from app.services.image_variants import variant_cache, VariantNotFoundError
+from app.services.images import ImageProcessingError, ImageQueueFullError, ImageTimeoutError
+
+# 縮圖路由需在 /static、/backend/static 靜態目錄掛載之前註冊，否則會被 StaticFiles 攔截
+# 上傳檔名為 UUID / 內容雜湊，同一 URL 的內容永遠不變，回應帶 IMMUTABLE_CACHE_CONTROL
+router = APIRouter(tags=["images"])
+
+
+@router.get("/backend/static/img/{width}/{filename}")
+@router.get("/static/img/{width}/{filename}")
+async def get_image_variant(width: int, filename: str):
+    """獲取上傳圖片的指定寬度縮圖（第一次請求時產生並快取在磁碟）"""
+    if width not in variant_cache.widths:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported width. Allowed widths: {', '.join(map(str, variant_cache.widths))}"
+        )
+    
+    try:
+        path = await variant_cache.get(filename, width)
+    except VariantNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.detail
+        )
+    except ImageQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=e.detail
+        )
+    except ImageTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=e.detail
+        )
+    except ImageProcessingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=e.detail
+        )
+    
+    # x-accel / x-sendfile 模式由前端伺服器傳送縮圖檔案
+    offloaded = static_delivery.offload(path, IMMUTABLE_CACHE_CONTROL)
+    if offloaded is not None:
+        return offloaded
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
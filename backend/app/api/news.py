@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.news import News
 from app.schemas.news import NewsResponse, NewsListResponse
 
@@ -8,9 +9,11 @@ router = APIRouter(prefix="/api/news", tags=["news"])
 
 
 @router.get("", response_model=NewsListResponse)
-def get_news_list(db: Session = Depends(get_db)):
+async def get_news_list(db: AsyncSession = Depends(get_async_db)):
     """獲取新聞列表"""
-    news_items = db.query(News).order_by(News.date.desc(), News.created_at.desc()).all()
+    news_items = (await db.execute(
+        select(News).order_by(News.date.desc(), News.created_at.desc())
+    )).scalars().all()
     
     return NewsListResponse(
         news=[NewsResponse.model_validate(item) for item in news_items],
@@ -19,9 +22,9 @@ def get_news_list(db: Session = Depends(get_db)):
 
 
 @router.get("/{news_id}", response_model=NewsResponse)
-def get_news_detail(news_id: int, db: Session = Depends(get_db)):
+async def get_news_detail(news_id: int, db: AsyncSession = Depends(get_async_db)):
     """獲取新聞詳情"""
-    news_item = db.query(News).filter(News.id == news_id).first()
+    news_item = await db.get(News, news_id)
     
     if not news_item:
         raise HTTPException(
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from app.database import get_db
 from app.models.user import User
@@ -9,6 +9,7 @@ from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.schemas.order import OrderCreate, OrderResponse
 from app.dependencies import get_current_user
+from app.services.inventory import InsufficientStockError, bump_stock_version, cart_quantities, reserve_stock
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
 
@@ -20,8 +21,10 @@ def create_order(
     db: Session = Depends(get_db)
 ):
     """創建訂單（從購物車）"""
-    # 獲取用戶購物車
-    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    # 獲取用戶購物車（一併載入購物車項目與產品，避免逐項延遲查詢）
+    cart = db.query(Cart).options(
+        selectinload(Cart.items).joinedload(CartItem.product)
+    ).filter(Cart.user_id == current_user.id).first()
     
     if not cart or not cart.items:
         raise HTTPException(
@@ -32,13 +35,14 @@ def create_order(
     # 計算總金額
     total_amount = sum(item.product.price * item.quantity for item in cart.items)
     
-    # 檢查庫存
-    for item in cart.items:
-        if item.product.stock < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for product: {item.product.title}"
-            )
+    # 原子扣減庫存（單一條件式 UPDATE，庫存不足時回滾並列出所有不足的產品）
+    try:
+        sold_out = reserve_stock(db, cart_quantities(cart.items))
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.detail
+        )
     
     # 創建訂單
     new_order = Order(
@@ -54,7 +58,7 @@ def create_order(
     db.add(new_order)
     db.flush()  # 獲取 order.id
     
-    # 創建訂單項目並更新庫存
+    # 創建訂單項目（庫存已於上方扣減）
     for cart_item in cart.items:
         order_item = OrderItem(
             order_id=new_order.id,
@@ -63,14 +67,13 @@ def create_order(
             price=cart_item.product.price
         )
         db.add(order_item)
-        
-        # 更新產品庫存
-        cart_item.product.stock -= cart_item.quantity
     
     # 清空購物車
     db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
     
     db.commit()
+    # 庫存已扣減：有產品售完時立即使產品快取與 ETag 失效，否則合併為定期遞增（見 app/services/inventory.py）
+    bump_stock_version(sold_out)
     db.refresh(new_order)
     
     return OrderResponse.model_validate(new_order)
@@ -1,80 +1,148 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import Optional, List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.product import Product
 from app.models.product_category import ProductCategory
-from app.schemas.product import ProductResponse, ProductListResponse, ProductImageResponse
+from app.schemas.product import ProductResponse, ProductListResponse, SuggestionItem, SuggestResponse
+from app.serializers.product import serialize_products, serialize_product
+from app.core.cache import catalog_cache
+from app.core.responses import PrevalidatedJSONResponse
+from app.core.pagination import apply_keyset, split_keyset_page, count_total
+from app.repositories.product import product_listing_stmt, product_count_stmt
+from app.services.search import search_backend
+from app.services.suggest import suggest_index, PRODUCT, CATEGORY
 from math import ceil
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
 
 @router.get("", response_model=ProductListResponse)
-def get_products(
+async def get_products(
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(9, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Keyset cursor (from next_cursor); page is ignored when set"),
+    include_total: bool = Query(False, description="Cursor mode only: also return total and total_pages (runs COUNT(*))"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """獲取產品列表（支援分類篩選、分頁）"""
-    query = db.query(Product).options(
-        joinedload(Product.category),
-        joinedload(Product.images)
-    ).filter(Product.is_active == True)
+    """獲取產品列表（支援分類篩選、分頁、游標分頁）"""
+    # 先查進程內快取（序列化後的 JSON bytes），命中時不訪問資料庫也不重新序列化
+    cache_key = (category_id, page, page_size, cursor, include_total)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return PrevalidatedJSONResponse(cached)
+    # 查詢期間有寫入清除快取時不保存結果（寫入前的資料）
+    cache_version = catalog_cache.version
     
+    filters = [Product.is_active == True]
     if category_id:
-        query = query.filter(Product.category_id == category_id)
+        filters.append(Product.category_id == category_id)
     
-    total = query.count()
-    total_pages = ceil(total / page_size) if total > 0 else 0
+    stmt = product_listing_stmt(*filters)
+    # 游標模式預設不計算總數，每一頁的成本與頁數深度無關
+    total = total_pages = None
+    if cursor is None or include_total:
+        # 查詢必定篩選 is_active，表統計的預估行數包含下架產品，因此一律使用精確 COUNT
+        # count_total 為同步函數，透過 run_sync 在非同步連線上執行
+        total = await db.run_sync(count_total, product_count_stmt(*filters), Product, filtered=True)
+        total_pages = ceil(total / page_size) if total > 0 else 0
     
-    products = query.offset((page - 1) * page_size).limit(page_size).all()
+    next_cursor = None
+    if cursor is not None:
+        # 游標模式：依 (created_at, id) 定位，多取一筆判斷是否有下一頁
+        rows = (await db.execute(apply_keyset(stmt, Product, cursor).limit(page_size + 1))).scalars().all()
+        products, next_cursor = split_keyset_page(rows, page_size)
+    else:
+        products = (await db.execute(stmt.offset((page - 1) * page_size).limit(page_size))).scalars().all()
     
-    # 構建包含分類名稱和圖片的產品響應
-    product_responses = []
-    for p in products:
-        # 構建產品圖片列表
-        product_images = [
-            ProductImageResponse(
-                id=img.id,
-                image_url=img.image_url,
-                order_index=img.order_index
-            )
-            for img in sorted(p.images, key=lambda x: x.order_index) if p.images
-        ]
-        
-        product_dict = {
-            "id": p.id,
-            "title": p.title,
-            "price": p.price,
-            "description": p.description,
-            "image": p.image,
-            "category_id": p.category_id,
-            "category_name": p.category.name if p.category else None,
-            "stock": p.stock,
-            "is_active": p.is_active,
-            "created_at": p.created_at,
-            "product_images": product_images
-        }
-        product_responses.append(ProductResponse(**product_dict))
+    # 批次序列化（資料來自資料庫，跳過逐列驗證）
+    product_responses = serialize_products(products, excerpt=True)
     
-    return ProductListResponse(
+    response = ProductListResponse(
         products=product_responses,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
+    )
+    # 內容已由 serialize_products 驗證，直接輸出 JSON，不經過 response_model 再次驗證
+    response = PrevalidatedJSONResponse(response)
+    catalog_cache.set(cache_key, response.body, cache_version)
+    return response
+
+
+@router.get("/search", response_model=ProductListResponse)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Search keywords (title and description)"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(9, ge=1, le=100, description="Items per page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """搜尋產品（依標題、描述相關度排序，後端見 app/services/search.py）"""
+    cache_key = ("search", q, category_id, page, page_size)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return PrevalidatedJSONResponse(cached)
+    # 查詢期間有寫入清除快取時不保存結果（寫入前的資料）
+    cache_version = catalog_cache.version
+    
+    # memory 後端：同步索引與查詢在執行緒池中執行，不阻塞事件迴圈
+    result = await search_backend.asearch(db, q, category_id, (page - 1) * page_size, page_size)
+    
+    products = []
+    if result.ids:
+        rows = (await db.execute(
+            product_listing_stmt(Product.id.in_(result.ids), Product.is_active == True)
+        )).scalars().all()
+        by_id = {p.id: p for p in rows}
+        # 索引中已被其他 worker 刪除或下架的產品：從目前 worker 的索引移除
+        for product_id in set(result.ids) - by_id.keys():
+            search_backend.remove_product(product_id)
+        products = [by_id[product_id] for product_id in result.ids if product_id in by_id]
+    
+    response = ProductListResponse(
+        products=serialize_products(products, excerpt=True),
+        total=result.total,
+        page=page,
+        page_size=page_size,
+        total_pages=ceil(result.total / page_size) if result.total > 0 else 0
+    )
+    response = PrevalidatedJSONResponse(response)
+    catalog_cache.set(cache_key, response.body, cache_version)
+    return response
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=64, description="Prefix typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Max product suggestions"),
+    category_limit: int = Query(3, ge=0, le=10, description="Max category suggestions"),
+):
+    """搜尋建議（只查詢進程內前綴索引，不訪問資料庫，見 app/services/suggest.py）"""
+    return SuggestResponse(
+        query=q,
+        products=[SuggestionItem(id=s.id, text=s.text) for s in suggest_index.suggest(q, PRODUCT, limit)],
+        categories=[
+            SuggestionItem(id=s.id, text=s.text) for s in suggest_index.suggest(q, CATEGORY, category_limit)
+        ] if category_limit else []
     )
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """獲取產品詳情"""
-    product = db.query(Product).options(
-        joinedload(Product.category),
-        joinedload(Product.images)
-    ).filter(Product.id == product_id).first()
+    # 非同步 Session 不支援延遲載入，關聯需在查詢時一併載入
+    product = (await db.execute(
+        select(Product).options(
+            joinedload(Product.category),
+            selectinload(Product.images)
+        ).where(Product.id == product_id)
+    )).scalar_one_or_none()
     
     if not product:
         raise HTTPException(
@@ -82,36 +150,13 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
             detail="Product not found"
         )
     
-    # 構建產品圖片列表
-    product_images = [
-        ProductImageResponse(
-            id=img.id,
-            image_url=img.image_url,
-            order_index=img.order_index
-        )
-        for img in sorted(product.images, key=lambda x: x.order_index) if product.images
-    ]
-    
-    product_dict = {
-        "id": product.id,
-        "title": product.title,
-        "price": product.price,
-        "description": product.description,
-        "image": product.image,
-        "category_id": product.category_id,
-        "category_name": product.category.name if product.category else None,
-        "stock": product.stock,
-        "is_active": product.is_active,
-        "created_at": product.created_at,
-        "product_images": product_images
-    }
-    return ProductResponse(**product_dict)
+    return PrevalidatedJSONResponse(serialize_product(product))
 
 
 @router.get("/categories/list", response_model=List[dict])
-def get_categories_list(db: Session = Depends(get_db)):
+async def get_categories_list(db: AsyncSession = Depends(get_async_db)):
     """獲取分類列表（簡單列表）"""
-    categories = db.query(ProductCategory).all()
+    categories = (await db.execute(select(ProductCategory))).scalars().all()
     return [
         {
             "id": cat.id,
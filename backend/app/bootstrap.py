@@ -0,0 +1,50 @@
+"""
+應用啟動工作
+確保資料庫存在、建立資料表、執行遷移、初始化預設管理員
+
+由 create_app() 的 lifespan 在 worker 啟動後執行（INIT_DB_ON_STARTUP=false 時跳過），
+也可在部署時單獨執行一次：python -m app.bootstrap
+"""
+import logging
+
+from app.config import settings
+from app.database import Base, engine, ensure_database_exists
+from app.database_migration import run_migrations
+from app.init_admin import init_admin_user
+
+# 匯入所有模型，確保 create_all 能建立全部資料表
+from app import models  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+def run_startup_tasks() -> None:
+    """執行資料庫相關的啟動工作，各步驟失敗時記錄警告並繼續（與原本匯入時的行為一致）"""
+    # 確保資料庫存在（僅 MySQL）
+    if settings.get_database_url().startswith("mysql"):
+        try:
+            ensure_database_exists()
+        except Exception as e:
+            logger.warning(f"無法自動創建資料庫，將嘗試直接連接: {e}")
+    
+    # Create database tables
+    Base.metadata.create_all(bind=engine)
+    
+    # 执行数据库迁移（带版本号，已全部执行时只读取版本表；多个 worker 同时启动时由迁移锁保证只执行一次）
+    if settings.auto_migrate:
+        try:
+            run_migrations()
+        except Exception as e:
+            logger.warning(f"数据库迁移失败，但继续运行: {e}")
+    
+    # 初始化默认管理员账户
+    try:
+        init_admin_user()
+    except Exception as e:
+        logger.warning(f"初始化管理员账户失败，但继续运行: {e}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_startup_tasks()
+    print("啟動工作完成！")
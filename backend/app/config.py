@@ -15,6 +15,30 @@ class Settings(BaseSettings):
     db_password: str = ""
     db_name: str = "shopping-react-flask"
     
+    # 方式 3: 非同步引擎 URL（可選，未設定時由同步 URL 推導，pymysql -> aiomysql、sqlite -> aiosqlite）
+    async_database_url: Optional[str] = None
+    
+    # Connection Pool Configuration（每個 worker 進程、每個引擎各自一個連線池）
+    # 每個進程最多連線數 = pool_size + max_overflow；同步與非同步引擎各自計算
+    # 規劃時需滿足：進程數 × 引擎數 × (pool_size + max_overflow) < MySQL max_connections
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # 秒，等待可用連線的上限
+    db_pool_recycle: int = 300  # 秒，超過時間的連線在借出前重建
+    db_pool_pre_ping: bool = True  # 借出前執行 ping，避免使用已被 MySQL 關閉的連線
+    
+    # Event Loop Lag Monitor（記錄阻塞事件迴圈超過門檻的情況與當下進行中的請求）
+    loop_lag_monitor_enabled: bool = True
+    loop_lag_threshold_ms: float = 100.0
+    loop_lag_interval: float = 0.05  # 秒，取樣間隔
+    
+    # Startup Configuration
+    init_db_on_startup: bool = True  # worker 啟動後（lifespan）建立資料庫 / 資料表、執行遷移、初始化管理員；關閉後需在部署時執行 python -m app.bootstrap
+    
+    # Migration Configuration
+    auto_migrate: bool = True  # 啟動時檢查並執行未執行的遷移（已是最新時只讀取版本表）；關閉後需在部署時執行 python -m app.database_migration
+    migration_lock_timeout: int = 60  # 秒，等待其他進程完成遷移的上限
+    
     # Security Configuration
     secret_key: str = "your-secret-key-change-in-production"
     session_secret_key: str = "your-session-secret-key-change-in-production"
@@ -25,6 +49,57 @@ class Settings(BaseSettings):
     frontend_url: str = "http://localhost:3000"
     backend_url: str = "http://localhost:8000"
     
+    # Catalog Cache Configuration（/api/products 進程內快取）
+    catalog_cache_enabled: bool = True
+    catalog_cache_ttl: int = 30  # 秒
+    catalog_cache_max_entries: int = 512
+    
+    # Category Tree Snapshot（/api/categories 預先序列化的分類樹，每個 worker 各自一份）
+    category_tree_cache_enabled: bool = True
+    category_tree_cache_ttl: int = 300  # 秒，其他 worker 得知分類變更的最長延遲（目前 worker 的後台寫入立即重建）
+    
+    # Conditional GET（公開 GET 端點的 ETag / Last-Modified / 304，版本存於 content_versions 表）
+    conditional_get_enabled: bool = True
+    content_version_ttl: float = 1.0  # 秒，每個 worker 快取內容版本的時間（也是其他 worker 的後台寫入清除目前 worker 快取的最長延遲）
+    content_cache_max_age: int = 60  # 秒，Banner、新聞、FAQ、關於我們在瀏覽器中免驗證直接使用的時間
+    stock_version_interval: float = 30.0  # 秒，結帳扣減庫存（未售完）時遞增產品版本的最短間隔，前台庫存數字最多落後這段時間
+    
+    # Response Compression（動態壓縮 JSON / HTML 等回應；靜態檔優先使用 python -m app.precompress_static 產生的 .br / .gz）
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # bytes，小於此大小的回應不壓縮
+    compression_gzip_level: int = 6  # 1-9
+    compression_brotli_quality: int = 4  # 0-11，需要安裝 brotli 套件（未安裝時只使用 gzip）
+    
+    # Static Delivery（/static、/backend/static 與縮圖的檔案傳送方式，見 app/core/static_delivery.py）
+    static_delivery: str = "app"  # app（由 worker 傳送）/ x-accel（Nginx X-Accel-Redirect）/ x-sendfile（Apache mod_xsendfile、lighttpd）
+    static_accel_prefix: str = "/_static/"  # x-accel 時 Nginx internal location 的路徑，對應 app/static 目錄（見 deployment/nginx.conf）
+    
+    # Identity Cache Configuration（認證依賴的使用者快取，每個 worker 各自一份）
+    identity_cache_enabled: bool = True
+    identity_cache_ttl: int = 30  # 秒，快取項目的存活時間（使用者變更經由 content_versions 在 CONTENT_VERSION_TTL 秒內使所有 worker 的快取失效）
+    identity_cache_max_entries: int = 4096
+    
+    # Image Processing Configuration（後台上傳圖片的 WEBP 轉檔，每個 worker 各自一個進程池）
+    image_workers: int = 2  # 轉檔子進程數
+    image_queue_limit: int = 16  # 排隊中 + 執行中的轉檔工作上限，超過時返回 503
+    image_job_timeout: float = 30.0  # 秒，單張圖片轉檔逾時
+    image_max_pixels: int = 40_000_000  # 像素上限（寬 × 高），防止解壓縮炸彈
+    image_webp_preset: str = "balanced"  # fast / balanced / best
+    image_batch_max_files: int = 20  # 批量上传一次最多文件数
+    image_variant_widths: list[int] = [160, 320, 480, 640, 960, 1280]  # /backend/static/img/{width}/ 允許的寬度
+    image_thumbnail_widths: list[int] = [320, 640]  # 上傳後預先產生的縮圖寬度（產品列表使用）
+    image_variant_cache_max_mb: int = 512  # 縮圖快取目錄大小上限，超過時依最後使用時間淘汰
+    image_variant_dir: Optional[str] = None  # 縮圖快取目錄，預設為 app/static/uploads/.variants
+    
+    # Search Configuration（/api/products/search）
+    search_backend: str = "memory"  # memory（進程內倒排索引，每個 worker 各自一份）/ mysql（FULLTEXT ngram 索引，由遷移 0006 建立）
+    search_refresh_interval: float = 5.0  # 秒，memory 後端依 updated_at 同步其他 worker 寫入的間隔
+    search_description_chars: int = 200  # memory 後端索引的描述長度（控制記憶體用量）
+    search_warm_on_startup: bool = False  # worker 啟動時建立 memory 索引（10 萬個產品約 14 秒、180 MiB；否則在第一次搜尋時於背景建立）
+    suggest_enabled: bool = True  # worker 啟動時建立 /api/products/suggest 的前綴索引（關閉時建議永遠為空）
+    suggest_refresh_interval: float = 60.0  # 秒，背景增量同步前綴索引的間隔（其他 worker 的寫入與新增銷量）
+    suggest_rebuild_interval: float = 3600.0  # 秒，背景完整重建前綴索引的間隔（扣除取消訂單的銷量、更新分類產品數）
+    
     def get_server_url(self) -> str:
         """獲取 MySQL 伺服器 URL（不包含資料庫名稱），用於創建資料庫"""
         if self.database_url:
@@ -56,6 +131,20 @@ class Settings(BaseSettings):
         password_part = f":{self.db_password}" if self.db_password else ""
         return f"mysql+pymysql://{self.db_user}{password_part}@{self.db_host}:{self.db_port}/{self.db_name}"
     
+    def get_async_database_url(self) -> str:
+        """獲取非同步資料庫 URL，優先使用 ASYNC_DATABASE_URL，否則將同步驅動替換為對應的非同步驅動"""
+        if self.async_database_url:
+            return self.async_database_url
+        
+        url = self.get_database_url()
+        scheme, sep, rest = url.partition("://")
+        dialect = scheme.split("+", 1)[0]
+        if dialect == "mysql":
+            return f"mysql+aiomysql{sep}{rest}"
+        if dialect == "sqlite":
+            return f"sqlite+aiosqlite{sep}{rest}"
+        return url
+    
     def get_database_name(self) -> str:
         """獲取資料庫名稱"""
         if self.database_url:
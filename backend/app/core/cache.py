@@ -0,0 +1,117 @@
+"""
+進程內快取模組
+提供帶 TTL 與 LRU 上限的執行緒安全快取，供熱門唯讀端點使用
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.config import settings
+from app.core.content_version import CATEGORIES, PRODUCTS, content_versions
+
+_MISSING = object()
+
+
+class TTLCache:
+    """帶 TTL 與 LRU 上限的快取（每個 worker 進程各自一份）"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # clear() 時遞增，set() 以此判斷查詢期間快取是否被清除
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    @property
+    def version(self) -> int:
+        """目前的清除次數，查詢資料前讀取並傳給 set()"""
+        return self._version
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """讀取快取，過期或不存在時返回 default"""
+        if not self.enabled:
+            return default
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """
+        寫入快取，超過上限時淘汰最久未使用的項目
+        
+        version 為查詢資料前讀取的 self.version；期間快取被清除（資料已寫入）時不保存，內容可能是寫入前的資料
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                self.stale_writes += 1
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """清空快取（資料寫入後呼叫）"""
+        with self._lock:
+            self._data.clear()
+            self._version += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """快取命中統計，供 /health/cache 輸出"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_writes": self.stale_writes,
+            }
+
+
+# 產品目錄快取：key 為各端點的查詢參數 tuple（產品列表、搜尋、分類產品），值為序列化後的 JSON bytes（以 PrevalidatedJSONResponse 返回）；
+# 路由在查詢前讀取 catalog_cache.version 並傳給 set()，查詢期間被清除時不保存
+# 注意：每個 worker 各自持有快取，後台寫入只會清除當前 worker；其他 worker 在讀取到新的內容版本時清除
+# （公開端點的條件請求每 CONTENT_VERSION_TTL 秒讀取一次），最長依賴 TTL 過期
+catalog_cache = TTLCache(
+    maxsize=settings.catalog_cache_max_entries,
+    ttl=settings.catalog_cache_ttl,
+    enabled=settings.catalog_cache_enabled
+)
+content_versions.on_change(PRODUCTS, catalog_cache.clear)
+content_versions.on_change(CATEGORIES, catalog_cache.clear)
+
+
+def invalidate_catalog_cache() -> None:
+    """產品、產品圖片或分類變更後清除產品目錄快取"""
+    catalog_cache.clear()
@@ -0,0 +1,208 @@
+"""
+回應壓縮模組
+- CompressionMiddleware：依 Accept-Encoding 以 brotli / gzip 動態壓縮 JSON、HTML 等文字回應
+- PrecompressedStaticFiles / PrecompressedFileResponse：靜態檔與後台頁面優先提供預先壓縮的 .br / .gz 檔
+  （由 python -m app.precompress_static 產生），不在請求中壓縮
+
+brotli 為選用套件，未安裝時只使用 gzip（預先壓縮的 .br 檔不需要 brotli 套件即可提供）
+"""
+import gzip
+import os
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # 未安裝時只使用 gzip
+    brotli = None
+
+# 可壓縮的回應類型（圖片、字型等已壓縮的格式不處理）
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+    "text/xml",
+})
+
+# 預先壓縮檔的副檔名，依伺服器偏好排序（相同 q 值時優先使用 brotli）
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# 會產生預先壓縮檔的靜態檔類型
+PRECOMPRESSIBLE_EXTENSIONS = (".js", ".css", ".html", ".svg")
+
+# 超過此大小的回應在執行緒池中壓縮，避免阻塞事件迴圈
+THREADPOOL_MIN_SIZE = 64 * 1024
+
+
+def accepted_encodings(accept_encoding: Optional[str], supported: Sequence[str]) -> List[str]:
+    """Accept-Encoding 中可使用的編碼（q=0 排除），依 q 值再依 supported 的順序排序"""
+    if not accept_encoding:
+        return []
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    ranked = [(weights.get(name, wildcard), -index, name) for index, name in enumerate(supported)]
+    return [name for q, _, name in sorted(ranked, reverse=True) if q > 0]
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    return content_type.split(";", 1)[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+def add_vary_accept_encoding(headers: MutableHeaders) -> None:
+    """加上 Vary: Accept-Encoding（已有時不重複加入）"""
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in vary.lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    動態壓縮回應（純 ASGI 中介層）
+
+    只壓縮一次送出完整內容的回應（串流回應與分段傳送的檔案照原樣傳送）；
+    已有 Content-Encoding、類型不在 COMPRESSIBLE_TYPES 或小於 minimum_size 的回應不壓縮；
+    可壓縮類型的回應都會加上 Vary: Accept-Encoding，壓縮後的強 ETag 改為弱 ETag（內容位元組已不同）
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # 等到第一段內容才能決定是否壓縮
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if "content-encoding" in headers or not is_compressible(headers.get("content-type")):
+                await send(start)
+                await send(message)
+                return
+            
+            add_vary_accept_encoding(headers)
+            if encodings and not message.get("more_body", False) and len(body) >= self.minimum_size:
+                encoding = encodings[0]
+                if len(body) >= THREADPOOL_MIN_SIZE:
+                    body = await run_in_threadpool(compress, body, encoding, self.gzip_level, self.brotli_quality)
+                else:
+                    body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+        
+        await self.app(scope, receive, send_compressed)
+
+
+def find_precompressed(path: str, accept_encoding: Optional[str]) -> Optional[Tuple[str, os.stat_result, str]]:
+    """
+    返回客戶端可接受的預先壓縮檔 (路徑, stat, 編碼)，沒有時返回 None（會讀取檔案系統，需在執行緒池中呼叫）
+    
+    壓縮檔比原檔舊時（原檔修改後未重新產生）不使用
+    """
+    if not path.endswith(PRECOMPRESSIBLE_EXTENSIONS):
+        return None
+    encodings = accepted_encodings(accept_encoding, tuple(PRECOMPRESSED_SUFFIXES))
+    if not encodings:
+        return None
+    try:
+        source_mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    for encoding in encodings:
+        candidate = path + PRECOMPRESSED_SUFFIXES[encoding]
+        try:
+            stat_result = os.stat(candidate)
+        except OSError:
+            continue
+        if stat_result.st_mtime >= source_mtime:
+            return candidate, stat_result, encoding
+    return None
+
+
+class PrecompressedFileResponse(FileResponse):
+    """傳送檔案時改用客戶端可接受的預先壓縮檔（Content-Type 維持原檔類型），供後台頁面路由使用"""
+
+    async def __call__(self, scope, receive, send):
+        path = str(self.path)
+        if path.endswith(PRECOMPRESSIBLE_EXTENSIONS):
+            add_vary_accept_encoding(self.headers)
+            variant = await run_in_threadpool(find_precompressed, path, Headers(scope=scope).get("accept-encoding"))
+            if variant is not None:
+                self.path, self.stat_result, encoding = variant
+                self.set_stat_headers(self.stat_result)
+                self.headers["Content-Encoding"] = encoding
+        await super().__call__(scope, receive, send)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """依 Accept-Encoding 提供預先壓縮檔的 StaticFiles（ETag / 304 以實際傳送的檔案計算）"""
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or not str(response.path).endswith(PRECOMPRESSIBLE_EXTENSIONS):
+            return response
+        
+        add_vary_accept_encoding(response.headers)
+        variant = await run_in_threadpool(
+            find_precompressed, str(response.path), Headers(scope=scope).get("accept-encoding")
+        )
+        if variant is None:
+            return response
+        
+        full_path, stat_result, encoding = variant
+        encoded = self.file_response(full_path, stat_result, scope, response.status_code)
+        add_vary_accept_encoding(encoded.headers)
+        if isinstance(encoded, FileResponse):
+            encoded.headers["Content-Type"] = response.headers["content-type"]
+            encoded.headers["Content-Encoding"] = encoding
+        return encoded
@@ -0,0 +1,218 @@
+"""
+內容版本模組
+每類公開內容（產品、分類、Banner、新聞、FAQ、關於我們）在 content_versions 表中有一個寫入計數器，
+後台寫入提交後呼叫 bump_content_versions() 遞增；公開 GET 端點以版本產生 ETag / Last-Modified（見 app/core/http_cache.py）
+
+- 各 worker 快取讀取到的版本 CONTENT_VERSION_TTL 秒，快取期間的條件請求不訪問資料庫
+- 讀取到其他 worker 遞增的版本時，呼叫以 on_change() 註冊的函式清除目前 worker 的進程內快取，
+  其他 worker 的後台寫入在 CONTENT_VERSION_TTL 秒內生效，不必等待各快取的 TTL
+- users 不對應公開端點，供身分快取判斷快取的使用者是否已被修改（見 app/core/identity.py）
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.database import engine, get_async_engine
+from app.models.content_version import ContentVersion
+
+logger = logging.getLogger(__name__)
+
+# 內容類別
+PRODUCTS = "products"  # 產品、產品圖片、庫存（結帳扣減）
+CATEGORIES = "categories"
+ADS = "ads"
+NEWS = "news"
+FAQS = "faqs"
+ABOUT = "about"
+USERS = "users"  # 使用者資料、角色、狀態、密碼變更或刪除
+
+_VERSIONS_QUERY = select(ContentVersion.name, ContentVersion.version, ContentVersion.updated_at)
+
+
+class Version(NamedTuple):
+    version: int
+    updated_at: Optional[datetime]
+
+
+class ContentVersions:
+    """內容版本快取（每個 worker 進程各自一份）"""
+
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self._versions: Dict[str, Version] = {}
+        self._loaded = False
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._sync_lock = threading.Lock()
+        self._listeners: Dict[str, List[Callable[[], None]]] = {}
+        # bump_if_older() 略過的遞增：間隔到期時由計時器執行緒補上
+        self._deferred: Dict[str, threading.Timer] = {}
+        self._deferred_lock = threading.Lock()
+        self.loads = 0
+        self.bumps = 0
+        self.deferred_bumps = 0
+        self.changes = 0
+        self.not_modified = 0
+        self.served = 0
+
+    def on_change(self, name: str, callback: Callable[[], None]) -> None:
+        """註冊其他 worker 遞增 name 的版本時呼叫的函式（目前 worker 的寫入由後台路由自行清除快取）"""
+        self._listeners.setdefault(name, []).append(callback)
+
+    def _apply(self, versions: Dict[str, Version]) -> None:
+        previous, loaded = self._versions, self._loaded
+        self._versions = versions
+        self._loaded = True
+        self._expires_at = time.monotonic() + self.ttl
+        if not loaded:
+            return
+        for name, current in versions.items():
+            if name in previous and previous[name].version == current.version:
+                continue
+            self.changes += 1
+            for callback in self._listeners.get(name, ()):
+                callback()
+
+    async def current(self) -> Dict[str, Version]:
+        """返回所有類別的版本，快取過期時從資料庫重新讀取（同時只有一個請求讀取）"""
+        if self._expires_at > time.monotonic():
+            return self._versions
+        async with self._lock:
+            if self._expires_at > time.monotonic():
+                return self._versions
+            async with get_async_engine().connect() as conn:
+                rows = (await conn.execute(_VERSIONS_QUERY)).all()
+            self.loads += 1
+            self._apply({row.name: Version(row.version, row.updated_at) for row in rows})
+            return self._versions
+
+    def current_sync(self) -> Dict[str, Version]:
+        """current() 的同步版本，供在執行緒池中執行的同步依賴使用（以同步引擎讀取，與 current() 共用快取）"""
+        if self._expires_at > time.monotonic():
+            return self._versions
+        with self._sync_lock:
+            if self._expires_at > time.monotonic():
+                return self._versions
+            with engine.connect() as conn:
+                rows = conn.execute(_VERSIONS_QUERY).all()
+            self.loads += 1
+            self._apply({row.name: Version(row.version, row.updated_at) for row in rows})
+            return self._versions
+
+    def bump(self, *names: str) -> None:
+        """
+        遞增版本（後台寫入提交後呼叫，於同步路由中執行）
+        
+        在資料提交之後遞增：期間的請求可能以舊版本標記新資料，版本遞增後 ETag 改變，客戶端會重新取得；
+        反過來則可能以新版本標記舊資料並被客戶端長期保留
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            bumped = {}
+            for name in names:
+                bumped[name] = self._bump(name, now)
+        except Exception as e:
+            logger.warning(f"遞增內容版本失敗 {names}: {e}")
+            return
+        self._versions = {**self._versions, **bumped}
+        self.bumps += len(bumped)
+        # 之後的遞增已涵蓋先前略過的寫入
+        with self._deferred_lock:
+            for name in bumped:
+                timer = self._deferred.pop(name, None)
+                if timer is not None:
+                    timer.cancel()
+
+    def bump_if_older(self, name: str, max_age: float) -> bool:
+        """
+        版本最後遞增時間早於 max_age 秒前時才遞增，返回是否遞增（用於合併頻繁且不需立即生效的寫入）
+        
+        略過時在間隔到期後補上一次遞增（同一類別同時只排定一次），寫入最多延遲 max_age 秒生效；
+        以目前 worker 讀取到的版本判斷（最多落後 CONTENT_VERSION_TTL 秒），多個 worker 可能在同一時間各遞增一次
+        """
+        current = self._versions.get(name)
+        if current is not None and current.updated_at is not None:
+            updated_at = current.updated_at
+            # MySQL / SQLite 返回不含時區的 UTC 時間
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            remaining = max_age - (datetime.now(timezone.utc) - updated_at).total_seconds()
+            if remaining > 0:
+                self._defer(name, remaining)
+                return False
+        self.bump(name)
+        return True
+
+    def _defer(self, name: str, delay: float) -> None:
+        with self._deferred_lock:
+            if name in self._deferred:
+                return
+            timer = threading.Timer(delay, self._run_deferred, (name,))
+            timer.daemon = True
+            self._deferred[name] = timer
+            timer.start()
+
+    def _run_deferred(self, name: str) -> None:
+        with self._deferred_lock:
+            self._deferred.pop(name, None)
+        self.deferred_bumps += 1
+        self.bump(name)
+
+    def flush(self) -> None:
+        """立即執行所有排定的遞增（lifespan shutdown 時呼叫，避免 worker 結束時遺失）"""
+        with self._deferred_lock:
+            names = list(self._deferred)
+            for timer in self._deferred.values():
+                timer.cancel()
+            self._deferred.clear()
+        if names:
+            self.bump(*names)
+
+    def _bump(self, name: str, now: datetime) -> Version:
+        try:
+            return self._increment(name, now)
+        except IntegrityError:
+            # 另一個 worker 同時建立了這一列，重新以 UPDATE 遞增
+            return self._increment(name, now)
+
+    def _increment(self, name: str, now: datetime) -> Version:
+        with engine.begin() as conn:
+            result = conn.execute(
+                update(ContentVersion)
+                .where(ContentVersion.name == name)
+                .values(version=ContentVersion.version + 1, updated_at=now)
+            )
+            if not result.rowcount:
+                conn.execute(insert(ContentVersion).values(name=name, version=1, updated_at=now))
+                return Version(1, now)
+            version = conn.execute(select(ContentVersion.version).where(ContentVersion.name == name)).scalar()
+            return Version(version, now)
+
+    def stats(self) -> dict:
+        """版本與條件請求統計，供 /health/cache 輸出"""
+        return {
+            "versions": {name: version.version for name, version in sorted(self._versions.items())},
+            "ttl": self.ttl,
+            "loads": self.loads,
+            "bumps": self.bumps,
+            "deferred_bumps": self.deferred_bumps,
+            "pending": sorted(self._deferred),
+            "changes": self.changes,
+            "not_modified": self.not_modified,
+            "served": self.served,
+        }
+
+
+content_versions = ContentVersions(ttl=settings.content_version_ttl)
+
+
+def bump_content_versions(*names: str) -> None:
+    """後台寫入提交後呼叫，使對應公開端點的 ETag 失效"""
+    content_versions.bump(*names)
@@ -0,0 +1,129 @@
+"""
+連線池遙測模組
+統計連線池的借出、溢出、新建連線與等待時間，供 /health/db 輸出，
+用於依 MySQL max_connections 規劃 pool_size / max_overflow
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# 保留最近多少次借出的等待時間用於計算分位數
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PoolTelemetry:
+    """單一引擎的連線池統計（每個 worker 進程各自一份）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.wait_count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """記錄一次從連線池取得連線的等待時間"""
+        with self._lock:
+            self._waits.append(seconds)
+            self.wait_count += 1
+            self.total_wait += seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+            if timed_out:
+                self.timeouts += 1
+
+    def attach(self, engine: Any) -> None:
+        """在引擎上註冊連線池事件（AsyncEngine 需傳入 sync_engine）"""
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            pool = engine.pool
+            checked_out = pool.checkedout() if isinstance(pool, QueuePool) else 0
+            with self._lock:
+                self.checkouts += 1
+                if checked_out > self.peak_checked_out:
+                    self.peak_checked_out = checked_out
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checkins += 1
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self, pool: Any) -> dict:
+        """連線池即時狀態與累計統計"""
+        with self._lock:
+            waits = sorted(self._waits)
+            result = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_ms": {
+                    "avg": round(self.total_wait / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                    "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0,
+                    "max": round(self.max_wait * 1000, 3),
+                    "p95_samples": len(waits),
+                },
+            }
+        # QueuePool 系列才有容量資訊（SQLite 的 SingletonThreadPool / NullPool 沒有）
+        if isinstance(pool, QueuePool):
+            result.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+        return result
+
+
+def instrumented_pool_class(base: type, telemetry: PoolTelemetry) -> type:
+    """
+    建立會記錄等待時間的連線池類別
+
+    以類別屬性持有 telemetry，engine.dispose() 重建連線池（pool.recreate()）後仍沿用同一份統計
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return base._do_get(self)
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.telemetry.record_wait(time.perf_counter() - start, timed_out)
+
+    return type(f"Instrumented{base.__name__}", (base,), {"telemetry": telemetry, "_do_get": _do_get})
+
+
+def pool_stats(engine: Optional[Any], telemetry: PoolTelemetry) -> Optional[dict]:
+    """引擎尚未建立時返回 None"""
+    if engine is None:
+        return None
+    return telemetry.stats(engine.pool)
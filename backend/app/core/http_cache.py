@@ -0,0 +1,243 @@
+"""
+HTTP 快取模組
+- 預先序列化的回應快照（bytes + 強 ETag），以及 If-None-Match 條件請求的處理
+- 公開 GET 端點的條件請求中介層：以內容版本（app/core/content_version.py）產生 ETag / Last-Modified，
+  驗證通過時在執行路由之前返回 304
+
+快照的 ETag 由回應內容的雜湊產生，內容版本存於資料庫：不同 worker 對相同資料產生的 ETag 相同，
+客戶端在任何 worker 上都能得到 304
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.core.content_version import (
+    ABOUT, ADS, CATEGORIES, FAQS, NEWS, PRODUCTS, ContentVersions, Version, content_versions
+)
+
+logger = logging.getLogger(__name__)
+
+# 客戶端每次使用前都需向伺服器驗證（內容未變更時返回 304，不傳輸內容）
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 不常變更的內容：max-age 內直接使用本地副本，過期後以條件請求驗證
+CONTENT_CACHE_CONTROL = f"max-age={settings.content_cache_max_age}"
+
+
+class Snapshot(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    """以內容雜湊產生強 ETag"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否包含 etag（支援逗號分隔的多個值、* 與弱 ETag 前綴 W/，以弱比較判斷）"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+def snapshot_response(request: Request, snapshot: Snapshot, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    """返回快照內容，If-None-Match 符合時返回 304（不含內容）"""
+    headers = {"ETag": snapshot.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+class SnapshotCache:
+    """
+    單一快照快取（每個 worker 進程各自一份）
+
+    資料寫入後呼叫 invalidate()，下一次請求時重建；其他 worker 的寫入依賴 TTL 過期
+    同時有多個請求需要重建時只建立一次，其他請求等待結果
+    """
+
+    def __init__(self, ttl: float = 300.0, enabled: bool = True):
+        self.ttl = ttl
+        self.enabled = enabled
+        self._snapshot: Optional[Snapshot] = None
+        self._expires_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.builds = 0
+        self.invalidations = 0
+
+    def _current(self) -> Optional[Snapshot]:
+        if self._snapshot is not None and self._expires_at > time.monotonic():
+            return self._snapshot
+        return None
+
+    async def get(self, build: Callable[[], Awaitable[bytes]]) -> Snapshot:
+        """返回目前的快照，不存在或已過期時以 build() 產生的內容建立"""
+        snapshot = self._current() if self.enabled else None
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._current() if self.enabled else None
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+            version = self._version
+            body = await build()
+            snapshot = Snapshot(body, make_etag(body))
+            self.builds += 1
+            # 建立期間有寫入時不保存（內容可能是寫入前的資料）
+            if self.enabled and version == self._version:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self.ttl
+            return snapshot
+
+    def invalidate(self) -> None:
+        """資料寫入後呼叫"""
+        self._snapshot = None
+        self._version += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        """快照統計，供 /health/cache 輸出"""
+        return {
+            "enabled": self.enabled,
+            "cached": self._current() is not None,
+            "etag": self._snapshot.etag if self._snapshot is not None else None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "builds": self.builds,
+            "invalidations": self.invalidations,
+        }
+
+
+class RoutePolicy(NamedTuple):
+    """路徑對應的內容類別（ETag 由這些類別的版本組成）與 Cache-Control"""
+    pattern: re.Pattern
+    groups: Tuple[str, ...]
+    cache_control: str
+
+
+def _policy(pattern: str, groups: Tuple[str, ...], cache_control: str = REVALIDATE_CACHE_CONTROL) -> RoutePolicy:
+    return RoutePolicy(re.compile(pattern), groups, cache_control)
+
+
+# 依序比對，第一個符合的規則生效；groups 為空的規則表示不處理
+# 產品相關回應含庫存與分類名稱，每次使用前驗證；/api/categories 分類樹由快照處理，搜尋建議不查詢資料庫
+ROUTE_POLICIES = (
+    _policy(r"/api/products/suggest", ()),
+    _policy(r"/api/products(/.*)?", (PRODUCTS, CATEGORIES)),
+    _policy(r"/api/categories/.+", (PRODUCTS, CATEGORIES)),
+    _policy(r"/api/home/banners", (ADS,), CONTENT_CACHE_CONTROL),
+    _policy(r"/api/home/.+", (PRODUCTS, CATEGORIES)),
+    _policy(r"/api/ads", (ADS,), CONTENT_CACHE_CONTROL),
+    _policy(r"/api/news(/.*)?", (NEWS,), CONTENT_CACHE_CONTROL),
+    _policy(r"/api/faq", (FAQS,), CONTENT_CACHE_CONTROL),
+    _policy(r"/api/about", (ABOUT,), CONTENT_CACHE_CONTROL),
+)
+
+
+def match_policy(path: str) -> Optional[RoutePolicy]:
+    for policy in ROUTE_POLICIES:
+        if policy.pattern.fullmatch(path):
+            return policy if policy.groups else None
+    return None
+
+
+def version_validators(versions: Dict[str, Version], groups: Tuple[str, ...]) -> Tuple[str, Optional[datetime]]:
+    """
+    以各類別的版本產生弱 ETag（含遞增時間，資料庫重建後版本號重新計數也不會與舊 ETag 相同），
+    以及最後遞增時間（秒級，作為 Last-Modified；從未遞增的類別不影響）
+    """
+    parts = []
+    last_modified = None
+    for name in groups:
+        version, updated_at = versions.get(name, (0, None))
+        if updated_at is not None:
+            # MySQL / SQLite 返回不含時區的 UTC 時間
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            updated_at = updated_at.replace(microsecond=0)
+            last_modified = updated_at if last_modified is None else max(last_modified, updated_at)
+        parts.append(f"{version}.{int(updated_at.timestamp()) if updated_at else 0}")
+    return f'W/"{"-".join(parts)}"', last_modified
+
+
+def not_modified(headers: Headers, etag: str, last_modified: Optional[datetime]) -> bool:
+    """有 If-None-Match 時只比對 ETag；否則比對 If-Modified-Since（秒級精度）"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        return last_modified <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+class ConditionalGetMiddleware:
+    """
+    公開 GET 端點的條件請求（純 ASGI 中介層）
+
+    ETag / Last-Modified 由路徑對應內容類別的版本產生，不需要先產生回應內容：
+    驗證通過時直接返回 304，不執行路由的查詢與序列化；其他情況在 200 回應加上驗證標頭與 Cache-Control
+    讀取版本失敗時（資料庫異常）不處理，請求照常執行
+    """
+
+    def __init__(self, app, versions: ContentVersions = content_versions):
+        self.app = app
+        self.versions = versions
+
+    async def __call__(self, scope, receive, send):
+        policy = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            policy = match_policy(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        
+        try:
+            versions = await self.versions.current()
+        except Exception as e:
+            logger.warning(f"讀取內容版本失敗，略過條件請求處理: {e}")
+            await self.app(scope, receive, send)
+            return
+        
+        etag, last_modified = version_validators(versions, policy.groups)
+        validators = {"ETag": etag, "Cache-Control": policy.cache_control}
+        if last_modified is not None:
+            validators["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        
+        if not_modified(Headers(scope=scope), etag, last_modified):
+            self.versions.not_modified += 1
+            await Response(status_code=304, headers=validators)(scope, receive, send)
+            return
+        
+        self.versions.served += 1
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for name, value in validators.items():
+                    headers[name] = value
+            await send(message)
+        
+        await self.app(scope, receive, send_with_validators)
@@ -0,0 +1,73 @@
+"""
+身分快取模組
+每個 worker 進程以短 TTL 快取已登入使用者，認證依賴在命中時不查詢資料庫
+
+快取鍵為 (user_id, users 內容版本)；使用者資料、角色、狀態或密碼變更 / 刪除後呼叫 invalidate_user()
+遞增 content_versions 表中的 users 版本，舊版本的快取項目不再被讀取，隨 TTL / LRU 淘汰
+版本存於資料庫、各 worker 每 CONTENT_VERSION_TTL 秒讀取一次（見 app/core/content_version.py），
+停用、降級或刪除的帳號在所有 worker 上最多 CONTENT_VERSION_TTL 秒（預設 1 秒）後失效，不必等待 IDENTITY_CACHE_TTL
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.content_version import USERS, bump_content_versions, content_versions
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+identity_cache = TTLCache(
+    maxsize=settings.identity_cache_max_entries,
+    ttl=settings.identity_cache_ttl,
+    enabled=settings.identity_cache_enabled
+)
+
+
+def identity_key(user_id: int) -> Optional[tuple]:
+    """
+    使用者的快取鍵 (user_id, users 版本)，讀取版本失敗時返回 None（不使用快取）
+
+    需在查詢資料庫之前取得並用於寫入快取：查詢與寫入之間若有 invalidate_user()，
+    寫入的是舊版本的鍵，不會以新版本保存修改前的資料
+    """
+    try:
+        version = content_versions.current_sync().get(USERS)
+    except Exception as e:
+        logger.warning(f"讀取使用者版本失敗，略過身分快取: {e}")
+        return None
+    return (user_id, version.version if version else 0)
+
+
+def user_snapshot(user: User) -> User:
+    """
+    複製使用者欄位為不屬於任何 Session 的 detached 物件
+
+    快取的物件會被多個請求共用，不可直接快取某個請求 Session 中的實例；
+    detached 物件讀取欄位不會觸發查詢，存取關聯時會直接報錯而不是靜默返回空值
+    """
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def get_cached_user(key: Optional[tuple]) -> Optional[User]:
+    """以 identity_key() 的鍵讀取快取的使用者快照，未命中時返回 None"""
+    if key is None:
+        return None
+    return identity_cache.get(key)
+
+
+def cache_user(user: User, key: Optional[tuple]) -> User:
+    """以查詢前取得的鍵快取使用者快照並返回該快照"""
+    snapshot = user_snapshot(user)
+    if key is not None:
+        identity_cache.set(key, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int) -> None:
+    """使用者資料、角色、狀態或密碼變更 / 刪除提交後呼叫，使所有 worker 的身分快取失效"""
+    bump_content_versions(USERS)
@@ -0,0 +1,36 @@
+"""
+鍵控鎖模組
+同一個鍵（例如檔名）的工作在同一 worker 內依序執行，不同鍵互不影響
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, List
+
+
+class KeyedLocks:
+    """
+    每個鍵一把 asyncio.Lock，以引用計數（持有者 + 等待者）判斷何時移除
+
+    不可以 lock.locked() 判斷：release() 之後、等待者被喚醒之前鎖會短暫顯示為未鎖定，
+    此時移除會讓之後的請求取得另一把新鎖，與仍在等待的請求同時執行
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, List] = {}  # 鍵 -> [鎖, 引用數]
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,161 @@
+"""
+事件迴圈延遲監控模組
+定期排程一個短暫的 sleep，量測實際喚醒時間與預期時間的差距；差距超過門檻代表有程式碼同步阻塞了事件迴圈，
+此時記錄警告並列出當下正在處理的請求，方便找出在 async def 中執行同步 IO / CPU 工作的路由
+
+另有一個看門狗執行緒在阻塞期間擷取事件迴圈執行緒的呼叫堆疊，警告中會附上阻塞當下執行的程式碼位置
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 阻塞時擷取的堆疊層數（從最內層往外）
+STACK_LIMIT = 8
+
+
+class LoopLagMonitor:
+    """事件迴圈延遲監控（每個 worker 進程各自一份）"""
+
+    def __init__(self, threshold_ms: float = 100.0, interval: float = 0.05):
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._blocked: Optional[tuple[str, list[str]]] = None
+        self._lock = threading.Lock()
+        self._active: dict[int, tuple[str, str, float]] = {}
+        self.samples = 0
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self.last_stall: Optional[dict] = None
+
+    # 請求追蹤（由 LoopLagMiddleware 呼叫）
+    def request_started(self, key: int, method: str, path: str) -> None:
+        with self._lock:
+            self._active[key] = (method, path, time.monotonic())
+
+    def request_finished(self, key: int) -> None:
+        with self._lock:
+            self._active.pop(key, None)
+
+    def _active_requests(self) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                f"{method} {path} ({(now - started) * 1000:.0f} ms)"
+                for method, path, started in self._active.values()
+            ]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        while True:
+            self._heartbeat = time.monotonic()
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.samples += 1
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            if lag_ms >= self.threshold_ms:
+                self._report_stall(lag_ms)
+
+    def _report_stall(self, lag_ms: float) -> None:
+        self.stalls += 1
+        with self._lock:
+            blocked, self._blocked = self._blocked, None
+        # 優先使用看門狗在阻塞當下擷取的請求列表（喚醒時阻塞的請求通常已經結束）
+        stack, active = blocked if blocked else (None, self._active_requests())
+        self.last_stall = {"lag_ms": round(lag_ms, 1), "requests": active, "stack": stack}
+        logger.warning(
+            f"事件迴圈被阻塞 {lag_ms:.0f} ms（門檻 {self.threshold_ms:.0f} ms），"
+            f"進行中的請求: {', '.join(active) if active else '無'}"
+            + (f"\n阻塞位置:\n{stack}" if stack else "")
+        )
+
+    def _watch(self) -> None:
+        """看門狗執行緒：心跳停止超過門檻時擷取事件迴圈執行緒的呼叫堆疊與進行中的請求（每次阻塞只擷取一次）"""
+        threshold = self.threshold_ms / 1000
+        captured_for = None
+        while not self._stopping.wait(min(threshold / 2, self.interval)):
+            heartbeat = self._heartbeat
+            if heartbeat == captured_for or time.monotonic() - heartbeat < threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            captured_for = heartbeat
+            stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+            active = self._active_requests()
+            with self._lock:
+                self._blocked = (stack, active)
+
+    def start(self) -> None:
+        """在執行中的事件迴圈上啟動監控（lifespan startup 時呼叫）"""
+        if self._task is None or self._task.done():
+            self._heartbeat = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._stopping.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """停止監控（lifespan shutdown 時呼叫）"""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """延遲統計，供 /health/loop 輸出"""
+        return {
+            "enabled": self._task is not None,
+            "threshold_ms": self.threshold_ms,
+            "interval": self.interval,
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "last_stall": self.last_stall,
+            "in_flight": len(self._active),
+        }
+
+
+class LoopLagMiddleware:
+    """記錄進行中的請求，事件迴圈被阻塞時可列出可疑的路由（純 ASGI 中介層，不包裝回應）"""
+
+    def __init__(self, app, monitor: "LoopLagMonitor"):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        key = id(scope)
+        self.monitor.request_started(key, scope.get("method", ""), scope.get("path", ""))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.request_finished(key)
+
+
+loop_monitor = LoopLagMonitor(
+    threshold_ms=settings.loop_lag_threshold_ms,
+    interval=settings.loop_lag_interval
+)
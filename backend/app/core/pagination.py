@@ -0,0 +1,98 @@
+"""
+分頁工具模組
+提供 (created_at, id) 游標分頁（keyset）與預估總數，避免大表 OFFSET 與 COUNT(*) 隨資料量線性變慢
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_, text
+from sqlalchemy.orm import Session
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """將最後一筆記錄的 (created_at, id) 編碼為不透明的游標字串"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """解碼游標字串，格式錯誤時返回 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def apply_keyset(query: Any, model: Any, cursor: Optional[str]) -> Any:
+    """
+    套用游標分頁：依 (created_at DESC, id DESC) 排序，並從游標位置之後開始讀取
+
+    適用於 ORM Query 與 select() 語句（兩者都支援 filter / order_by）
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id)
+            )
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def split_keyset_page(rows: list, page_size: int) -> tuple[list, Optional[str]]:
+    """
+    切分多取一筆的查詢結果（limit = page_size + 1），返回 (當頁資料, 下一頁游標)
+
+    沒有下一頁時游標為 None
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def estimate_table_rows(db: Session, model: Any) -> Optional[int]:
+    """
+    從 MySQL 表統計資訊讀取預估行數（常數時間，不掃描資料表）
+
+    非 MySQL 資料庫或讀取失敗時返回 None
+    """
+    if db.get_bind().dialect.name != "mysql":
+        return None
+    try:
+        result = db.execute(
+            text(
+                "SELECT TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+            ),
+            {"table_name": model.__tablename__}
+        ).scalar()
+    except Exception:
+        return None
+    return int(result) if result is not None else None
+
+
+def count_total(db: Session, query: Any, model: Any, estimate: bool = False, filtered: bool = False) -> int:
+    """
+    計算列表總數
+
+    query 可為 ORM Query（呼叫 .count()）或計數用的 select() 語句
+    estimate=True 且沒有篩選條件時使用表統計的預估行數；有篩選條件或不支援預估時回到精確 COUNT
+    """
+    if estimate and not filtered:
+        estimated = estimate_table_rows(db, model)
+        if estimated is not None:
+            return estimated
+    if isinstance(query, Select):
+        return db.scalar(query) or 0
+    return query.count()
@@ -0,0 +1,54 @@
+"""
+JSON 回應類別
+- ORJSONResponse：以 orjson 取代標準庫 json 序列化；是否作為應用的預設回應類別依 FastAPI 版本決定（見 default_response_options()）
+- PrevalidatedJSONResponse：路由已驗證的 Pydantic 模型或已序列化的 JSON bytes 直接輸出，不經過 response_model 的驗證與序列化
+"""
+import inspect
+from typing import Any
+
+import orjson
+import pydantic_core
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from pydantic import BaseModel
+from starlette.responses import Response
+
+# 新版 FastAPI 在使用預設回應類別時，宣告 response_model 的路由由 Pydantic（Rust）直接輸出 JSON bytes；
+# 設定任何自訂的預設回應類別都會關閉這條路徑，改為先轉成 dict 再序列化，反而較慢（見 benchmarks/bench_responses.py）
+PYDANTIC_JSON_FAST_PATH = "dump_json" in inspect.signature(serialize_response).parameters
+
+
+class ORJSONResponse(JSONResponse):
+    """以 orjson 序列化的 JSONResponse（輸出與 JSONResponse 相同：UTF-8、不跳脫非 ASCII 字元、無多餘空白）"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class PrevalidatedJSONResponse(Response):
+    """
+    已驗證內容的 JSON 回應：content 為 Pydantic 模型（或模型列表）時由 pydantic-core 直接輸出 JSON bytes，
+    為 bytes 時（例如快取的序列化結果）原樣傳送
+
+    路由返回 Response 時 FastAPI 不再以 response_model 驗證與序列化返回值；路由仍宣告 response_model，OpenAPI 不變。
+    只用於內容已是 response_model 型別（例如 serialize_products() 的結果）的路由，否則輸出不會經過任何檢查
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return pydantic_core.to_json(content)
+
+
+def default_response_options() -> dict:
+    """
+    create_app() 建立 FastAPI 時的回應類別參數
+    
+    有 Pydantic JSON 快速路徑時保留 FastAPI 的預設值；舊版 FastAPI 所有回應都經過 json.dumps，改用 ORJSONResponse
+    """
+    if PYDANTIC_JSON_FAST_PATH:
+        return {}
+    return {"default_response_class": ORJSONResponse}
@@ -0,0 +1,109 @@
+"""
+靜態檔傳送模組
+/static、/backend/static 與上傳圖片縮圖的檔案傳送方式（STATIC_DELIVERY）：
+- app：由 Python worker 讀取並傳送檔案（依 Accept-Encoding 提供預先壓縮檔，見 app/core/compression.py）
+- x-accel：worker 只返回 X-Accel-Redirect 標頭，由 Nginx 的 internal location 傳送檔案（見 deployment/nginx.conf）
+- x-sendfile：worker 只返回 X-Sendfile 標頭（檔案絕對路徑），由 Apache mod_xsendfile / lighttpd 傳送檔案
+
+路徑檢查、404 與縮圖產生仍由 worker 處理，檔案內容不經過 worker；
+上傳圖片與縮圖以內容雜湊 / UUID 命名，同一 URL 的內容永遠不變，回應帶 immutable 的 Cache-Control，
+其他靜態檔（後台 js、css、HTML）檔名不含指紋，每次使用前以 ETag / Last-Modified 驗證
+"""
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from starlette.responses import Response
+
+from app.config import settings
+from app.core.compression import PrecompressedStaticFiles
+from app.core.http_cache import REVALIDATE_CACHE_CONTROL
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+
+STATIC_DELIVERY_MODES = ("app", "x-accel", "x-sendfile")
+
+# 檔名含內容指紋的 URL 可讓瀏覽器與 CDN 永久快取
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 檔名為內容雜湊 / UUID 的目錄（相對於 static 目錄，包含 uploads/.variants 縮圖快取）
+FINGERPRINTED_DIRS = ("uploads/",)
+
+
+class StaticDelivery:
+    """依傳送方式產生檔案回應（root 之外的檔案一律由 worker 傳送）"""
+
+    def __init__(self, mode: str, root: Path = STATIC_DIR, accel_prefix: str = "/_static/"):
+        if mode not in STATIC_DELIVERY_MODES:
+            raise ValueError(f"Unknown static delivery mode: {mode} (choose from {', '.join(STATIC_DELIVERY_MODES)})")
+        self.mode = mode
+        # StaticFiles 以 realpath 解析檔案路徑，root 同樣解析後再比較
+        self.root = os.path.realpath(root)
+        self.accel_prefix = accel_prefix.rstrip("/") + "/"
+        self.offloaded = 0
+
+    def relative_path(self, full_path) -> Optional[str]:
+        """檔案相對於 root 的路徑（以 / 分隔），不在 root 之下時返回 None"""
+        path = os.path.abspath(full_path)
+        if os.path.commonpath((self.root, path)) != self.root:
+            return None
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def cache_control(self, full_path) -> str:
+        relative = self.relative_path(full_path)
+        if relative is not None and relative.startswith(FINGERPRINTED_DIRS):
+            return IMMUTABLE_CACHE_CONTROL
+        return REVALIDATE_CACHE_CONTROL
+
+    def offload(self, full_path, cache_control: Optional[str] = None) -> Optional[Response]:
+        """
+        返回交由前端伺服器傳送檔案的空回應，app 模式或檔案不在 root 之下時返回 None（由 worker 傳送）
+        
+        Content-Type、ETag、Last-Modified、Range 與條件請求由前端伺服器依實際檔案處理，Cache-Control 由此回應帶出
+        """
+        if self.mode == "app":
+            return None
+        relative = self.relative_path(full_path)
+        if relative is None:
+            return None
+        
+        headers = {"Cache-Control": cache_control or self.cache_control(full_path)}
+        if self.mode == "x-accel":
+            headers["X-Accel-Redirect"] = quote(self.accel_prefix + relative)
+        else:
+            headers["X-Sendfile"] = os.path.abspath(full_path)
+        self.offloaded += 1
+        return Response(headers=headers)
+
+    def stats(self) -> dict:
+        """傳送方式與次數統計，供 /health/images 輸出"""
+        return {
+            "mode": self.mode,
+            "accel_prefix": self.accel_prefix if self.mode == "x-accel" else None,
+            "offloaded": self.offloaded,
+        }
+
+
+class DeliveredStaticFiles(PrecompressedStaticFiles):
+    """
+    依 StaticDelivery 傳送檔案的 StaticFiles（路徑檢查、目錄與 404 處理與 StaticFiles 相同）
+
+    app 模式的檔案回應與 304 加上 Cache-Control；x-accel / x-sendfile 模式找到檔案時只返回標頭，
+    預先壓縮檔由前端伺服器處理（Nginx gzip_static / brotli_static）
+    """
+
+    def __init__(self, *, delivery: StaticDelivery, **kwargs):
+        super().__init__(**kwargs)
+        self.delivery = delivery
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        offloaded = self.delivery.offload(full_path)
+        if offloaded is not None:
+            return offloaded
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = self.delivery.cache_control(full_path)
+        return response
+
+
+static_delivery = StaticDelivery(settings.static_delivery, STATIC_DIR, settings.static_accel_prefix)
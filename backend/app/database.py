@@ -1,8 +1,11 @@
 from sqlalchemy import create_engine, text, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from datetime import datetime, timezone
 from app.config import settings
+from app.core.db_pool import PoolTelemetry, instrumented_pool_class
 import logging
 import re
 
@@ -72,19 +75,38 @@ def ensure_database_exists():
         server_engine.dispose()
 
 
-# 確保資料庫存在
-try:
-    ensure_database_exists()
-except Exception as e:
-    logger.warning(f"無法自動創建資料庫，將嘗試直接連接: {e}")
+def get_pool_options(url: str, pool_class: type, telemetry: PoolTelemetry) -> dict:
+    """
+    依設定建立連線池參數
+
+    SQLite 沿用 SQLAlchemy 預設連線池（檔案 / 記憶體資料庫不適用 QueuePool 容量設定）
+    """
+    if url.startswith("sqlite"):
+        return {
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+        }
+    return {
+        "poolclass": instrumented_pool_class(pool_class, telemetry),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+# 連線池統計（供 /health/db 輸出）
+pool_telemetry = PoolTelemetry()
+async_pool_telemetry = PoolTelemetry()
 
 # Create database engine
 engine = create_engine(
     settings.get_database_url(),
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=False  # Set to True for SQL query logging
+    echo=False,  # Set to True for SQL query logging
+    **get_pool_options(settings.get_database_url(), QueuePool, pool_telemetry)
 )
+pool_telemetry.attach(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -97,3 +119,56 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# 非同步引擎（供前台唯讀路由使用），首次使用時才創建，未安裝非同步驅動時不影響同步路由
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """獲取非同步資料庫引擎（aiomysql；SQLite 使用 aiosqlite）"""
+    global _async_engine
+    if _async_engine is None:
+        async_url = settings.get_async_database_url()
+        _async_engine = create_async_engine(
+            async_url,
+            echo=False,
+            **get_pool_options(async_url, AsyncAdaptedQueuePool, async_pool_telemetry)
+        )
+        async_pool_telemetry.attach(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_engine_if_created():
+    """返回已建立的非同步引擎，尚未建立時返回 None（不觸發建立）"""
+    return _async_engine
+
+
+async def dispose_async_engine():
+    """關閉非同步引擎的連線池（應用關閉時呼叫）"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
+def get_async_session_factory():
+    """獲取非同步 Session 工廠"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        # expire_on_commit=False：提交後仍可讀取已載入的屬性，避免在 await 之外觸發隱式 IO
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+# Dependency to get async database session
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
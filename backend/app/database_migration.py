@@ -1,258 +1,388 @@
 """
-数据库迁移脚本 - 添加 User 表的 role 和 status 字段，以及 ProductCategory 表的 sort_order 字段，以及 Product 表的 is_hot 字段
+数据库迁移脚本 - 带版本号的迁移执行器
+
+各迁移函数（添加 User 表的 role 和 status 字段，以及 ProductCategory 表的 sort_order 字段，以及 Product 表的 is_hot 字段，以及用户地址字段，以及游标分页索引，以及产品全文搜索索引，以及分类物化路径）
+按版本号登记在 MIGRATIONS 中，执行成功后写入 schema_migrations 表，不再在每个 worker 启动时重复检查表结构
+
+- 所有迁移共用主引擎（app.database.engine）的同一个连接，不再为每个迁移创建临时引擎
+- MySQL 下以 GET_LOCK 保证多个 worker 同时启动时只有一个进程执行迁移
+- 所有版本都已执行时只读取版本表即返回，不获取锁
+
+部署时执行一次：python -m app.database_migration
 """
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, inspect, select, text
 from app.config import settings
+from app.database import engine as default_engine
+from app.services.category_tree import rebuild_paths
 import logging
 
 logger = logging.getLogger(__name__)
 
+# MySQL 命名锁名称（GET_LOCK 为服务器级别，同一数据库的所有进程共用）
+MIGRATION_LOCK_NAME = f"schema_migrations:{settings.get_database_name()}"
+
+# 已执行迁移记录表（不放在 Base.metadata 中，由迁移执行器自行创建）
+migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", String(64), primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
 
-def add_user_role_status_columns():
+def add_user_role_status_columns(conn):
     """为 users 表添加 role 和 status 字段"""
-    engine = create_engine(
-        settings.get_database_url(),
-        pool_pre_ping=True,
-        echo=False
-    )
+    # 检查表是否存在
+    inspector = inspect(conn)
+    if 'users' not in inspector.get_table_names():
+        logger.warning("users 表不存在，跳过迁移")
+        return
     
-    try:
-        with engine.connect() as conn:
-            # 检查表是否存在
-            inspector = inspect(engine)
-            if 'users' not in inspector.get_table_names():
-                logger.warning("users 表不存在，跳过迁移")
-                return
-            
-            # 检查字段是否已存在
-            columns = [col['name'] for col in inspector.get_columns('users')]
-            
-            # 添加 role 字段（如果不存在）
-            if 'role' not in columns:
-                logger.info("添加 role 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN role ENUM('admin', 'store_manager', 'customer') 
-                    NOT NULL DEFAULT 'customer' 
-                    AFTER password_hash
-                """))
-                # 检查索引是否已存在
-                indexes = [idx['name'] for idx in inspector.get_indexes('users')]
-                if 'idx_users_role' not in indexes:
-                    conn.execute(text("ALTER TABLE users ADD INDEX idx_users_role (role)"))
-                conn.commit()
-                logger.info("role 字段添加成功")
-            else:
-                logger.info("role 字段已存在，跳过")
-            
-            # 添加 status 字段（如果不存在）
-            if 'status' not in columns:
-                logger.info("添加 status 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN status ENUM('active', 'inactive') 
-                    NOT NULL DEFAULT 'active' 
-                    AFTER role
-                """))
-                # 检查索引是否已存在
-                indexes = [idx['name'] for idx in inspector.get_indexes('users')]
-                if 'idx_users_status' not in indexes:
-                    conn.execute(text("ALTER TABLE users ADD INDEX idx_users_status (status)"))
-                conn.commit()
-                logger.info("status 字段添加成功")
-            else:
-                logger.info("status 字段已存在，跳过")
-                
-    except Exception as e:
-        logger.error(f"迁移失败: {e}")
-        raise
-    finally:
-        engine.dispose()
-
-
-def add_category_sort_order_column():
+    # 检查字段是否已存在
+    columns = [col['name'] for col in inspector.get_columns('users')]
+    
+    # 添加 role 字段（如果不存在）
+    if 'role' not in columns:
+        logger.info("添加 role 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN role ENUM('admin', 'store_manager', 'customer') 
+            NOT NULL DEFAULT 'customer' 
+            AFTER password_hash
+        """))
+        # 检查索引是否已存在
+        indexes = [idx['name'] for idx in inspector.get_indexes('users')]
+        if 'idx_users_role' not in indexes:
+            conn.execute(text("ALTER TABLE users ADD INDEX idx_users_role (role)"))
+        conn.commit()
+        logger.info("role 字段添加成功")
+    else:
+        logger.info("role 字段已存在，跳过")
+    
+    # 添加 status 字段（如果不存在）
+    if 'status' not in columns:
+        logger.info("添加 status 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN status ENUM('active', 'inactive') 
+            NOT NULL DEFAULT 'active' 
+            AFTER role
+        """))
+        # 检查索引是否已存在
+        indexes = [idx['name'] for idx in inspector.get_indexes('users')]
+        if 'idx_users_status' not in indexes:
+            conn.execute(text("ALTER TABLE users ADD INDEX idx_users_status (status)"))
+        conn.commit()
+        logger.info("status 字段添加成功")
+    else:
+        logger.info("status 字段已存在，跳过")
+
+
+def add_category_sort_order_column(conn):
     """为 product_categories 表添加 sort_order 字段"""
-    engine = create_engine(
-        settings.get_database_url(),
-        pool_pre_ping=True,
-        echo=False
-    )
+    # 检查表是否存在
+    inspector = inspect(conn)
+    if 'product_categories' not in inspector.get_table_names():
+        logger.warning("product_categories 表不存在，跳过迁移")
+        return
     
-    try:
-        with engine.connect() as conn:
-            # 检查表是否存在
-            inspector = inspect(engine)
-            if 'product_categories' not in inspector.get_table_names():
-                logger.warning("product_categories 表不存在，跳过迁移")
-                return
-            
-            # 检查字段是否已存在
-            columns = [col['name'] for col in inspector.get_columns('product_categories')]
-            
-            # 添加 sort_order 字段（如果不存在）
-            if 'sort_order' not in columns:
-                logger.info("添加 sort_order 字段...")
-                conn.execute(text("""
-                    ALTER TABLE product_categories 
-                    ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0
-                    AFTER description
-                """))
-                conn.commit()
-                logger.info("sort_order 字段添加成功")
-                
-                # 检查索引是否已存在
-                indexes = [idx['name'] for idx in inspector.get_indexes('product_categories')]
-                if 'ix_product_categories_sort_order' not in indexes:
-                    logger.info("添加 sort_order 索引...")
-                    conn.execute(text("CREATE INDEX ix_product_categories_sort_order ON product_categories(sort_order)"))
-                    conn.commit()
-                    logger.info("sort_order 索引添加成功")
-                else:
-                    logger.info("sort_order 索引已存在，跳过")
-            else:
-                logger.info("sort_order 字段已存在，跳过")
-                
-    except Exception as e:
-        logger.error(f"迁移失败: {e}")
-        raise
-    finally:
-        engine.dispose()
-
-
-def add_product_is_hot_column():
+    # 检查字段是否已存在
+    columns = [col['name'] for col in inspector.get_columns('product_categories')]
+    
+    # 添加 sort_order 字段（如果不存在）
+    if 'sort_order' not in columns:
+        logger.info("添加 sort_order 字段...")
+        conn.execute(text("""
+            ALTER TABLE product_categories 
+            ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0
+            AFTER description
+        """))
+        conn.commit()
+        logger.info("sort_order 字段添加成功")
+    
+        # 检查索引是否已存在
+        indexes = [idx['name'] for idx in inspector.get_indexes('product_categories')]
+        if 'ix_product_categories_sort_order' not in indexes:
+            logger.info("添加 sort_order 索引...")
+            conn.execute(text("CREATE INDEX ix_product_categories_sort_order ON product_categories(sort_order)"))
+            conn.commit()
+            logger.info("sort_order 索引添加成功")
+        else:
+            logger.info("sort_order 索引已存在，跳过")
+    else:
+        logger.info("sort_order 字段已存在，跳过")
+
+
+def add_product_is_hot_column(conn):
     """为 products 表添加 is_hot 字段"""
-    engine = create_engine(
-        settings.get_database_url(),
-        pool_pre_ping=True,
-        echo=False
-    )
+    # 检查表是否存在
+    inspector = inspect(conn)
+    if 'products' not in inspector.get_table_names():
+        logger.warning("products 表不存在，跳过迁移")
+        return
     
-    try:
-        with engine.begin() as conn:
-            # 检查表是否存在
-            inspector = inspect(engine)
-            if 'products' not in inspector.get_table_names():
-                logger.warning("products 表不存在，跳过迁移")
-                return
-            
-            # 检查字段是否已存在
-            columns = [col['name'] for col in inspector.get_columns('products')]
-            
-            # 添加 is_hot 字段（如果不存在）
-            if 'is_hot' not in columns:
-                logger.info("添加 is_hot 字段...")
-                conn.execute(text("""
-                    ALTER TABLE products 
-                    ADD COLUMN is_hot BOOLEAN NOT NULL DEFAULT FALSE
-                    AFTER is_active
-                """))
-                logger.info("is_hot 字段添加成功")
-            else:
-                logger.info("is_hot 字段已存在，跳过")
-                
-    except Exception as e:
-        logger.error(f"迁移失败: {e}")
-        raise
-    finally:
-        engine.dispose()
-
-
-def add_user_address_fields():
+    # 检查字段是否已存在
+    columns = [col['name'] for col in inspector.get_columns('products')]
+    
+    # 添加 is_hot 字段（如果不存在）
+    if 'is_hot' not in columns:
+        logger.info("添加 is_hot 字段...")
+        conn.execute(text("""
+            ALTER TABLE products 
+            ADD COLUMN is_hot BOOLEAN NOT NULL DEFAULT FALSE
+            AFTER is_active
+        """))
+        conn.commit()
+        logger.info("is_hot 字段添加成功")
+    else:
+        logger.info("is_hot 字段已存在，跳过")
+
+
+def add_user_address_fields(conn):
     """为 users 表添加 address, phone, county, district, zipcode 字段"""
-    engine = create_engine(
-        settings.get_database_url(),
-        pool_pre_ping=True,
-        echo=False
-    )
+    # 检查表是否存在
+    inspector = inspect(conn)
+    if 'users' not in inspector.get_table_names():
+        logger.warning("users 表不存在，跳过迁移")
+        return
     
-    try:
-        with engine.connect() as conn:
-            # 检查表是否存在
-            inspector = inspect(engine)
-            if 'users' not in inspector.get_table_names():
-                logger.warning("users 表不存在，跳过迁移")
-                return
-            
-            # 检查字段是否已存在
-            columns = [col['name'] for col in inspector.get_columns('users')]
-            
-            # 添加 phone 字段（如果不存在）
-            if 'phone' not in columns:
-                logger.info("添加 phone 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN phone VARCHAR(20) NULL
-                    AFTER status
-                """))
-                conn.commit()
-                logger.info("phone 字段添加成功")
-            else:
-                logger.info("phone 字段已存在，跳过")
-            
-            # 添加 address 字段（如果不存在）
-            if 'address' not in columns:
-                logger.info("添加 address 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN address VARCHAR(500) NULL
-                    AFTER phone
-                """))
-                conn.commit()
-                logger.info("address 字段添加成功")
-            else:
-                logger.info("address 字段已存在，跳过")
-            
-            # 添加 county 字段（如果不存在）
-            if 'county' not in columns:
-                logger.info("添加 county 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN county VARCHAR(50) NULL
-                    AFTER address
-                """))
-                conn.commit()
-                logger.info("county 字段添加成功")
-            else:
-                logger.info("county 字段已存在，跳过")
-            
-            # 添加 district 字段（如果不存在）
-            if 'district' not in columns:
-                logger.info("添加 district 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN district VARCHAR(50) NULL
-                    AFTER county
-                """))
-                conn.commit()
-                logger.info("district 字段添加成功")
-            else:
-                logger.info("district 字段已存在，跳过")
+    # 检查字段是否已存在
+    columns = [col['name'] for col in inspector.get_columns('users')]
+    
+    # 添加 phone 字段（如果不存在）
+    if 'phone' not in columns:
+        logger.info("添加 phone 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN phone VARCHAR(20) NULL
+            AFTER status
+        """))
+        conn.commit()
+        logger.info("phone 字段添加成功")
+    else:
+        logger.info("phone 字段已存在，跳过")
+    
+    # 添加 address 字段（如果不存在）
+    if 'address' not in columns:
+        logger.info("添加 address 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN address VARCHAR(500) NULL
+            AFTER phone
+        """))
+        conn.commit()
+        logger.info("address 字段添加成功")
+    else:
+        logger.info("address 字段已存在，跳过")
+    
+    # 添加 county 字段（如果不存在）
+    if 'county' not in columns:
+        logger.info("添加 county 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN county VARCHAR(50) NULL
+            AFTER address
+        """))
+        conn.commit()
+        logger.info("county 字段添加成功")
+    else:
+        logger.info("county 字段已存在，跳过")
+    
+    # 添加 district 字段（如果不存在）
+    if 'district' not in columns:
+        logger.info("添加 district 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN district VARCHAR(50) NULL
+            AFTER county
+        """))
+        conn.commit()
+        logger.info("district 字段添加成功")
+    else:
+        logger.info("district 字段已存在，跳过")
+    
+    # 添加 zipcode 字段（如果不存在）
+    if 'zipcode' not in columns:
+        logger.info("添加 zipcode 字段...")
+        conn.execute(text("""
+            ALTER TABLE users 
+            ADD COLUMN zipcode VARCHAR(10) NULL
+            AFTER district
+        """))
+        conn.commit()
+        logger.info("zipcode 字段添加成功")
+    else:
+        logger.info("zipcode 字段已存在，跳过")
+
+
+def add_keyset_pagination_indexes(conn):
+    """为 products、orders、users 表添加 (created_at, id) 复合索引，供游标分页使用"""
+    inspector = inspect(conn)
+    table_names = inspector.get_table_names()
+    
+    for table_name in ("products", "orders", "users"):
+        # 检查表是否存在
+        if table_name not in table_names:
+            logger.warning(f"{table_name} 表不存在，跳过迁移")
+            continue
+    
+        # 检查索引是否已存在
+        index_name = f"ix_{table_name}_created_at_id"
+        indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
+        if index_name not in indexes:
+            logger.info(f"添加 {index_name} 索引...")
+            conn.execute(text(f"CREATE INDEX {index_name} ON {table_name}(created_at, id)"))
+            conn.commit()
+            logger.info(f"{index_name} 索引添加成功")
+        else:
+            logger.info(f"{index_name} 索引已存在，跳过")
+
+
+def add_product_fulltext_indexes(conn):
+    """为 products 表添加 FULLTEXT 索引（ngram 解析器），供 SEARCH_BACKEND=mysql 使用（仅 MySQL）"""
+    if conn.dialect.name != "mysql":
+        logger.info("非 MySQL 数据库，跳过 FULLTEXT 索引")
+        return
+    
+    inspector = inspect(conn)
+    if 'products' not in inspector.get_table_names():
+        logger.warning("products 表不存在，跳过迁移")
+        return
+    
+    # 检查索引是否已存在
+    indexes = [idx['name'] for idx in inspector.get_indexes('products')]
+    for index_name, columns in (
+        ("ft_products_title", "title"),
+        ("ft_products_title_description", "title, description"),
+    ):
+        if index_name not in indexes:
+            logger.info(f"添加 {index_name} 索引...")
+            conn.execute(text(f"ALTER TABLE products ADD FULLTEXT INDEX {index_name} ({columns}) WITH PARSER ngram"))
+            conn.commit()
+            logger.info(f"{index_name} 索引添加成功")
+        else:
+            logger.info(f"{index_name} 索引已存在，跳过")
+
+
+def add_category_path_column(conn):
+    """为 product_categories 表添加 path 字段（物化路径）并依 parent_id 回填"""
+    # 检查表是否存在
+    inspector = inspect(conn)
+    if 'product_categories' not in inspector.get_table_names():
+        logger.warning("product_categories 表不存在，跳过迁移")
+        return
+    
+    # 检查字段是否已存在
+    columns = [col['name'] for col in inspector.get_columns('product_categories')]
+    if 'path' not in columns:
+        logger.info("添加 path 字段...")
+        conn.execute(text("ALTER TABLE product_categories ADD COLUMN path VARCHAR(255) NOT NULL DEFAULT ''"))
+        conn.commit()
+        logger.info("path 字段添加成功")
+    else:
+        logger.info("path 字段已存在，跳过")
+    
+    # 检查索引是否已存在
+    indexes = [idx['name'] for idx in inspect(conn).get_indexes('product_categories')]
+    if 'ix_product_categories_path' not in indexes:
+        logger.info("添加 path 索引...")
+        conn.execute(text("CREATE INDEX ix_product_categories_path ON product_categories(path)"))
+        conn.commit()
+        logger.info("path 索引添加成功")
+    
+    # 回填路径（已正确的不更新）
+    updated = rebuild_paths(conn)
+    conn.commit()
+    logger.info(f"分类路径回填完成，更新 {updated} 个分类")
+
+
+# 迁移列表：(版本号, 说明, 迁移函数)
+# 只能在末尾追加，已发布的版本号不可修改；迁移函数需可重复执行（首次接入版本表时会对既有数据库全部重跑一次）
+MIGRATIONS = [
+    ("0001", "users 表 role、status 字段", add_user_role_status_columns),
+    ("0002", "product_categories 表 sort_order 字段", add_category_sort_order_column),
+    ("0003", "products 表 is_hot 字段", add_product_is_hot_column),
+    ("0004", "users 表地址字段", add_user_address_fields),
+    ("0005", "products、orders、users 表 (created_at, id) 游标分页索引", add_keyset_pagination_indexes),
+    ("0006", "products 表 FULLTEXT (ngram) 搜索索引", add_product_fulltext_indexes),
+    ("0007", "product_categories 表 path 字段（物化路径）", add_category_path_column),
+]
+
+
+def get_applied_versions(conn) -> set:
+    """读取已执行的迁移版本号（版本表不存在时返回空集合）"""
+    if not inspect(conn).has_table(schema_migrations.name):
+        return set()
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def get_pending_migrations(conn) -> list:
+    """返回尚未执行的迁移"""
+    applied = get_applied_versions(conn)
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+
+def _acquire_lock(conn) -> bool:
+    """获取迁移锁（仅 MySQL；SQLite 等开发环境为单进程，直接返回 True）"""
+    if conn.dialect.name != "mysql":
+        return True
+    acquired = conn.execute(
+        text("SELECT GET_LOCK(:name, :timeout)"),
+        {"name": MIGRATION_LOCK_NAME, "timeout": settings.migration_lock_timeout}
+    ).scalar()
+    return acquired == 1
+
+
+def _release_lock(conn) -> None:
+    """释放迁移锁"""
+    if conn.dialect.name == "mysql":
+        conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+
+
+def run_migrations(engine=None) -> list:
+    """
+    执行尚未执行的迁移，返回本次执行的版本号列表
+
+    其他进程正在迁移时会等待锁（最多 MIGRATION_LOCK_TIMEOUT 秒），取得锁后重新检查，已由其他进程完成的版本不会重复执行
+    """
+    engine = engine or default_engine
+    with engine.connect() as conn:
+        # 快速路径：所有版本都已执行时直接返回，不获取锁
+        pending = get_pending_migrations(conn)
+        conn.commit()
+        if not pending:
+            logger.info("数据库迁移已是最新，跳过")
+            return []
+        
+        if not _acquire_lock(conn):
+            raise RuntimeError(f"等待迁移锁超时（{settings.migration_lock_timeout} 秒），可能有其他进程正在执行迁移")
+        
+        applied = []
+        try:
+            schema_migrations.create(conn, checkfirst=True)
+            conn.commit()
             
-            # 添加 zipcode 字段（如果不存在）
-            if 'zipcode' not in columns:
-                logger.info("添加 zipcode 字段...")
-                conn.execute(text("""
-                    ALTER TABLE users 
-                    ADD COLUMN zipcode VARCHAR(10) NULL
-                    AFTER district
-                """))
+            # 取得锁后重新检查（其他进程可能已完成迁移）
+            for version, description, migrate in get_pending_migrations(conn):
+                logger.info(f"执行迁移 {version}: {description}")
+                migrate(conn)
+                conn.execute(schema_migrations.insert().values(version=version, description=description))
                 conn.commit()
-                logger.info("zipcode 字段添加成功")
-            else:
-                logger.info("zipcode 字段已存在，跳过")
-                
-    except Exception as e:
-        logger.error(f"迁移失败: {e}")
-        raise
-    finally:
-        engine.dispose()
+                applied.append(version)
+                logger.info(f"迁移 {version} 完成")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"迁移失败: {e}")
+            raise
+        finally:
+            _release_lock(conn)
+        
+        return applied
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    add_user_role_status_columns()
-    add_category_sort_order_column()
-    add_product_is_hot_column()
-    add_user_address_fields()
-    print("迁移完成！")
-
+    applied = run_migrations()
+    print(f"迁移完成！本次执行: {', '.join(applied) if applied else '无'}")
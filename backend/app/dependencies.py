@@ -3,9 +3,29 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.core.session import get_session_user_id, is_authenticated
+from app.core.identity import identity_key, get_cached_user, cache_user
 
+# 以下依賴皆為同步 def：FastAPI 會在執行緒池中執行，資料庫查詢不會阻塞事件迴圈
+# （不可改回 async def，否則同步的 db.query() 會直接在事件迴圈上執行）
+# 認證依賴優先讀取身分快取（app.core.identity），命中時不查詢資料庫；
+# 返回的使用者為 detached 快照，只能讀取欄位，需要修改使用者時改用 get_current_user_for_update
 
-async def get_current_user(
+
+def _load_user(db: Session, user_id: int) -> User | None:
+    """讀取使用者快照：先查身分快取，未命中時查詢資料庫並寫入快取"""
+    # 快取鍵在查詢之前取得，查詢期間發生的修改不會以新版本的鍵保存舊資料
+    key = identity_key(user_id)
+    user = get_cached_user(key)
+    if user is not None:
+        return user
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    return cache_user(user, key)
+
+
+def get_current_user(
     request: Request,
     db: Session = Depends(get_db)
 ) -> User:
@@ -23,7 +43,7 @@ async def get_current_user(
             detail="Not authenticated"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _load_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,7 +53,7 @@ async def get_current_user(
     return user
 
 
-async def get_current_user_optional(
+def get_current_user_optional(
     request: Request,
     db: Session = Depends(get_db)
 ) -> User | None:
@@ -46,13 +66,27 @@ async def get_current_user_optional(
         if user_id is None:
             return None
         
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
+        return _load_user(db, user_id)
     except Exception:
         return None
 
 
-async def get_current_admin(
+def get_current_user_for_update(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """獲取當前用戶並附加到資料庫 Session（用於修改個人資料 / 密碼，修改後需呼叫 invalidate_user）"""
+    user = db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    return user
+
+
+def get_current_admin(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> User:
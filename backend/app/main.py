@@ -1,244 +1,281 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from app.api import auth, products, cart, categories, orders, news, ads, about_us, faq, home, admin, ecpay
-from app.database import engine, Base
-from app.database_migration import add_user_role_status_columns, add_category_sort_order_column, add_product_is_hot_column, add_user_address_fields
-from app.init_admin import init_admin_user
+from app.api import auth, products, cart, categories, orders, news, ads, about_us, faq, home, admin, ecpay, images
+from app.database import engine, pool_telemetry, async_pool_telemetry, get_async_engine_if_created, dispose_async_engine
+from app.bootstrap import run_startup_tasks
 from app.config import settings
+from app.core.cache import catalog_cache
+from app.core.compression import CompressionMiddleware, PrecompressedFileResponse
+from app.core.content_version import content_versions
+from app.core.http_cache import ConditionalGetMiddleware
+from app.core.identity import identity_cache
+from app.core.db_pool import pool_stats
+from app.core.loop_monitor import LoopLagMiddleware, loop_monitor
+from app.core.responses import default_response_options
+from app.core.static_delivery import DeliveredStaticFiles, static_delivery
+from app.services.images import image_service
+from app.services.image_variants import variant_cache
+from app.services.search import search_backend
+from app.services.category_tree import category_tree_cache
+from app.services.suggest import suggest_index
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# 执行数据库迁移（添加缺失的字段）
-try:
-    add_user_role_status_columns()
-except Exception as e:
-    logger.warning(f"数据库迁移失败，但继续运行: {e}")
-
-# 执行分类排序字段迁移
-try:
-    add_category_sort_order_column()
-except Exception as e:
-    logger.warning(f"分类排序字段迁移失败，但继续运行: {e}")
-
-# 执行产品 is_hot 字段迁移
-try:
-    add_product_is_hot_column()
-except Exception as e:
-    logger.warning(f"产品 is_hot 字段迁移失败，但继续运行: {e}")
-
-# 执行用户地址字段迁移
-try:
-    add_user_address_fields()
-except Exception as e:
-    logger.warning(f"用户地址字段迁移失败，但继续运行: {e}")
-
-# 初始化默认管理员账户
-try:
-    init_admin_user()
-except Exception as e:
-    logger.warning(f"初始化管理员账户失败，但继续运行: {e}")
-
-# Create FastAPI app
-app = FastAPI(
-    title="Shopping Cart API",
-    description="Backend API for shopping cart system",
-    version="1.0.0"
-)
-
-# 添加 Session 中间件（必须在 CORS 之前）
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=settings.session_secret_key,
-    max_age=3600 * 24,  # 24 小时
-    same_site="lax"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://localhost:8000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router)
-app.include_router(products.router)
-app.include_router(categories.router)
-app.include_router(cart.router)
-app.include_router(orders.router)
-app.include_router(news.router)
-app.include_router(ads.router)
-app.include_router(about_us.router)
-app.include_router(faq.router)
-app.include_router(home.router)
-app.include_router(ecpay.router)  # 綠界金流 API
-app.include_router(admin.router)  # 後台管理 API
-
 # 靜態文件目錄
 static_dir = Path(__file__).parent / "static"
-static_dir.mkdir(exist_ok=True)
-
-# 掛載靜態文件
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-# 同時掛載到 /backend/static，方便後台管理頁面訪問
-app.mount("/backend/static", StaticFiles(directory=str(static_dir)), name="backend_static")
-
 
-@app.get("/backend")
+# 後台頁面與健康檢查路由（在 create_app() 中註冊）
+pages = APIRouter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    應用生命週期：資料庫相關的啟動工作在 worker 啟動後才執行，匯入 app.main 不會連線資料庫
+
+    INIT_DB_ON_STARTUP=false 時完全跳過（改由部署時執行 python -m app.bootstrap）
+    """
+    if settings.init_db_on_startup:
+        await run_in_threadpool(run_startup_tasks)
+    if settings.search_warm_on_startup and search_backend.needs_refresh():
+        try:
+            await run_in_threadpool(search_backend.refresh)
+        except Exception as e:
+            logger.warning(f"建立搜尋索引失敗，將在第一次搜尋時重試: {e}")
+    if settings.suggest_enabled:
+        await suggest_index.start()
+    if settings.loop_lag_monitor_enabled:
+        loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    await suggest_index.stop()
+    await run_in_threadpool(content_versions.flush)
+    await run_in_threadpool(image_service.shutdown)
+    await dispose_async_engine()
+    engine.dispose()
+
+
+def create_app() -> FastAPI:
+    """建立 FastAPI 應用（不執行任何資料庫或檔案系統操作）"""
+    app = FastAPI(
+        title="Shopping Cart API",
+        description="Backend API for shopping cart system",
+        version="1.0.0",
+        lifespan=lifespan,
+        **default_response_options()
+    )
+    
+    # 公開 GET 端點的條件請求：版本未變更時在執行路由之前返回 304（最內層，304 回應同樣經過 CORS）
+    if settings.conditional_get_enabled:
+        app.add_middleware(ConditionalGetMiddleware, versions=content_versions)
+    
+    # 添加 Session 中间件（必须在 CORS 之前）
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=settings.session_secret_key,
+        max_age=3600 * 24,  # 24 小时
+        same_site="lax"
+    )
+    
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://localhost:8000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # 回應壓縮（在 CORS 之外，壓縮最終的回應內容）
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality
+        )
+    
+    # 事件迴圈延遲監控：記錄進行中的請求，阻塞時列出可疑路由
+    if settings.loop_lag_monitor_enabled:
+        app.add_middleware(LoopLagMiddleware, monitor=loop_monitor)
+    
+    # Include routers
+    app.include_router(auth.router)
+    app.include_router(products.router)
+    app.include_router(categories.router)
+    app.include_router(cart.router)
+    app.include_router(orders.router)
+    app.include_router(news.router)
+    app.include_router(ads.router)
+    app.include_router(about_us.router)
+    app.include_router(faq.router)
+    app.include_router(home.router)
+    app.include_router(ecpay.router)  # 綠界金流 API
+    app.include_router(admin.router)  # 後台管理 API
+    app.include_router(images.router)  # 圖片縮圖（必須在靜態文件掛載之前）
+    
+    # 掛載靜態文件（依 STATIC_DELIVERY 由 worker 或前端伺服器傳送，worker 傳送時依 Accept-Encoding 提供預先壓縮檔）
+    # /static 與 /backend/static（後台管理頁面使用）共用同一個實例
+    static_files = DeliveredStaticFiles(directory=str(static_dir), delivery=static_delivery)
+    app.mount("/static", static_files, name="static")
+    app.mount("/backend/static", static_files, name="backend_static")
+    
+    # 後台管理頁面與健康檢查
+    app.include_router(pages)
+    
+    return app
+
+
+@pages.get("/backend")
 async def admin_frontend():
     """後台管理前端界面 - 重定向到登入頁面"""
-    return FileResponse(static_dir / "login.html")
+    return PrecompressedFileResponse(static_dir / "login.html")
 
 
-@app.get("/backend/login")
+@pages.get("/backend/login")
 async def admin_login_page():
     """後台管理登入頁面"""
-    return FileResponse(static_dir / "login.html")
+    return PrecompressedFileResponse(static_dir / "login.html")
 
 
-@app.get("/backend/users")
+@pages.get("/backend/users")
 async def admin_users_page():
     """使用者管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "users" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "users" / "index.html")
 
 
-@app.get("/backend/users/add")
+@pages.get("/backend/users/add")
 async def admin_users_add_page():
     """使用者管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "users" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "users" / "add-edit.html")
 
 
-@app.get("/backend/users/edit")
+@pages.get("/backend/users/edit")
 async def admin_users_edit_page():
     """使用者管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "users" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "users" / "add-edit.html")
 
 
-@app.get("/backend/ads")
+@pages.get("/backend/ads")
 async def admin_ads_page():
     """Banner 管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "ads" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "ads" / "index.html")
 
 
-@app.get("/backend/ads/add")
+@pages.get("/backend/ads/add")
 async def admin_ads_add_page():
     """Banner 管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "ads" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "ads" / "add-edit.html")
 
 
-@app.get("/backend/ads/edit")
+@pages.get("/backend/ads/edit")
 async def admin_ads_edit_page():
     """Banner 管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "ads" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "ads" / "add-edit.html")
 
 
-@app.get("/backend/products")
+@pages.get("/backend/products")
 async def admin_products_page():
     """產品管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "products" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "products" / "index.html")
 
 
-@app.get("/backend/products/add")
+@pages.get("/backend/products/add")
 async def admin_products_add_page():
     """產品管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "products" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "products" / "add-edit.html")
 
 
-@app.get("/backend/products/edit")
+@pages.get("/backend/products/edit")
 async def admin_products_edit_page():
     """產品管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "products" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "products" / "add-edit.html")
 
 
-@app.get("/backend/categories")
+@pages.get("/backend/categories")
 async def admin_categories_page():
     """分類管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "categories" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "categories" / "index.html")
 
 
-@app.get("/backend/categories/add")
+@pages.get("/backend/categories/add")
 async def admin_categories_add_page():
     """分類管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "categories" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "categories" / "add-edit.html")
 
 
-@app.get("/backend/categories/edit")
+@pages.get("/backend/categories/edit")
 async def admin_categories_edit_page():
     """分類管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "categories" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "categories" / "add-edit.html")
 
 
-@app.get("/backend/news")
+@pages.get("/backend/news")
 async def admin_news_page():
     """新聞管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "news" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "news" / "index.html")
 
 
-@app.get("/backend/news/add")
+@pages.get("/backend/news/add")
 async def admin_news_add_page():
     """新聞管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "news" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "news" / "add-edit.html")
 
 
-@app.get("/backend/news/edit")
+@pages.get("/backend/news/edit")
 async def admin_news_edit_page():
     """新聞管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "news" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "news" / "add-edit.html")
 
 
-@app.get("/backend/about")
+@pages.get("/backend/about")
 async def admin_about_page():
     """關於我們管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "about" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "about" / "index.html")
 
 
-@app.get("/backend/about/add")
+@pages.get("/backend/about/add")
 async def admin_about_add_page():
     """關於我們管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "about" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "about" / "add-edit.html")
 
 
-@app.get("/backend/about/edit")
+@pages.get("/backend/about/edit")
 async def admin_about_edit_page():
     """關於我們管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "about" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "about" / "add-edit.html")
 
 
-@app.get("/backend/faq")
+@pages.get("/backend/faq")
 async def admin_faq_page():
     """FAQ 管理頁面 - 列表"""
-    return FileResponse(static_dir / "admin" / "faq" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "faq" / "index.html")
 
 
-@app.get("/backend/faq/add")
+@pages.get("/backend/faq/add")
 async def admin_faq_add_page():
     """FAQ 管理頁面 - 新增"""
-    return FileResponse(static_dir / "admin" / "faq" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "faq" / "add-edit.html")
 
 
-@app.get("/backend/faq/edit")
+@pages.get("/backend/faq/edit")
 async def admin_faq_edit_page():
     """FAQ 管理頁面 - 編輯"""
-    return FileResponse(static_dir / "admin" / "faq" / "add-edit.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "faq" / "add-edit.html")
 
 
-@app.get("/backend/orders")
+@pages.get("/backend/orders")
 async def admin_orders_page():
     """訂單管理頁面 - 列表（只讀）"""
-    return FileResponse(static_dir / "admin" / "orders" / "index.html")
+    return PrecompressedFileResponse(static_dir / "admin" / "orders" / "index.html")
 
 
-@app.get("/")
+@pages.get("/")
 def root():
     """Root endpoint"""
     return {
@@ -249,8 +286,49 @@ def root():
     }
 
 
-@app.get("/health")
+@pages.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+
+@pages.get("/health/cache")
+def cache_stats():
+    """快取命中統計（供監控抓取）"""
+    return {
+        "catalog": catalog_cache.stats(),
+        "identity": identity_cache.stats(),
+        "category_tree": category_tree_cache.stats(),
+        "content_versions": content_versions.stats()
+    }
+
+
+@pages.get("/health/db")
+def db_pool_stats():
+    """資料庫連線池統計（供監控抓取，用於依 MySQL max_connections 規劃連線池大小）"""
+    async_engine = get_async_engine_if_created()
+    return {
+        "sync": pool_stats(engine, pool_telemetry),
+        "async": pool_stats(async_engine.sync_engine if async_engine else None, async_pool_telemetry)
+    }
+
+
+@pages.get("/health/loop")
+def loop_lag_stats():
+    """事件迴圈延遲統計（供監控抓取）"""
+    return loop_monitor.stats()
+
+
+@pages.get("/health/images")
+def image_service_stats():
+    """圖片轉檔進程池、縮圖快取與靜態檔傳送統計（供監控抓取）"""
+    return {"pool": image_service.stats(), "variants": variant_cache.stats(), "static": static_delivery.stats()}
+
+
+@pages.get("/health/search")
+def search_stats():
+    """搜尋後端、索引與搜尋建議索引統計（供監控抓取）"""
+    return {**search_backend.stats(), "suggest": suggest_index.stats()}
+
+
+app = create_app()
@@ -10,6 +10,7 @@ from app.models.order_item import OrderItem
 from app.models.news import News
 from app.models.about_us import AboutUs
 from app.models.faq import FAQ
+from app.models.content_version import ContentVersion
 
 __all__ = [
     "User",
@@ -26,5 +27,6 @@ __all__ = [
     "News",
     "AboutUs",
     "FAQ",
+    "ContentVersion",
 ]
 
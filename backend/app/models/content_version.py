@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+
+class ContentVersion(Base):
+    """公開內容的寫入計數器（每類內容一列），後台寫入後遞增，見 app/core/content_version.py"""
+    __tablename__ = "content_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
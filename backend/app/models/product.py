@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -19,6 +19,9 @@ class Product(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # 列表查詢使用的描述摘要（由 with_expression 填入，見 app/repositories/product.py）
+    description_excerpt = query_expression()
+
     # Relationships
     category = relationship("ProductCategory", back_populates="products")
     cart_items = relationship("CartItem", back_populates="product")
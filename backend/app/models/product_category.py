@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, event, select, update
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -13,6 +14,8 @@ class ProductCategory(Base):
     image = Column(String(500), nullable=True)  # Only for parent_id = NULL
     description = Column(Text, nullable=True)
     sort_order = Column(Integer, nullable=False, default=0, index=True)  # 排序欄位
+    # 物化路徑：根到自身的 ID，如 "/1/5/"；子樹查詢為 path LIKE '/1/%'（索引範圍掃描），見 app/services/category_tree.py
+    path = Column(String(255), nullable=False, default="", index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -20,3 +23,23 @@ class ProductCategory(Base):
     parent = relationship("ProductCategory", remote_side=[id], backref="children")
     products = relationship("Product", back_populates="category")
 
+
+def child_path(parent_path, category_id: int) -> str:
+    """組出分類的物化路徑（parent_path 為 None 時為根分類）"""
+    return f"{parent_path or '/'}{category_id}/"
+
+
+@event.listens_for(ProductCategory, "after_insert")
+def assign_category_path(mapper, connection, target):
+    """新增分類後依父分類的路徑寫入自身路徑（任何建立分類的地方都適用，同一次 flush 中父分類會先插入）"""
+    parent_path = None
+    if target.parent_id is not None:
+        parent_path = connection.execute(
+            select(ProductCategory.path).where(ProductCategory.id == target.parent_id)
+        ).scalar()
+    path = child_path(parent_path, target.id)
+    connection.execute(
+        update(ProductCategory.__table__).where(ProductCategory.id == target.id).values(path=path)
+    )
+    # 設定為已提交的值，不會在下一次 flush 產生額外的 UPDATE
+    set_committed_value(target, "path", path)
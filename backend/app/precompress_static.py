@@ -0,0 +1,81 @@
+"""
+預先壓縮靜態檔
+為 app/static 下的 js、css、svg 與後台 HTML 產生同目錄的 .gz 與 .br 檔，
+由 PrecompressedStaticFiles / PrecompressedFileResponse 依 Accept-Encoding 提供（見 app/core/compression.py）
+
+- 以最高壓縮率壓縮（gzip 9、brotli 11），只在部署時執行一次，請求時不需要壓縮
+- 壓縮檔比原檔新時略過；原檔修改後未重新執行時，服務端會忽略舊的壓縮檔
+- 壓縮後沒有變小的檔案不產生壓縮檔；上傳目錄（uploads）不處理
+- 未安裝 brotli 套件時只產生 .gz
+
+部署時執行（deployment/deploy.sh）：python -m app.precompress_static
+"""
+import gzip
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.compression import PRECOMPRESSED_SUFFIXES, PRECOMPRESSIBLE_EXTENSIONS, brotli
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# 不處理的子目錄（使用者上傳的圖片與縮圖快取）
+EXCLUDED_DIRS = {"uploads"}
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _write_variant(source: Path, encoding: str, force: bool) -> Optional[Path]:
+    """產生單一壓縮檔，返回寫入的路徑（略過時返回 None）"""
+    target = source.with_name(source.name + PRECOMPRESSED_SUFFIXES[encoding])
+    if not force and target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+        return None
+    data = source.read_bytes()
+    compressed = _compress(data, encoding)
+    if len(compressed) >= len(data):
+        target.unlink(missing_ok=True)
+        return None
+    # 先寫入暫存檔再替換，服務中的 worker 不會讀到寫到一半的檔案
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(compressed)
+    os.replace(tmp, target)
+    return target
+
+
+def precompress_static(static_dir: Path = STATIC_DIR, force: bool = False) -> List[Path]:
+    """壓縮 static_dir 下所有可預先壓縮的檔案，返回寫入的壓縮檔"""
+    encodings = [encoding for encoding in PRECOMPRESSED_SUFFIXES if encoding != "br" or brotli is not None]
+    if brotli is None:
+        logger.warning("未安裝 brotli 套件，只產生 .gz 檔")
+    
+    written = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [name for name in dirs if name not in EXCLUDED_DIRS and not name.startswith(".")]
+        for name in files:
+            if not name.endswith(PRECOMPRESSIBLE_EXTENSIONS):
+                continue
+            source = Path(root) / name
+            for encoding in encodings:
+                target = _write_variant(source, encoding, force)
+                if target is not None:
+                    written.append(target)
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="預先壓縮 app/static 下的靜態檔（.gz / .br）")
+    parser.add_argument("--force", action="store_true", help="忽略修改時間，重新產生所有壓縮檔")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    written = precompress_static(force=args.force)
+    print(f"預先壓縮完成！本次產生 {len(written)} 個壓縮檔")
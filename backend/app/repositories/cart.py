@@ -0,0 +1,45 @@
+"""
+購物車查詢模組
+以固定數量的查詢載入 購物車 → 項目 → 產品 →（分類、圖片），總價在資料庫中計算，
+查詢數不隨購物車項目數增加
+"""
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.models.cart import Cart
+from app.models.cart_item import CartItem
+from app.models.product import Product
+
+
+def load_cart(db: Session, cart_id: int) -> Optional[Cart]:
+    """
+    載入購物車及其項目、產品、分類與圖片
+
+    查詢數固定：購物車 1 條、項目（JOIN 產品與分類）1 條、圖片 1 條
+    populate_existing：路由中先前查過的購物車物件也會以最新資料重新填充
+    """
+    return db.execute(
+        select(Cart)
+        .options(
+            selectinload(Cart.items)
+            .joinedload(CartItem.product)
+            .options(
+                joinedload(Product.category),
+                selectinload(Product.images)
+            )
+        )
+        .where(Cart.id == cart_id)
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
+def cart_total(db: Session, cart_id: int) -> float:
+    """以 SUM(price * quantity) 計算購物車總價"""
+    total = db.scalar(
+        select(func.sum(Product.price * CartItem.quantity))
+        .join(CartItem.product)
+        .where(CartItem.cart_id == cart_id)
+    )
+    return float(total or 0)
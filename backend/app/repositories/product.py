@@ -0,0 +1,52 @@
+"""
+產品查詢建構模組
+列表頁共用的產品查詢：分類使用 joinedload（多對一，不會放大行數），圖片使用 selectinload，
+並只投影 ProductResponse 需要的欄位，description 以截斷摘要取代完整 Text
+"""
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import joinedload, load_only, selectinload, with_expression
+
+from app.models.product import Product
+from app.models.product_category import ProductCategory
+from app.models.product_image import ProductImage
+
+# 列表頁描述摘要長度（前端卡片只顯示兩行）
+LIST_DESCRIPTION_LENGTH = 200
+
+
+def product_listing_stmt(*filters) -> Select:
+    """
+    建立產品列表查詢語句
+
+    - 產品只載入列表需要的欄位，description 改為 description_excerpt（前 LIST_DESCRIPTION_LENGTH 字）
+    - 圖片以第二條 `WHERE product_id IN (...)` 查詢載入，LIMIT 直接作用於產品表，不需要子查詢包裝
+    - 未投影的欄位設定為 raiseload，意外存取時直接報錯而不是產生 N+1 查詢
+    """
+    return select(Product).options(
+        load_only(
+            Product.id,
+            Product.title,
+            Product.price,
+            Product.image,
+            Product.category_id,
+            Product.stock,
+            Product.is_active,
+            Product.created_at,
+            raiseload=True
+        ),
+        with_expression(
+            Product.description_excerpt,
+            func.substr(Product.description, 1, LIST_DESCRIPTION_LENGTH)
+        ),
+        joinedload(Product.category).load_only(ProductCategory.name, raiseload=True),
+        selectinload(Product.images).load_only(
+            ProductImage.image_url,
+            ProductImage.order_index,
+            raiseload=True
+        ),
+    ).where(*filters)
+
+
+def product_count_stmt(*filters) -> Select:
+    """建立與 product_listing_stmt 相同條件的計數語句"""
+    return select(func.count(Product.id)).where(*filters)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Optional, List
 from app.models.user import UserRole, UserStatus
@@ -45,10 +45,11 @@ class UserResponseAdmin(BaseModel):
 
 class UserListResponseAdmin(BaseModel):
     users: List[UserResponseAdmin]
-    total: int
+    total: Optional[int]  # 游標分頁未指定 include_total 時為 None（不執行 COUNT）
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # 游標分頁的下一頁游標
 
 
 class AdCreate(BaseModel):
@@ -80,6 +81,10 @@ class AdResponseAdmin(BaseModel):
         from_attributes = True
 
 
+class AdReorder(BaseModel):
+    banner_ids: List[int] = Field(..., min_length=1)  # 依顯示順序排列的 Banner ID
+
+
 class AdListResponseAdmin(BaseModel):
     ads: List[AdResponseAdmin]
     total: int
@@ -131,10 +136,11 @@ class ProductResponseAdmin(BaseModel):
 
 class ProductListResponseAdmin(BaseModel):
     products: List[ProductResponseAdmin]
-    total: int
+    total: Optional[int]  # 游標分頁未指定 include_total 時為 None（不執行 COUNT）
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # 游標分頁的下一頁游標
 
 
 # ==================== 分類管理 ====================
@@ -168,6 +174,10 @@ class CategoryResponseAdmin(BaseModel):
         from_attributes = True
 
 
+class CategoryReorderAdmin(BaseModel):
+    category_ids: List[int] = Field(..., min_length=1)  # 同一父分類下依顯示順序排列的分類 ID
+
+
 class CategoryListResponseAdmin(BaseModel):
     categories: List[CategoryResponseAdmin]
     total: int
@@ -289,10 +299,11 @@ class OrderResponseAdmin(BaseModel):
 
 class OrderListResponseAdmin(BaseModel):
     orders: List[OrderResponseAdmin]
-    total: int
+    total: Optional[int]  # 游標分頁未指定 include_total 時為 None（不執行 COUNT）
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # 游標分頁的下一頁游標
 
 
 class OrderStatusUpdate(BaseModel):
@@ -31,8 +31,19 @@ class ProductResponse(BaseModel):
 
 class ProductListResponse(BaseModel):
     products: List[ProductResponse]
-    total: int
+    total: Optional[int]  # 游標分頁未指定 include_total 時為 None（不執行 COUNT）
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None  # 游標分頁的下一頁游標，None 表示沒有下一頁
 
+
+class SuggestionItem(BaseModel):
+    id: int
+    text: str
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    products: List[SuggestionItem]  # 依銷量排序
+    categories: List[SuggestionItem]  # 依上架產品數排序
@@ -0,0 +1,29 @@
+"""
+購物車序列化模組
+將 load_cart() 載入的購物車轉換為 CartResponse，產品部分沿用產品批次序列化
+"""
+from app.models.cart import Cart
+from app.schemas.cart import CartItemResponse, CartResponse
+from app.serializers.product import serialize_products
+
+
+def serialize_cart(cart: Cart, total: float) -> CartResponse:
+    """序列化購物車（cart 需以 app/repositories/cart.py:load_cart 載入）"""
+    items = cart.items
+    products = serialize_products([item.product for item in items])
+    return CartResponse(
+        id=cart.id,
+        user_id=cart.user_id,
+        items=[
+            CartItemResponse(
+                id=item.id,
+                product_id=item.product_id,
+                quantity=item.quantity,
+                product=product
+            )
+            for item, product in zip(items, products)
+        ],
+        total=total,
+        created_at=cart.created_at,
+        updated_at=cart.updated_at
+    )
@@ -0,0 +1,142 @@
+"""
+分類樹服務
+以物化路徑（ProductCategory.path，如 "/1/5/"）表示分類的祖先關係：
+子樹查詢為 path LIKE '/1/%' 的索引範圍掃描，查詢次數與樹的深度無關
+
+- 新增分類時由 after_insert 事件寫入路徑（見 app/models/product_category.py，任何建立分類的地方都適用）
+- 變更父分類時以一條 UPDATE 改寫整個子樹的路徑前綴
+- 刪除分類時不需維護（有子分類的分類不可刪除）
+
+/api/categories 的分類樹以預先序列化的快照（bytes + ETag）提供，後台分類寫入後呼叫 invalidate_category_tree()；
+其他 worker 的分類寫入在讀取到新的內容版本時清除（見 app/core/content_version.py）
+"""
+from typing import Iterable, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.core.content_version import CATEGORIES, content_versions
+from app.core.http_cache import SnapshotCache
+from app.models.product_category import ProductCategory, child_path
+from app.schemas.category import CategoryTreeResponse
+
+_tree_adapter = TypeAdapter(List[CategoryTreeResponse])
+
+category_tree_cache = SnapshotCache(
+    ttl=settings.category_tree_cache_ttl,
+    enabled=settings.category_tree_cache_enabled
+)
+content_versions.on_change(CATEGORIES, category_tree_cache.invalidate)
+
+
+class CategoryTreeError(Exception):
+    """無效的父分類（例如移動到自己的子樹下）"""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(detail)
+
+
+def subtree_condition(path: str):
+    """分類自身及所有子孫分類的條件（前綴 LIKE，路徑只含數字與分隔符號，不需跳脫）"""
+    return ProductCategory.path.like(f"{path}%")
+
+
+def subtree_ids_stmt(path: str):
+    """分類自身及所有子孫分類 ID 的子查詢，供 Product.category_id.in_() 使用"""
+    return select(ProductCategory.id).where(subtree_condition(path))
+
+
+def move_category(db: Session, category: ProductCategory, parent_id: Optional[int]) -> None:
+    """
+    變更父分類，並以一條 UPDATE 改寫子樹（含自身）所有路徑的前綴
+    
+    新的父分類不能是自己或自己的子孫分類
+    """
+    if parent_id == category.parent_id:
+        return
+    old_path = category.path
+    parent_path = None
+    if parent_id is not None:
+        parent_path = db.execute(select(ProductCategory.path).where(ProductCategory.id == parent_id)).scalar()
+        if parent_path is not None and parent_path.startswith(old_path):
+            raise CategoryTreeError("Cannot move a category under itself or its descendants")
+    
+    new_path = child_path(parent_path, category.id)
+    category.parent_id = parent_id
+    db.flush()
+    db.execute(
+        update(ProductCategory)
+        .where(subtree_condition(old_path))
+        .values(path=literal(new_path) + func.substr(ProductCategory.path, len(old_path) + 1))
+        .execution_options(synchronize_session=False)
+    )
+    set_committed_value(category, "path", new_path)
+
+
+def rebuild_paths(conn) -> int:
+    """依 parent_id 重新計算所有分類的路徑（遷移與修復使用），返回更新的分類數"""
+    rows = conn.execute(select(ProductCategory.id, ProductCategory.parent_id, ProductCategory.path)).all()
+    parents = {row.id: row.parent_id for row in rows}
+    paths = {}
+    
+    def resolve(category_id: int, seen: frozenset = frozenset()) -> str:
+        if category_id in paths:
+            return paths[category_id]
+        parent_id = parents.get(category_id)
+        # 父分類不存在或形成循環時視為根分類
+        if parent_id is None or parent_id not in parents or parent_id in seen:
+            path = child_path(None, category_id)
+        else:
+            path = child_path(resolve(parent_id, seen | {category_id}), category_id)
+        paths[category_id] = path
+        return path
+    
+    updated = 0
+    for row in rows:
+        path = resolve(row.id)
+        if row.path != path:
+            conn.execute(update(ProductCategory.__table__).where(ProductCategory.id == row.id).values(path=path))
+            updated += 1
+    return updated
+
+
+def build_category_tree(categories: Iterable[ProductCategory]) -> List[dict]:
+    """
+    將依 (sort_order, created_at) 排序的分類組成樹（任意深度）
+    
+    子分類保持輸入順序，父分類不存在的分類不會出現在樹中
+    """
+    nodes = {}
+    for category in categories:
+        nodes[category.id] = {
+            "id": category.id,
+            "name": category.name,
+            "parent_id": category.parent_id,
+            "image": category.image,
+            "description": category.description,
+            "sort_order": category.sort_order,
+            "created_at": category.created_at,
+            "children": [],
+        }
+    
+    roots = []
+    for node in nodes.values():
+        if node["parent_id"] is None:
+            roots.append(node)
+        elif node["parent_id"] in nodes:
+            nodes[node["parent_id"]]["children"].append(node)
+    return roots
+
+
+def serialize_category_tree(categories: Iterable[ProductCategory]) -> bytes:
+    """分類樹序列化為 JSON bytes（整棵樹一次在 pydantic-core 中驗證與序列化）"""
+    return _tree_adapter.dump_json(_tree_adapter.validate_python(build_category_tree(categories)))
+
+
+def invalidate_category_tree() -> None:
+    """分類新增、更新、刪除或排序後清除分類樹快照"""
+    category_tree_cache.invalidate()
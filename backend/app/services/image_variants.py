@@ -0,0 +1,183 @@
+"""
+圖片尺寸變體服務
+依請求的寬度產生上傳圖片的縮圖並快取在磁碟，產品列表等網格不必下載原圖
+
+- 只允許設定中的寬度（IMAGE_VARIANT_WIDTHS），避免任意寬度請求塞滿磁碟
+- 縮圖在圖片服務的進程池中產生；同一 worker 內同一張縮圖只會產生一次
+- 快取目錄總大小超過上限時依最後使用時間（mtime）淘汰最舊的檔案，命中時更新 mtime
+"""
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.locks import KeyedLocks
+from app.services.images import image_service, ImageProcessingError, ImageQueueFullError, ImageTimeoutError
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent.parent / "static"
+
+# 淘汰時清理到上限的比例，避免每次寫入都觸發掃描
+EVICT_TARGET_RATIO = 0.9
+
+
+class VariantNotFoundError(Exception):
+    """原圖不存在或不是可縮放的上傳檔案"""
+
+    detail = "Image not found"
+
+
+class VariantCache:
+    """磁碟縮圖快取（多個 worker 共用同一個目錄，大小統計為各 worker 的估計值，淘汰時重新掃描）"""
+
+    def __init__(self, source_dir: Path, cache_dir: Path, widths: List[int], thumbnail_widths: List[int], max_bytes: int):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.widths = sorted(set(widths))
+        self.thumbnail_widths = [w for w in thumbnail_widths if w in self.widths]
+        self.max_bytes = max_bytes
+        self._locks = KeyedLocks()
+        self._size_lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def source_path(self, filename: str) -> Path:
+        """檢查檔名（只接受上傳目錄下的 .webp 檔名，不接受路徑）並返回原圖路徑"""
+        if filename != Path(filename).name or filename.startswith(".") or not filename.endswith(".webp"):
+            raise VariantNotFoundError()
+        return self.source_dir / filename
+
+    def variant_path(self, filename: str, width: int) -> Path:
+        return self.cache_dir / str(width) / filename
+
+    async def get(self, filename: str, width: int) -> Path:
+        """返回縮圖路徑，不存在時產生（width 需先以 self.widths 檢查）"""
+        source = self.source_path(filename)
+        path = self.variant_path(filename, width)
+        if await run_in_threadpool(_touch, path):
+            self.hits += 1
+            return path
+        
+        async with self._locks.hold((filename, width)):
+            # 等待鎖期間其他請求可能已產生同一張縮圖
+            if await run_in_threadpool(_touch, path):
+                self.hits += 1
+                return path
+            try:
+                data = await run_in_threadpool(source.read_bytes)
+            except FileNotFoundError:
+                raise VariantNotFoundError()
+            self.misses += 1
+            await self._generate(path, data, width)
+            return path
+
+    async def pregenerate(self, filename: str, data: bytes) -> None:
+        """上傳後預先產生產品列表使用的縮圖（於背景任務執行，失敗只記錄警告）"""
+        for width in self.thumbnail_widths:
+            try:
+                await self._generate(self.variant_path(filename, width), data, width)
+            except (ImageProcessingError, ImageQueueFullError, ImageTimeoutError) as e:
+                logger.warning(f"預先產生縮圖失敗 {filename} ({width}px): {e.detail}")
+                return
+
+    async def _generate(self, path: Path, data: bytes, width: int) -> None:
+        variant = await image_service.resize(data, width)
+        await run_in_threadpool(self._store, path, variant)
+
+    def _store(self, path: Path, data: bytes) -> None:
+        """原子寫入縮圖（先寫暫存檔再 rename），超過大小上限時淘汰"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        with self._size_lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def remove(self, filename: str) -> None:
+        """刪除某張原圖的所有縮圖（原圖刪除後呼叫）"""
+        with self._size_lock:
+            for width in self.widths:
+                path = self.variant_path(filename, width)
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                if self._size is not None:
+                    self._size -= size
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """列出快取目錄中的縮圖 (mtime, 大小, 路徑)"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for path in self.cache_dir.glob("*/*.webp"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """依 mtime 淘汰最舊的縮圖，直到低於上限的 EVICT_TARGET_RATIO（需持有 _size_lock）"""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def stats(self) -> dict:
+        """縮圖快取統計，供 /health/images 輸出"""
+        lookups = self.hits + self.misses
+        return {
+            "widths": self.widths,
+            "thumbnail_widths": self.thumbnail_widths,
+            "max_bytes": self.max_bytes,
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _touch(path: Path) -> bool:
+    """縮圖存在時更新 mtime（作為 LRU 的最後使用時間）並返回 True"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+variant_cache = VariantCache(
+    source_dir=STATIC_DIR / "uploads",
+    cache_dir=Path(settings.image_variant_dir) if settings.image_variant_dir else STATIC_DIR / "uploads" / ".variants",
+    widths=settings.image_variant_widths,
+    thumbnail_widths=settings.image_thumbnail_widths,
+    max_bytes=settings.image_variant_cache_max_mb * 1024 * 1024
+)
@@ -0,0 +1,219 @@
+"""
+圖片轉檔服務
+將 WEBP 編碼放到獨立的進程池執行，避免 PIL 的 CPU 密集工作佔用 worker 的 GIL 與執行緒池，
+大量上傳時不影響前台請求的延遲
+
+- 進程數、排隊上限、單張逾時、像素上限、速度 / 品質預設皆可設定（見 app.config）
+- 進程池在第一次轉檔時才建立（gunicorn --preload 時不會在 master 進程中建立），以 spawn 啟動子進程，
+  不繼承 worker 的執行緒與資料庫連線
+"""
+import asyncio
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from PIL import Image
+
+from app.config import settings
+
+# WEBP 編碼預設：method 越大壓縮率越好但越慢（0-6）
+WEBP_PRESETS = {
+    "fast": {"quality": 80, "method": 2},
+    "balanced": {"quality": 85, "method": 4},
+    "best": {"quality": 85, "method": 6},
+}
+
+
+class ImageProcessingError(Exception):
+    """圖片無法解碼、超過像素上限或編碼失敗"""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(detail)
+
+
+class ImageQueueFullError(Exception):
+    """排隊中的轉檔工作已達上限"""
+
+    detail = "Image processing queue is full, please retry later"
+
+
+class ImageTimeoutError(Exception):
+    """單張圖片轉檔超過逾時"""
+
+    detail = "Image processing timed out"
+
+
+def _init_worker(max_pixels: int) -> None:
+    """子進程初始化：超過 2 倍 max_pixels 時 PIL 直接拋出 DecompressionBombError"""
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+def transcode_to_webp(data: bytes, quality: int, method: int, max_pixels: int) -> bytes:
+    """
+    將圖片轉換為 WEBP（於子進程中執行）
+    
+    先讀取標頭檢查像素數，超過上限時不解碼像素資料
+    """
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ValueError(f"image is {width}x{height}, exceeds {max_pixels} pixels")
+    
+    # WEBP 支援透明度：調色盤圖片轉為 RGBA 保留透明，其他非 RGB 模式轉為 RGB
+    if image.mode == "P":
+        image = image.convert("RGBA")
+    elif image.mode not in ("RGB", "RGBA", "LA"):
+        image = image.convert("RGB")
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=method)
+    return buffer.getvalue()
+
+
+def resize_webp(data: bytes, width: int, quality: int, method: int) -> bytes:
+    """
+    將已上傳的 WEBP 縮放到指定寬度（於子進程中執行）
+    
+    等比例縮放，不放大：原圖寬度不超過 width 時只重新編碼
+    """
+    image = Image.open(io.BytesIO(data))
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=method)
+    return buffer.getvalue()
+
+
+class ImageService:
+    """進程池圖片轉檔（每個 worker 進程各自一份）"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_limit: int = 16,
+        timeout: float = 30.0,
+        max_pixels: int = 40_000_000,
+        preset: str = "balanced"
+    ):
+        if preset not in WEBP_PRESETS:
+            raise ValueError(f"Unknown WEBP preset: {preset} (choose from {', '.join(WEBP_PRESETS)})")
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.max_pixels = max_pixels
+        self.preset = preset
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.max_pixels,)
+                )
+            return self._executor
+
+    async def to_webp(self, data: bytes) -> bytes:
+        """轉換上傳的圖片為 WEBP"""
+        options = WEBP_PRESETS[self.preset]
+        return await self._run(transcode_to_webp, data, options["quality"], options["method"], self.max_pixels)
+
+    async def resize(self, data: bytes, width: int) -> bytes:
+        """產生指定寬度的 WEBP 縮圖"""
+        options = WEBP_PRESETS[self.preset]
+        return await self._run(resize_webp, data, width, options["quality"], options["method"])
+
+    async def _run(self, fn, *args) -> bytes:
+        """
+        在進程池中執行轉檔函式
+        
+        排隊中與執行中的工作超過 queue_limit 時立即拋出 ImageQueueFullError，不在記憶體中堆積上傳資料；
+        逾時（timeout 包含在進程池中排隊的時間）時拋出 ImageTimeoutError：尚未開始的工作會被取消，
+        已開始的工作無法中止，繼續佔用 queue_limit 的名額直到完成（最長執行時間由像素上限限制）
+        """
+        with self._lock:
+            if self.pending >= self.queue_limit:
+                self.rejected += 1
+                raise ImageQueueFullError()
+            self.pending += 1
+        
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # 名額在工作實際結束（完成、失敗或被取消）時才釋放，而不是在等待逾時時
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            self.timeouts += 1
+            raise ImageTimeoutError()
+        except BrokenProcessPool:
+            # 子進程異常結束（例如被 OOM killer 終止）：丟棄進程池，下一次轉檔時重建
+            self._reset()
+            self.failed += 1
+            raise ImageProcessingError("Image processing worker crashed")
+        except Exception as e:
+            self.failed += 1
+            raise ImageProcessingError(str(e))
+        self.completed += 1
+        return result
+
+    def _release(self, future=None) -> None:
+        """釋放 queue_limit 的名額（Future 完成時由進程池的管理執行緒呼叫）"""
+        with self._lock:
+            self.pending -= 1
+
+    def _reset(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """關閉進程池（lifespan shutdown 時呼叫）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """轉檔統計，供 /health/images 輸出"""
+        return {
+            "started": self._executor is not None,
+            "workers": self.workers,
+            "preset": self.preset,
+            "queue_limit": self.queue_limit,
+            "timeout": self.timeout,
+            "max_pixels": self.max_pixels,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+image_service = ImageService(
+    workers=settings.image_workers,
+    queue_limit=settings.image_queue_limit,
+    timeout=settings.image_job_timeout,
+    max_pixels=settings.image_max_pixels,
+    preset=settings.image_webp_preset
+)
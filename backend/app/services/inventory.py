@@ -0,0 +1,119 @@
+"""
+庫存預留服務
+以單一條件式 UPDATE 原子扣減多個產品的庫存，取代「Python 讀取庫存 → 判斷 → 寫回」的流程，
+避免同時結帳時的遺失更新（lost update）
+
+結帳後的產品內容版本（見 bump_stock_version()）：
+每次結帳都遞增 products 版本會清除所有 worker 的產品目錄快取、使所有產品 ETag 失效，搶購時快取形同失效；
+因此只有產品售完（前台顯示改變）時立即遞增，其他庫存數字的變化每 STOCK_VERSION_INTERVAL 秒最多遞增一次
+（間隔內略過的遞增在間隔到期時補上），前台顯示的庫存數字最多落後這段時間（結帳時仍以條件式 UPDATE 檢查實際庫存，不會超賣）
+"""
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.content_version import PRODUCTS, bump_content_versions, content_versions
+from app.models.product import Product
+
+# 扣減失敗但重新讀取時庫存已足夠（併發交易剛好釋放庫存）時的嘗試次數
+RESERVE_ATTEMPTS = 2
+
+
+class StockShortage(NamedTuple):
+    """庫存不足的訂單行"""
+    product_id: int
+    title: str
+    requested: int
+    available: int  # 產品不存在時為 0
+
+
+class InsufficientStockError(Exception):
+    """一個或多個產品庫存不足，shortages 列出所有失敗的訂單行"""
+
+    def __init__(self, shortages: List[StockShortage]):
+        self.shortages = shortages
+        super().__init__(self.detail)
+
+    @property
+    def detail(self) -> str:
+        """供 HTTPException 使用的錯誤訊息（列出所有庫存不足的產品）"""
+        titles = ", ".join(s.title for s in self.shortages)
+        return f"Insufficient stock for product: {titles}"
+
+
+def reserve_stock(db: Session, quantities: Dict[int, int]) -> List[int]:
+    """
+    原子扣減庫存：UPDATE products SET stock = stock - CASE id ... END
+    WHERE id IN (...) AND stock >= CASE id ... END
+
+    - 只要有一行不符合條件（庫存不足或產品不存在），整個交易回滾並拋出 InsufficientStockError
+    - 失敗時會呼叫 db.rollback()，因此必須在交易中的其他寫入（建立訂單等）之前呼叫
+    - InnoDB 依主鍵順序鎖定 IN 範圍內的行，多個結帳同時進行時鎖定順序一致，不會互相死鎖；
+      只鎖定購物車內的產品行，不會序列化整個結帳流程
+
+    quantities: {product_id: 數量}，同一產品的多個購物車項目需先合併
+    返回扣減後庫存歸零的產品 id（供 bump_stock_version() 判斷是否立即使產品快取失效）
+    """
+    if not quantities:
+        return []
+    
+    product_ids = sorted(quantities)
+    requested = case(quantities, value=Product.id)
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(product_ids), Product.stock >= requested)
+        .values(stock=Product.stock - requested)
+        .execution_options(synchronize_session=False)
+    )
+    
+    shortages: List[StockShortage] = []
+    for _ in range(RESERVE_ATTEMPTS):
+        if db.execute(stmt).rowcount == len(product_ids):
+            return list(db.scalars(select(Product.id).where(Product.id.in_(product_ids), Product.stock <= 0)))
+        # 部分產品扣減失敗：回滾已扣減的行，再讀取目前庫存以回報所有失敗的訂單行
+        db.rollback()
+        shortages = _find_shortages(db, quantities)
+        if shortages:
+            break
+        # 讀取時庫存已足夠（其他交易在兩次查詢之間補回或取消），重試一次
+    
+    raise InsufficientStockError(shortages or [
+        StockShortage(product_id, f"#{product_id}", quantity, 0) for product_id, quantity in sorted(quantities.items())
+    ])
+
+
+def _find_shortages(db: Session, quantities: Dict[int, int]) -> List[StockShortage]:
+    """讀取目前庫存，返回庫存不足或不存在的訂單行（依產品 ID 排序）"""
+    rows = db.execute(
+        select(Product.id, Product.title, Product.stock).where(Product.id.in_(quantities))
+    ).all()
+    found = {row.id: row for row in rows}
+    shortages = []
+    for product_id in sorted(quantities):
+        row = found.get(product_id)
+        if row is None:
+            shortages.append(StockShortage(product_id, f"#{product_id}", quantities[product_id], 0))
+        elif row.stock < quantities[product_id]:
+            shortages.append(StockShortage(product_id, row.title, quantities[product_id], row.stock))
+    return shortages
+
+
+def cart_quantities(cart_items) -> Dict[int, int]:
+    """將購物車項目合併為 {product_id: 數量}"""
+    quantities: Dict[int, int] = {}
+    for item in cart_items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+
+def bump_stock_version(sold_out: List[int]) -> None:
+    """
+    結帳提交後呼叫：有產品售完時立即遞增 products 版本，
+    否則只在版本最後遞增時間早於 STOCK_VERSION_INTERVAL 秒前時遞增，間隔內的結帳合併為間隔到期時的一次遞增
+    """
+    if sold_out:
+        bump_content_versions(PRODUCTS)
+    else:
+        content_versions.bump_if_older(PRODUCTS, settings.stock_version_interval)
@@ -0,0 +1,44 @@
+"""
+產品圖片服務
+批次為產品加入多張圖片：一次查詢既有圖片與最大 order_index、一次寫入，取代每張圖片一個請求
+"""
+from typing import List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.product_image import ProductImage
+
+
+def attach_product_images(db: Session, product_id: int, image_urls: List[str]) -> List[ProductImage]:
+    """
+    將多張圖片依序加入產品（不提交，由呼叫端在同一個交易中提交）
+
+    - 產品已有相同 URL 的圖片時沿用既有記錄（與單張新增的去重規則一致），列表內重複的 URL 只加入一次
+    - 新圖片的 order_index 從目前最大值 + 1 開始連續編號
+    返回與 image_urls 去重後順序一致的圖片記錄
+    """
+    existing = {
+        image.image_url: image
+        for image in db.scalars(select(ProductImage).where(ProductImage.product_id == product_id))
+    }
+    max_order = db.scalar(
+        select(func.max(ProductImage.order_index)).where(ProductImage.product_id == product_id)
+    )
+    next_order = max_order + 1 if max_order is not None else 0
+    
+    images: List[ProductImage] = []
+    seen = set()
+    for url in image_urls:
+        if url in seen:
+            continue
+        seen.add(url)
+        image = existing.get(url)
+        if image is None:
+            image = ProductImage(product_id=product_id, image_url=url, order_index=next_order)
+            db.add(image)
+            next_order += 1
+        images.append(image)
+    
+    db.flush()
+    return images
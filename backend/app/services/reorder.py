@@ -0,0 +1,60 @@
+"""
+批次排序服務
+拖曳排序一次送出完整順序：一次查詢驗證所有 ID，再以單一 UPDATE ... SET col = CASE id ... END 寫入，
+取代逐筆 SELECT + UPDATE（50 筆由 51 次查詢降為 2 次）
+"""
+from typing import Any, List, Sequence
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+
+class ReorderError(Exception):
+    """排序列表無效（重複、不存在或不屬於同一範圍的 ID）"""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(detail)
+
+
+def check_unique_ids(ids: Sequence[int]) -> None:
+    if len(set(ids)) != len(ids):
+        raise ReorderError("Duplicate ids in ordering")
+
+
+def find_missing_ids(db: Session, model: Any, ids: Sequence[int], *criteria: Any) -> List[int]:
+    """一次查詢返回不存在或不符合 criteria（例如屬於其他產品）的 ID"""
+    found = set(db.scalars(select(model.id).where(model.id.in_(ids), *criteria)))
+    return [row_id for row_id in ids if row_id not in found]
+
+
+def apply_order(db: Session, model: Any, column: Any, ids: Sequence[int], start: int = 0, criteria: Sequence[Any] = ()) -> int:
+    """
+    依列表位置寫入排序欄位：ids[0] = start、ids[1] = start + 1 ...
+    
+    單一 UPDATE 語句，不提交；返回受影響的行數
+    criteria 為額外的 WHERE 條件，不符合條件的 ID 略過（其他 ID 的位置不變）
+    """
+    if not ids:
+        return 0
+    positions = {row_id: start + index for index, row_id in enumerate(ids)}
+    stmt = (
+        update(model)
+        .where(model.id.in_(list(positions)), *criteria)
+        .values({column: case(positions, value=model.id)})
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount
+
+
+def bulk_reorder(db: Session, model: Any, column: Any, ids: Sequence[int], *criteria: Any) -> int:
+    """
+    驗證並套用排序（2 次查詢，不提交）
+    
+    ids 中有重複、不存在或不符合 criteria 的 ID 時拋出 ReorderError，不修改任何資料
+    """
+    check_unique_ids(ids)
+    missing = find_missing_ids(db, model, ids, *criteria)
+    if missing:
+        raise ReorderError(f"Invalid ids: {', '.join(map(str, missing))}")
+    return apply_order(db, model, column, ids)
@@ -0,0 +1,398 @@
+"""
+產品全文搜尋服務
+提供 /api/products/search 使用的可替換搜尋後端，依標題與描述的相關度排序
+
+- memory：進程內倒排索引（每個 worker 各自一份），第一次搜尋時在背景執行緒建立（建立完成前以 LIKE 查詢返回結果），
+  後台寫入時即時更新目前 worker，其他 worker 每隔 SEARCH_REFRESH_INTERVAL 秒依 updated_at 增量同步；
+  不需要資料庫支援全文索引
+- mysql：MySQL FULLTEXT 索引（ngram 解析器，支援中日韓文字），由遷移 0006 建立，索引由 MySQL 維護
+
+兩種後端只返回排序後的產品 ID，產品資料由路由以列表查詢載入
+"""
+import heapq
+import logging
+import math
+import re
+import sys
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# 標題命中的權重（描述命中為 1）
+TITLE_WEIGHT = 3
+
+# 增量同步時往前多取的時間：updated_at 在 flush 時設定、commit 較晚的交易，以及各 worker 之間的時鐘誤差
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# 英文與數字以連續字元為一個詞；中日韓文字沒有空白分詞，以相鄰兩字（bigram）為一個詞
+TOKEN_RE = re.compile(r"[a-z]+|[0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+
+
+def normalize_text(text: str) -> str:
+    """全形轉半形、大寫轉小寫"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    將文字切分為索引詞
+    
+    中日韓文字連續段切為 bigram（「藍牙耳機」->「藍牙」「牙耳」「耳機」），單獨一個字時保留為單字
+    """
+    if not text:
+        return []
+    tokens = []
+    for run in TOKEN_RE.findall(normalize_text(text)):
+        if run.isascii() or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def title_unigrams(text: Optional[str]) -> Set[str]:
+    """標題中的中日韓單字（供單字查詢使用，描述不建立單字索引以控制記憶體用量）"""
+    if not text:
+        return set()
+    return {ch for run in TOKEN_RE.findall(normalize_text(text)) if not run.isascii() for ch in run}
+
+
+class SearchResult(NamedTuple):
+    """搜尋結果：目前頁的產品 ID（依相關度排序）與符合條件的總數"""
+    ids: List[int]
+    total: int
+
+
+def like_search(db: Session, query: str, category_id: Optional[int], offset: int, limit: int) -> SearchResult:
+    """
+    以 LIKE 搜尋上架產品（所有詞都需出現在標題或描述中），依建立順序排序
+
+    memory 後端建立索引期間使用（10 萬個產品每次約 50 毫秒，見 benchmarks/bench_search.py）
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return SearchResult([], 0)
+    
+    # 詞只包含英文、數字與中日韓文字，不含 LIKE 的萬用字元
+    filters = [Product.is_active == True]
+    filters.extend(or_(Product.title.contains(term), Product.description.contains(term)) for term in terms)
+    if category_id:
+        filters.append(Product.category_id == category_id)
+    
+    ids = db.execute(
+        select(Product.id).where(*filters).order_by(Product.id.desc()).offset(offset).limit(limit)
+    ).scalars().all()
+    total = db.execute(select(func.count(Product.id)).where(*filters)).scalar()
+    return SearchResult(list(ids), total)
+
+
+class SearchBackend(ABC):
+    """搜尋後端介面（子類別需實作 search()）"""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, db: Session, query: str, category_id: Optional[int], offset: int, limit: int) -> SearchResult:
+        """搜尋上架產品（db 為同步 Session，非同步路由經由 asearch() 呼叫）"""
+
+    async def asearch(self, db: AsyncSession, query: str, category_id: Optional[int], offset: int, limit: int) -> SearchResult:
+        """非同步路由使用的搜尋入口（預設以 AsyncSession.run_sync 呼叫 search()）"""
+        return await db.run_sync(self.search, query, category_id, offset, limit)
+
+    def needs_refresh(self) -> bool:
+        """是否需要在搜尋前呼叫 refresh()"""
+        return False
+
+    def refresh(self) -> None:
+        """同步索引（於執行緒池中執行）"""
+
+    def index_product(self, product: Product) -> None:
+        """產品新增或更新後呼叫"""
+
+    def remove_product(self, product_id: int) -> None:
+        """產品刪除後呼叫"""
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class _Document(NamedTuple):
+    category_id: int
+    title_tokens: Tuple[str, ...]
+    body_tokens: Tuple[str, ...]
+
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    進程內倒排索引
+
+    每個詞對應標題與描述兩個產品 ID 集合；查詢時所有詞都需命中（AND），
+    以 Σ idf × (標題命中 TITLE_WEIGHT + 描述命中 1) 排序，相同分數時較新的產品在前
+    """
+
+    name = "memory"
+
+    def __init__(self, refresh_interval: float = 5.0, description_chars: int = 200):
+        self.refresh_interval = refresh_interval
+        self.description_chars = description_chars
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._docs: Dict[int, _Document] = {}
+        self._title: Dict[str, Set[int]] = {}
+        self._body: Dict[str, Set[int]] = {}
+        self._synced_at = None
+        self._next_refresh = 0.0
+        self._ready = False
+        self._builder: Optional[threading.Thread] = None
+        self.rebuilds = 0
+        self.syncs = 0
+        self.searches = 0
+
+    def _document(self, category_id: int, title: Optional[str], description: Optional[str]) -> _Document:
+        title_tokens = set(tokenize(title)) | title_unigrams(title)
+        body_tokens = set(tokenize((description or "")[:self.description_chars])) - title_tokens
+        # 相同的詞共用同一個字串物件（10 萬個產品的索引由約 470 MiB 降為 180 MiB，見 benchmarks/bench_search.py）
+        return _Document(
+            category_id,
+            tuple(sys.intern(token) for token in title_tokens),
+            tuple(sys.intern(token) for token in body_tokens)
+        )
+
+    def _add(self, product_id: int, doc: _Document) -> None:
+        self._docs[product_id] = doc
+        for token in doc.title_tokens:
+            self._title.setdefault(token, set()).add(product_id)
+        for token in doc.body_tokens:
+            self._body.setdefault(token, set()).add(product_id)
+
+    def _discard(self, product_id: int) -> None:
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        for index, tokens in ((self._title, doc.title_tokens), (self._body, doc.body_tokens)):
+            for token in tokens:
+                ids = index.get(token)
+                if ids is not None:
+                    ids.discard(product_id)
+                    if not ids:
+                        del index[token]
+
+    def _prepare(self, rows: Iterable) -> List[Tuple[int, Optional[_Document]]]:
+        """將 (id, title, description, category_id, is_active) 列分詞（不需持有 _lock），下架產品的文件為 None"""
+        return [
+            (product_id, self._document(category_id, title, description) if is_active else None)
+            for product_id, title, description, category_id, is_active in rows
+        ]
+
+    def _apply(self, prepared: Iterable[Tuple[int, Optional[_Document]]]) -> None:
+        """套用 _prepare() 的結果（需持有 _lock）"""
+        for product_id, doc in prepared:
+            self._discard(product_id)
+            if doc is not None:
+                self._add(product_id, doc)
+
+    def rebuild(self) -> None:
+        """從資料庫完整重建索引（新索引建立完成後才替換，建立期間搜尋使用舊索引）"""
+        columns = (Product.id, Product.title, Product.description, Product.category_id, Product.is_active)
+        with SessionLocal() as db:
+            synced_at = db.execute(select(func.max(Product.updated_at))).scalar()
+            rows = db.execute(select(*columns).where(Product.is_active == True)).all()
+        
+        fresh = InMemorySearchBackend(self.refresh_interval, self.description_chars)
+        fresh._apply(fresh._prepare(rows))
+        with self._lock:
+            self._docs, self._title, self._body = fresh._docs, fresh._title, fresh._body
+            self._synced_at = synced_at
+            self._ready = True
+            self.rebuilds += 1
+        self._next_refresh = time.monotonic() + self.refresh_interval
+        logger.info(f"搜尋索引建立完成：{len(rows)} 個產品、{len(self._title) + len(self._body)} 個詞")
+
+    def sync(self) -> None:
+        """增量同步 updated_at 在上次同步之後（含 SYNC_OVERLAP）變更的產品"""
+        columns = (Product.id, Product.title, Product.description, Product.category_id, Product.is_active)
+        stmt = select(*columns, Product.updated_at)
+        if self._synced_at is not None:
+            stmt = stmt.where(Product.updated_at >= self._synced_at - SYNC_OVERLAP)
+        with SessionLocal() as db:
+            rows = db.execute(stmt).all()
+        
+        # 分詞在鎖外完成（SYNC_OVERLAP 內的產品每次都會重新分詞），鎖內只更新倒排索引
+        prepared = self._prepare(row[:5] for row in rows)
+        with self._lock:
+            self._apply(prepared)
+            stamps = [row.updated_at for row in rows if row.updated_at is not None]
+            if stamps and (self._synced_at is None or max(stamps) > self._synced_at):
+                self._synced_at = max(stamps)
+            self.syncs += 1
+        self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def needs_refresh(self) -> bool:
+        return not self._ready or time.monotonic() >= self._next_refresh
+
+    def refresh(self) -> None:
+        """首次使用時完整建立，之後增量同步（同一時間只有一個執行緒在同步）"""
+        with self._refresh_lock:
+            if not self.needs_refresh():
+                return
+            if self._ready:
+                self.sync()
+            else:
+                self.rebuild()
+
+    def build_in_background(self) -> None:
+        """在背景執行緒建立索引（已在建立中時不重複啟動；10 萬個產品約需 14 秒）"""
+        with self._lock:
+            if self._ready or (self._builder is not None and self._builder.is_alive()):
+                return
+            self._builder = threading.Thread(target=self._build, name="search-index", daemon=True)
+            self._builder.start()
+
+    def _build(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"建立搜尋索引失敗，將在下一次搜尋時重試: {e}")
+
+    async def asearch(self, db: AsyncSession, query: str, category_id: Optional[int], offset: int, limit: int) -> SearchResult:
+        """
+        同步索引與查詢都在執行緒池中執行：查詢常見詞時取交集與排序需數十毫秒，
+        且 sync() 更新索引時搜尋需等待 _lock，兩者都不能在事件迴圈上進行
+
+        索引尚未建立時啟動背景建立，本次以 LIKE 查詢返回（不等待建立完成）
+        """
+        if not self._ready:
+            self.build_in_background()
+            return await db.run_sync(like_search, query, category_id, offset, limit)
+        if self.needs_refresh():
+            await run_in_threadpool(self.refresh)
+        return await run_in_threadpool(self.search, None, query, category_id, offset, limit)
+
+    def index_product(self, product: Product) -> None:
+        prepared = self._prepare([(product.id, product.title, product.description, product.category_id, product.is_active)])
+        with self._lock:
+            self._apply(prepared)
+
+    def remove_product(self, product_id: int) -> None:
+        with self._lock:
+            self._discard(product_id)
+
+    def _matches(self, token: str) -> Tuple[Set[int], Set[int]]:
+        return self._title.get(token, set()), self._body.get(token, set())
+
+    def search(self, db: Session, query: str, category_id: Optional[int], offset: int, limit: int) -> SearchResult:
+        terms = set(tokenize(query))
+        if not terms:
+            return SearchResult([], 0)
+        
+        with self._lock:
+            self.searches += 1
+            total_docs = len(self._docs) or 1
+            postings = []
+            for term in terms:
+                title_ids, body_ids = self._matches(term)
+                df = len(title_ids) + len(body_ids)
+                if not df:
+                    return SearchResult([], 0)
+                postings.append((df, math.log(1 + total_docs / df), title_ids, body_ids))
+            
+            # 從最少命中的詞開始取交集，候選集合最小
+            postings.sort(key=lambda p: p[0])
+            candidates = None
+            for _, _, title_ids, body_ids in postings:
+                matched = title_ids | body_ids
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return SearchResult([], 0)
+            if category_id:
+                docs = self._docs
+                candidates = {pid for pid in candidates if docs[pid].category_id == category_id}
+
+            def score(pid: int) -> Tuple[float, int]:
+                total = 0.0
+                for _, idf, title_ids, body_ids in postings:
+                    total += idf * (TITLE_WEIGHT if pid in title_ids else 1)
+                return total, pid
+            
+            ranked = heapq.nlargest(offset + limit, candidates, key=score)
+            return SearchResult(ranked[offset:], len(candidates))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "ready": self._ready,
+                "documents": len(self._docs),
+                "title_terms": len(self._title),
+                "body_terms": len(self._body),
+                "postings": sum(map(len, self._title.values())) + sum(map(len, self._body.values())),
+                "refresh_interval": self.refresh_interval,
+                "rebuilds": self.rebuilds,
+                "syncs": self.syncs,
+                "searches": self.searches,
+            }
+
+
+class MySQLFulltextSearchBackend(SearchBackend):
+    """
+    MySQL FULLTEXT（ngram 解析器）搜尋
+
+    需要遷移 0006 建立的 ft_products_title 與 ft_products_title_description 索引；
+    以 MATCH ... AGAINST（自然語言模式）的相關度排序，標題相關度乘以 TITLE_WEIGHT
+    """
+
+    name = "mysql"
+
+    def search(self, db: Session, query: str, category_id: Optional[int], offset: int, limit: int) -> SearchResult:
+        if not tokenize(query):
+            return SearchResult([], 0)
+        
+        relevance = match(Product.title, Product.description, against=query).in_natural_language_mode()
+        title_relevance = match(Product.title, against=query).in_natural_language_mode()
+        filters = [Product.is_active == True, relevance > 0]
+        if category_id:
+            filters.append(Product.category_id == category_id)
+        
+        ids = db.execute(
+            select(Product.id)
+            .where(*filters)
+            .order_by((title_relevance * TITLE_WEIGHT + relevance).desc(), Product.id.desc())
+            .offset(offset)
+            .limit(limit)
+        ).scalars().all()
+        total = db.execute(select(func.count(Product.id)).where(*filters)).scalar()
+        return SearchResult(list(ids), total)
+
+
+SEARCH_BACKENDS = {
+    InMemorySearchBackend.name: lambda: InMemorySearchBackend(
+        refresh_interval=settings.search_refresh_interval,
+        description_chars=settings.search_description_chars
+    ),
+    MySQLFulltextSearchBackend.name: MySQLFulltextSearchBackend,
+}
+
+
+def create_search_backend(name: str) -> SearchBackend:
+    """依設定建立搜尋後端"""
+    if name not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown search backend: {name} (choose from {', '.join(SEARCH_BACKENDS)})")
+    return SEARCH_BACKENDS[name]()
+
+
+search_backend = create_search_backend(settings.search_backend)
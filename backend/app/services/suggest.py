@@ -0,0 +1,334 @@
+"""
+搜尋建議（輸入即搜尋）服務
+/api/products/suggest 使用的進程內前綴索引，每次按鍵的請求只查詢記憶體，不訪問資料庫
+
+- 上架產品標題與分類名稱正規化後（全形轉半形、小寫、合併空白）放入排序列表，以 bisect 找出前綴範圍
+- 除了完整名稱，名稱中每個詞（英文單字、數字、連續的中日韓文字）的開頭也是一個鍵，
+  「Acme 藍牙耳機」可由「acme」或「藍牙」找到，但「牙耳」不會
+- 依熱門度排序：產品為未取消訂單的銷售數量，分類為上架產品數；相同時較新的在前
+- worker 啟動時建立，後台寫入時即時更新目前 worker；背景任務每隔 SUGGEST_REFRESH_INTERVAL 秒增量同步：
+  產品 / 分類的內容版本變更時才讀取其他 worker 的寫入（產品依 updated_at），銷量只累加新增的訂單項目，
+  取消訂單與分類產品數的變化在每隔 SUGGEST_REBUILD_INTERVAL 秒的完整重建時更新
+"""
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.content_version import CATEGORIES, PRODUCTS, content_versions
+from app.database import SessionLocal
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.product_category import ProductCategory
+from app.services.search import SYNC_OVERLAP, TOKEN_RE, normalize_text
+
+logger = logging.getLogger(__name__)
+
+PRODUCT = "product"
+CATEGORY = "category"
+
+# 鍵的最大長度（查詢字串超過時截斷，前綴比對結果相同）
+MAX_KEY_LENGTH = 64
+
+# 前綴範圍超過此鍵數時記住結果（常見的一兩個字前綴命中上萬筆，排序需數毫秒），索引變更時清除
+MEMO_MIN_MATCHES = 256
+
+# 記住的結果數上限，超過時淘汰最久未使用的
+MEMO_MAX_ENTRIES = 1024
+
+
+class Suggestion(NamedTuple):
+    id: int
+    text: str
+
+
+def _clean(text: str) -> str:
+    """正規化並合併連續空白"""
+    return " ".join(normalize_text(text).split())
+
+
+def suggestion_keys(text: Optional[str]) -> List[str]:
+    """名稱的所有索引鍵：從每個詞的開頭到結尾（最長 MAX_KEY_LENGTH 字）"""
+    cleaned = _clean(text or "")
+    starts = sorted({match.start() for match in TOKEN_RE.finditer(cleaned)} | {0})
+    return sorted({cleaned[start:start + MAX_KEY_LENGTH] for start in starts if cleaned[start:].strip()})
+
+
+class _PrefixList:
+    """單一類型（產品或分類）的排序鍵列表"""
+
+    def __init__(self):
+        # (鍵, id)，依鍵排序
+        self.entries: List[Tuple[str, int]] = []
+        # id -> (顯示名稱, 索引鍵)
+        self.items: Dict[int, Tuple[str, List[str]]] = {}
+        # id -> (熱門度, id)：nlargest 直接以 rank.__getitem__ 作為 key，不需要 Python 層的 lambda
+        self.rank: Dict[int, Tuple[int, int]] = {}
+
+    def load(self, rows: Iterable[Tuple[int, str]], popularity: Dict[int, int]) -> None:
+        for item_id, text in rows:
+            keys = suggestion_keys(text)
+            self.items[item_id] = (text, keys)
+            self.rank[item_id] = (int(popularity.get(item_id) or 0), item_id)
+            self.entries.extend((key, item_id) for key in keys)
+        self.entries.sort()
+
+    def add_popularity(self, counts: Dict[int, int]) -> None:
+        """累加熱門度（不在列表中的 id 略過）"""
+        for item_id, count in counts.items():
+            current = self.rank.get(item_id)
+            if current is not None:
+                self.rank[item_id] = (current[0] + int(count or 0), item_id)
+
+    def set(self, item_id: int, text: Optional[str]) -> None:
+        """新增或更新一筆（text 為 None 時移除），保留原本的熱門度"""
+        previous = self.items.pop(item_id, None)
+        if previous is not None:
+            for key in previous[1]:
+                index = bisect_left(self.entries, (key, item_id))
+                if index < len(self.entries) and self.entries[index] == (key, item_id):
+                    del self.entries[index]
+        if text is None:
+            self.rank.pop(item_id, None)
+            return
+        keys = suggestion_keys(text)
+        self.items[item_id] = (text, keys)
+        self.rank.setdefault(item_id, (0, item_id))
+        for key in keys:
+            insort(self.entries, (key, item_id))
+
+    def lookup(self, prefix: str, limit: int) -> Tuple[List[Suggestion], int]:
+        """返回前 limit 筆與前綴範圍內的鍵數"""
+        # 以兩次 bisect 找出前綴範圍，再以切片（C 層複製）取出，不逐筆比較字串
+        low = bisect_left(self.entries, (prefix,))
+        high = bisect_left(self.entries, (prefix + "\U0010ffff",), low)
+        matched = {item_id for _, item_id in self.entries[low:high]}
+        top = heapq.nlargest(limit, matched, key=self.rank.__getitem__)
+        return [Suggestion(item_id, self.items[item_id][0]) for item_id in top], high - low
+
+
+class SuggestIndex:
+    """排序列表前綴索引（每個 worker 進程各自一份）"""
+
+    def __init__(self, refresh_interval: float = 60.0, rebuild_interval: float = 3600.0):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._lists: Dict[str, _PrefixList] = {PRODUCT: _PrefixList(), CATEGORY: _PrefixList()}
+        self._memo: OrderedDict[Tuple[str, str, int], List[Suggestion]] = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._ready = False
+        # 增量同步的進度：產品 updated_at、已計入銷量的最大訂單項目 id、上次讀取的產品 / 分類內容版本
+        self._synced_at = None
+        self._sold_through = 0
+        self._versions: Dict[str, int] = {}
+        self._next_rebuild = 0.0
+        self.rebuilds = 0
+        self.syncs = 0
+        self.lookups = 0
+        self.memo_hits = 0
+
+    def _content_versions(self) -> Dict[str, int]:
+        versions = content_versions.current_sync()
+        return {name: versions[name].version for name in (PRODUCTS, CATEGORIES) if name in versions}
+
+    def rebuild(self) -> None:
+        """從資料庫完整重建（新索引建立完成後才替換）"""
+        versions = self._content_versions()
+        with SessionLocal() as db:
+            sold_through = db.execute(select(func.max(OrderItem.id))).scalar() or 0
+            sales = dict(db.execute(
+                select(OrderItem.product_id, func.sum(OrderItem.quantity))
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(Order.status != OrderStatus.CANCELLED, OrderItem.id <= sold_through)
+                .group_by(OrderItem.product_id)
+            ).all())
+            synced_at = db.execute(select(func.max(Product.updated_at))).scalar()
+            products = db.execute(select(Product.id, Product.title).where(Product.is_active == True)).all()
+            product_counts = dict(db.execute(
+                select(Product.category_id, func.count(Product.id))
+                .where(Product.is_active == True)
+                .group_by(Product.category_id)
+            ).all())
+            categories = db.execute(select(ProductCategory.id, ProductCategory.name)).all()
+        
+        lists = {PRODUCT: _PrefixList(), CATEGORY: _PrefixList()}
+        lists[PRODUCT].load(products, sales)
+        lists[CATEGORY].load(categories, product_counts)
+        
+        with self._lock:
+            self._lists = lists
+            self._memo.clear()
+            self._synced_at = synced_at
+            self._sold_through = sold_through
+            self._versions = versions
+            self._ready = True
+            self.rebuilds += 1
+        self._next_rebuild = time.monotonic() + self.rebuild_interval
+
+    def sync(self) -> None:
+        """
+        增量同步其他 worker 的寫入與新增的銷量
+
+        - 產品：內容版本變更時讀取 updated_at 在上次同步之後（含 SYNC_OVERLAP）的產品，並以上架產品 id 找出被刪除或下架的產品
+        - 分類：內容版本變更時重新讀取名稱（分類數量少），新分類的熱門度在下一次完整重建時更新
+        - 銷量：累加 id 大於上次同步的訂單項目；之後取消的訂單在下一次完整重建時扣除
+        """
+        versions = self._content_versions()
+        products_changed = versions.get(PRODUCTS) != self._versions.get(PRODUCTS)
+        categories_changed = versions.get(CATEGORIES) != self._versions.get(CATEGORIES)
+        with SessionLocal() as db:
+            sold = db.execute(
+                select(OrderItem.product_id, func.sum(OrderItem.quantity), func.max(OrderItem.id))
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(Order.status != OrderStatus.CANCELLED, OrderItem.id > self._sold_through)
+                .group_by(OrderItem.product_id)
+            ).all()
+            updated = active_ids = categories = None
+            if products_changed:
+                stmt = select(Product.id, Product.title, Product.is_active, Product.updated_at)
+                if self._synced_at is not None:
+                    stmt = stmt.where(Product.updated_at >= self._synced_at - SYNC_OVERLAP)
+                updated = db.execute(stmt).all()
+                active_ids = set(db.execute(select(Product.id).where(Product.is_active == True)).scalars())
+            if categories_changed:
+                categories = db.execute(select(ProductCategory.id, ProductCategory.name)).all()
+        
+        with self._lock:
+            products = self._lists[PRODUCT]
+            changed = False
+            if sold:
+                products.add_popularity({product_id: quantity for product_id, quantity, _ in sold})
+                self._sold_through = max(self._sold_through, max(last_id for _, _, last_id in sold))
+                changed = True
+            if updated is not None:
+                for product_id, title, is_active, _ in updated:
+                    text = title if is_active else None
+                    current = products.items.get(product_id)
+                    if (current[0] if current else None) != text:
+                        products.set(product_id, text)
+                        changed = True
+                for product_id in products.items.keys() - active_ids:
+                    products.set(product_id, None)
+                    changed = True
+                stamps = [row.updated_at for row in updated if row.updated_at is not None]
+                if stamps and (self._synced_at is None or max(stamps) > self._synced_at):
+                    self._synced_at = max(stamps)
+            if categories is not None:
+                category_list = self._lists[CATEGORY]
+                names = dict(categories)
+                for category_id in category_list.items.keys() - names.keys():
+                    category_list.set(category_id, None)
+                for category_id, name in names.items():
+                    current = category_list.items.get(category_id)
+                    if current is None or current[0] != name:
+                        category_list.set(category_id, name)
+                changed = True
+            if changed:
+                self._memo.clear()
+            self._versions = versions
+            self.syncs += 1
+
+    def refresh(self) -> None:
+        """背景任務呼叫：尚未建立或到達完整重建時間時完整重建，否則增量同步"""
+        if not self._ready or time.monotonic() >= self._next_rebuild:
+            self.rebuild()
+        else:
+            self.sync()
+
+    def _set(self, kind: str, item_id: int, text: Optional[str]) -> None:
+        with self._lock:
+            self._lists[kind].set(item_id, text)
+            self._memo.clear()
+
+    def set_product(self, product: Product) -> None:
+        """產品新增或更新後呼叫（下架產品會被移除）"""
+        self._set(PRODUCT, product.id, product.title if product.is_active else None)
+
+    def remove_product(self, product_id: int) -> None:
+        self._set(PRODUCT, product_id, None)
+
+    def set_category(self, category: ProductCategory) -> None:
+        self._set(CATEGORY, category.id, category.name)
+
+    def remove_category(self, category_id: int) -> None:
+        self._set(CATEGORY, category_id, None)
+
+    def suggest(self, query: str, kind: str, limit: int) -> List[Suggestion]:
+        """返回名稱以 query 開頭（或名稱中某個詞以 query 開頭）的前 limit 筆，依熱門度排序"""
+        prefix = _clean(query)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        memo_key = (prefix, kind, limit)
+        with self._lock:
+            self.lookups += 1
+            memo = self._memo.get(memo_key)
+            if memo is not None:
+                self._memo.move_to_end(memo_key)
+                self.memo_hits += 1
+                return memo
+            
+            result, matches = self._lists[kind].lookup(prefix, limit)
+            if matches >= MEMO_MIN_MATCHES:
+                self._memo[memo_key] = result
+                if len(self._memo) > MEMO_MAX_ENTRIES:
+                    self._memo.popitem(last=False)
+            return result
+
+    async def start(self) -> None:
+        """建立索引並啟動背景同步（lifespan startup 時呼叫；建立失敗時只記錄警告，由背景任務重試）"""
+        try:
+            await run_in_threadpool(self.rebuild)
+        except Exception as e:
+            logger.warning(f"建立搜尋建議索引失敗，將在背景重試: {e}")
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception as e:
+                logger.warning(f"同步搜尋建議索引失敗: {e}")
+
+    async def stop(self) -> None:
+        """停止背景同步（lifespan shutdown 時呼叫）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self._ready,
+                "products": len(self._lists[PRODUCT].items),
+                "categories": len(self._lists[CATEGORY].items),
+                "keys": sum(len(prefix_list.entries) for prefix_list in self._lists.values()),
+                "memo_entries": len(self._memo),
+                "refresh_interval": self.refresh_interval,
+                "rebuild_interval": self.rebuild_interval,
+                "rebuilds": self.rebuilds,
+                "syncs": self.syncs,
+                "lookups": self.lookups,
+                "memo_hits": self.memo_hits,
+            }
+
+
+suggest_index = SuggestIndex(
+    refresh_interval=settings.suggest_refresh_interval,
+    rebuild_interval=settings.suggest_rebuild_interval
+)
@@ -0,0 +1,128 @@
+"""
+上傳檔案儲存服務
+上傳圖片以原始檔案內容的雜湊命名（內容定址），同一張圖片重複上傳時直接返回既有 URL，不重新解碼與轉檔
+
+同一個檔案可能被多個產品、產品圖片、Banner、新聞引用，刪除前需以 find_references() 確認沒有其他引用
+"""
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.ad import Ad
+from app.models.news import News
+from app.models.product import Product
+from app.models.product_image import ProductImage
+from app.services.image_variants import STATIC_DIR, variant_cache
+
+UPLOAD_DIR = STATIC_DIR / "uploads"
+
+# 新上傳的檔案使用第一個前綴；第二個為舊資料中可能出現的路徑
+UPLOAD_URL_PREFIXES = ("/backend/static/uploads/", "/static/uploads/")
+
+# 檔名使用的雜湊長度（十六進位字元，128 bits）
+HASH_LENGTH = 32
+
+# 引用上傳圖片的欄位：(引用類型, 模型, 欄位)
+REFERENCE_COLUMNS = (
+    ("product", Product, Product.image),
+    ("product_image", ProductImage, ProductImage.image_url),
+    ("ad", Ad, Ad.image_url),
+    ("news", News, News.image),
+)
+
+
+class ImageReference(NamedTuple):
+    """引用上傳圖片的資料列"""
+    kind: str
+    id: int
+
+
+def content_filename(data: bytes) -> str:
+    """以原始上傳內容的 SHA-256 產生檔名（轉檔結果固定為 WEBP）"""
+    return f"{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.webp"
+
+
+def upload_url(filename: str) -> str:
+    return f"{UPLOAD_URL_PREFIXES[0]}{filename}"
+
+
+def filename_from_url(url: Optional[str]) -> Optional[str]:
+    """從圖片 URL 取出上傳檔名，不是上傳目錄下的檔案時返回 None"""
+    if not url:
+        return None
+    for prefix in UPLOAD_URL_PREFIXES:
+        if url.startswith(prefix):
+            filename = url[len(prefix):]
+            if filename and "/" not in filename and not filename.startswith("."):
+                return filename
+    return None
+
+
+def stored_size(filename: str) -> Optional[int]:
+    """已儲存檔案的大小，不存在時返回 None"""
+    try:
+        return (UPLOAD_DIR / filename).stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+def store_upload(data: bytes, filename: str) -> Path:
+    """原子寫入上傳目錄（先寫暫存檔再 rename），多個 worker 同時寫入同一檔名時不會產生不完整的檔案"""
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    file_path = UPLOAD_DIR / filename
+    tmp_path = UPLOAD_DIR / f".{filename}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def find_references(db: Session, filename: str) -> List[ImageReference]:
+    """查詢引用某個上傳檔案的所有資料列（以完整 URL 比對，不使用 LIKE）"""
+    urls = [f"{prefix}{filename}" for prefix in UPLOAD_URL_PREFIXES]
+    references = []
+    for kind, model, column in REFERENCE_COLUMNS:
+        ids = db.scalars(select(model.id).where(or_(*(column == url for url in urls)))).all()
+        references.extend(ImageReference(kind, row_id) for row_id in ids)
+    return references
+
+
+def build_reference_index(db: Session) -> Dict[str, List[ImageReference]]:
+    """建立 {上傳檔名: 引用列表} 索引（只讀取 id 與 URL 欄位，供孤兒檔案檢查使用）"""
+    index: Dict[str, List[ImageReference]] = {}
+    for kind, model, column in REFERENCE_COLUMNS:
+        for row_id, url in db.execute(select(model.id, column)):
+            filename = filename_from_url(url)
+            if filename:
+                index.setdefault(filename, []).append(ImageReference(kind, row_id))
+    return index
+
+
+def list_uploads() -> List[str]:
+    """列出上傳目錄中的所有檔案（不含縮圖與暫存檔）"""
+    if not UPLOAD_DIR.exists():
+        return []
+    return sorted(p.name for p in UPLOAD_DIR.iterdir() if p.is_file() and not p.name.startswith("."))
+
+
+def delete_upload(filename: str) -> bool:
+    """刪除上傳檔案與其縮圖，檔案不存在時返回 False（呼叫前需確認沒有引用）"""
+    variant_cache.remove(filename)
+    try:
+        (UPLOAD_DIR / filename).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def delete_upload_if_unreferenced(db: Session, url: Optional[str]) -> bool:
+    """URL 指向的上傳檔案已沒有任何引用時刪除（需在刪除引用的交易提交後呼叫）"""
+    filename = filename_from_url(url)
+    if filename is None or find_references(db, filename):
+        return False
+    return delete_upload(filename)
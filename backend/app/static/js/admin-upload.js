@@ -48,6 +48,40 @@ async function uploadImage(file) {
     }
 }
 
+/**
+ * 批量上传图片（一次请求，服务器并行转档）
+ * @param {File[]} files - 要上传的图片文件
+ * @param {number|null} productId - 设置后上传成功的图片会直接加入该产品
+ * @returns {Promise<{results: Array, succeeded: number, failed: number, images: Array|null}>}
+ */
+async function uploadImages(files, productId = null) {
+    if (!files || files.length === 0) {
+        throw new Error('请选择文件');
+    }
+
+    const formData = new FormData();
+    for (const file of files) {
+        formData.append('files', file);
+    }
+    if (productId) {
+        formData.append('product_id', productId);
+    }
+
+    const response = await apiRequest(`${API_BASE}/upload/batch`, {
+        method: 'POST',
+        body: formData,
+        // 不要设置 Content-Type，让浏览器自动设置（包含 boundary）
+        headers: {}
+    });
+
+    if (!response || !response.ok) {
+        const error = response ? await response.json() : {};
+        throw new Error(error.detail || '上传失败');
+    }
+
+    return await response.json();
+}
+
 /**
  * 创建图片上传组件 HTML
  * @param {string} inputId - 输入框 ID
@@ -170,6 +204,7 @@ function removeImage(previewId, inputId) {
 
 // 将函数暴露到全局
 window.uploadImage = uploadImage;
+window.uploadImages = uploadImages;
 window.createImageUploadHTML = createImageUploadHTML;
 window.handleImageUpload = handleImageUpload;
 window.removeImage = removeImage;
@@ -0,0 +1,124 @@
+"""
+購物車查詢數檢查：原本的逐項延遲載入 對比 app/repositories/cart.py（eager load + SQL 計算總價）
+
+使用記憶體 SQLite，分別建立 1、10、50 個項目的購物車（每個產品 3 張圖片），統計產生完整 CartResponse 所需的 SQL 條數，
+並斷言新寫法的查詢數不隨購物車大小改變
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_cart_queries
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+from app.models import Cart, CartItem, Product, ProductCategory, ProductImage, User
+from app.repositories.cart import cart_total, load_cart
+from app.schemas.cart import CartItemResponse, CartResponse
+from app.serializers.cart import serialize_cart
+from app.serializers.product import serialize_products
+
+CART_SIZES = (1, 10, 50)
+IMAGES_PER_PRODUCT = 3
+
+
+class QueryCounter:
+    """統計執行的 SQL 條數"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def measure(self, fn) -> int:
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._before_execute)
+        try:
+            fn()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._before_execute)
+        return self.count
+
+
+def seed(session: Session, size: int) -> int:
+    """建立一個含 size 個項目的購物車，返回購物車 ID"""
+    category = ProductCategory(name=f"Bench {size}", sort_order=0)
+    user = User(name=f"bench{size}", email=f"bench{size}@example.com", password_hash="x")
+    session.add_all([category, user])
+    session.flush()
+    cart = Cart(user_id=user.id)
+    session.add(cart)
+    session.flush()
+    for i in range(size):
+        product = Product(
+            title=f"Product {size}-{i}",
+            price=100 + i,
+            description="Lorem ipsum dolor sit amet.",
+            image=f"/backend/static/uploads/{i}.webp",
+            category_id=category.id,
+            stock=10,
+            is_active=True
+        )
+        session.add(product)
+        session.flush()
+        for j in range(IMAGES_PER_PRODUCT):
+            session.add(ProductImage(product_id=product.id, image_url=f"/backend/static/uploads/{i}-{j}.webp", order_index=j))
+        session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=2))
+    session.commit()
+    return cart.id
+
+
+def legacy_response(session: Session, cart_id: int) -> CartResponse:
+    """重構前路由中的寫法：逐項延遲載入產品，並補上分類與圖片（與新寫法返回相同內容）"""
+    cart = session.query(Cart).filter(Cart.id == cart_id).first()
+    total = sum(item.product.price * item.quantity for item in cart.items)
+    products = serialize_products([item.product for item in cart.items])
+    return CartResponse(
+        id=cart.id,
+        user_id=cart.user_id,
+        items=[
+            CartItemResponse(id=item.id, product_id=item.product_id, quantity=item.quantity, product=product)
+            for item, product in zip(cart.items, products)
+        ],
+        total=total,
+        created_at=cart.created_at,
+        updated_at=cart.updated_at
+    )
+
+
+def repository_response(session: Session, cart_id: int) -> CartResponse:
+    return serialize_cart(load_cart(session, cart_id), cart_total(session, cart_id))
+
+
+if __name__ == "__main__":
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    counter = QueryCounter(engine)
+    
+    cart_ids = {}
+    with SessionLocal() as session:
+        for size in CART_SIZES:
+            cart_ids[size] = seed(session, size)
+    
+    repository_counts = []
+    print(f"{'items':>6}  {'legacy queries':>14}  {'repository queries':>18}")
+    for size in CART_SIZES:
+        with SessionLocal() as session:
+            legacy = counter.measure(lambda: legacy_response(session, cart_ids[size]))
+        with SessionLocal() as session:
+            expected = legacy_response(session, cart_ids[size])
+        with SessionLocal() as session:
+            result = {}
+            repository = counter.measure(lambda: result.setdefault("response", repository_response(session, cart_ids[size])))
+        assert result["response"] == expected, "repository response differs from legacy response"
+        repository_counts.append(repository)
+        print(f"{size:>6}  {legacy:>14}  {repository:>18}")
+    
+    assert len(set(repository_counts)) == 1, f"query count grows with cart size: {repository_counts}"
+    print(f"OK: repository query count is constant ({repository_counts[0]})")
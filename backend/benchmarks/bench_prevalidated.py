@@ -0,0 +1,89 @@
+"""
+已驗證回應基準測試：100 筆產品列表頁每個請求的 CPU 時間
+
+直接以 ASGI 介面呼叫 FastAPI 應用（同 benchmarks/bench_responses.py），路由都宣告 response_model=ProductListResponse，
+返回值都已由 serialize_products 驗證過：
+- response_model：返回 ProductListResponse，由 FastAPI 以 response_model 再驗證一次並序列化（重構前）
+- prevalidated：返回 PrevalidatedJSONResponse(模型)，跳過驗證，由 pydantic-core 直接輸出 JSON
+- cached bytes：返回 PrevalidatedJSONResponse(bytes)，產品目錄快取命中時的情況（不驗證也不序列化）
+- response_model (dict)：返回 dict，FastAPI 需要從 dict 完整驗證一次，作為對照
+
+最後一欄為相對於 response_model 每個請求節省的 CPU 時間；各變體的輸出位元組相同
+
+分別在有 / 沒有 Pydantic JSON 快速路徑時執行（以 default_response_class=JSONResponse 關閉，等同舊版 FastAPI）：
+有快速路徑時 FastAPI 對模型實例的驗證只做型別檢查，prevalidated 與 response_model 相近，主要節省來自快取序列化結果；
+沒有快速路徑時 response_model 會先轉成 dict 再以 json.dumps 輸出，prevalidated 本身即可省下這一段
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_prevalidated
+"""
+import asyncio
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.responses import PYDANTIC_JSON_FAST_PATH, PrevalidatedJSONResponse
+from app.schemas.product import ProductListResponse
+from app.serializers.product import serialize_products
+from benchmarks.bench_product_serializer import make_products
+from benchmarks.bench_responses import measure
+
+PAGE_SIZE = 100
+
+
+def make_app(response_class=None) -> FastAPI:
+    page = ProductListResponse(
+        products=serialize_products(make_products(PAGE_SIZE)), total=PAGE_SIZE, page=1, page_size=PAGE_SIZE,
+        total_pages=1
+    )
+    body = PrevalidatedJSONResponse(page).body
+    payload = page.model_dump()
+    
+    app = FastAPI(default_response_class=response_class) if response_class else FastAPI()
+
+    @app.get("/response-model", response_model=ProductListResponse)
+    async def response_model():
+        return page
+
+    @app.get("/prevalidated", response_model=ProductListResponse)
+    async def prevalidated():
+        return PrevalidatedJSONResponse(page)
+
+    @app.get("/cached", response_model=ProductListResponse)
+    async def cached():
+        return PrevalidatedJSONResponse(body)
+
+    @app.get("/dict", response_model=ProductListResponse)
+    async def from_dict():
+        return payload
+    
+    return app
+
+
+async def main() -> None:
+    variants = (
+        ("response_model", "/response-model"),
+        ("prevalidated", "/prevalidated"),
+        ("cached bytes", "/cached"),
+        ("response_model (dict)", "/dict"),
+    )
+    apps = (
+        ("fast path", make_app()),
+        ("no fast path", make_app(JSONResponse)),
+    )
+    print(f"Pydantic JSON fast path available: {PYDANTIC_JSON_FAST_PATH}, {PAGE_SIZE} products per page")
+    print(f"{'app':>12}  {'variant':>22}  {'bytes':>8}  {'cpu':>9}  {'saved':>9}")
+    for app_name, app in apps:
+        baseline = None
+        for name, path in variants:
+            size, cpu_ms = await measure(app, path, "identity")
+            if baseline is None:
+                baseline = cpu_ms
+            print(f"{app_name:>12}  {name:>22}  {size:>8}  {cpu_ms:>7.3f}ms  {baseline - cpu_ms:>7.3f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+產品列表查詢基準測試：joinedload(category, images) 對比 product_listing_stmt（selectinload + 欄位投影）
+
+使用記憶體 SQLite，每個產品 12 張圖片，統計資料庫返回的行數、資料量與每頁延遲
+（joinedload 每一行都重複攜帶完整的產品欄位與 description，行數相近時資料量差距才是重點）
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_product_listing
+"""
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+
+from app.database import Base
+from app.models import Product, ProductCategory, ProductImage
+from app.repositories.product import product_listing_stmt
+
+PRODUCTS = 500
+IMAGES_PER_PRODUCT = 12
+PAGE_SIZE = 9
+ROUNDS = 200
+
+
+class RowCounter:
+    """記錄每條 SQL 實際從資料庫讀取的行數與資料量"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.rows = 0
+        self.bytes = 0
+        self.statements = 0
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        # SQLite 的 SELECT rowcount 為 -1，重新執行一次取得行數
+        if statement.lstrip().upper().startswith("SELECT"):
+            raw = conn.connection.dbapi_connection.cursor()
+            raw.execute(statement, parameters)
+            for row in raw.fetchall():
+                self.rows += 1
+                self.bytes += sum(len(str(value)) for value in row if value is not None)
+
+    def measure(self, fn):
+        self.rows = self.bytes = self.statements = 0
+        event.listen(self.engine, "after_cursor_execute", self._after_execute)
+        try:
+            fn()
+        finally:
+            event.remove(self.engine, "after_cursor_execute", self._after_execute)
+        return self.statements, self.rows, self.bytes
+
+
+def seed(session: Session):
+    category = ProductCategory(name="Bench", sort_order=0)
+    session.add(category)
+    session.flush()
+    for i in range(PRODUCTS):
+        product = Product(
+            title=f"Product {i}",
+            price=100 + i,
+            description="Lorem ipsum dolor sit amet. " * 200,
+            image=f"/backend/static/uploads/{i}.webp",
+            category_id=category.id,
+            stock=10,
+            is_active=True
+        )
+        session.add(product)
+        session.flush()
+        for j in range(IMAGES_PER_PRODUCT):
+            session.add(ProductImage(product_id=product.id, image_url=f"/backend/static/uploads/{i}-{j}.webp", order_index=j))
+    session.commit()
+
+
+def legacy_page(session: Session, page: int):
+    return session.query(Product).options(
+        joinedload(Product.category),
+        joinedload(Product.images)
+    ).filter(Product.is_active == True).offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE).all()
+
+
+def listing_page(session: Session, page: int):
+    stmt = product_listing_stmt(Product.is_active == True).offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE)
+    return session.execute(stmt).scalars().all()
+
+
+def run(name, fn, session_factory, counter):
+    pages = PRODUCTS // PAGE_SIZE
+
+    def one_page():
+        with session_factory() as session:
+            fn(session, 1)
+
+    statements, rows, fetched = counter.measure(one_page)
+
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        with session_factory() as session:
+            products = fn(session, (i % pages) + 1)
+            for p in products:
+                len(p.images)
+                p.category.name
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+    print(
+        f"{name:<28} statements={statements:<3} rows_fetched={rows:<5} "
+        f"bytes_fetched={fetched:<8} latency={elapsed:.3f} ms/page"
+    )
+
+
+if __name__ == "__main__":
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as session:
+        seed(session)
+
+    counter = RowCounter(engine)
+    print(f"{PRODUCTS} products x {IMAGES_PER_PRODUCT} images, page_size={PAGE_SIZE}, {ROUNDS} rounds")
+    run("joinedload(category,images)", legacy_page, session_factory, counter)
+    run("product_listing_stmt", listing_page, session_factory, counter)
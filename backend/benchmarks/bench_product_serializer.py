@@ -0,0 +1,98 @@
+"""
+產品序列化基準測試：逐筆 ProductResponse(**dict) 驗證 對比 serialize_products（整個列表一次 TypeAdapter 驗證）
+
+以未綁定 Session 的 ORM 物件模擬查詢結果（每個產品 4 張圖片），分別測試 9、100、1000 筆產品的頁面
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_product_serializer
+"""
+import os
+import timeit
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter
+
+from app.models import Product, ProductCategory, ProductImage
+from app.schemas.product import ProductImageResponse, ProductResponse
+from app.serializers.product import serialize_products
+
+IMAGES_PER_PRODUCT = 4
+PAGE_SIZES = (9, 100, 1000)
+
+products_adapter = TypeAdapter(list[ProductResponse])
+
+
+def make_products(count: int) -> list:
+    category = ProductCategory(id=1, name="Bench")
+    now = datetime.now(timezone.utc)
+    products = []
+    for i in range(count):
+        product = Product(
+            id=i + 1,
+            title=f"Product {i}",
+            price=100.0 + i,
+            description="Lorem ipsum dolor sit amet. " * 8,
+            image=f"/backend/static/uploads/{i}.webp",
+            category_id=1,
+            stock=10,
+            is_active=True,
+            created_at=now
+        )
+        product.category = category
+        product.images = [
+            ProductImage(id=i * 10 + j, image_url=f"/backend/static/uploads/{i}-{j}.webp", order_index=j)
+            for j in range(IMAGES_PER_PRODUCT)
+        ]
+        products.append(product)
+    return products
+
+
+def legacy_serialize(products: list) -> list:
+    """重構前各路由中重複的寫法"""
+    product_responses = []
+    for p in products:
+        product_images = [
+            ProductImageResponse(
+                id=img.id,
+                image_url=img.image_url,
+                order_index=img.order_index
+            )
+            for img in sorted(p.images, key=lambda x: x.order_index) if p.images
+        ]
+        product_dict = {
+            "id": p.id,
+            "title": p.title,
+            "price": p.price,
+            "description": p.description,
+            "image": p.image,
+            "category_id": p.category_id,
+            "category_name": p.category.name if p.category else None,
+            "stock": p.stock,
+            "is_active": p.is_active,
+            "created_at": p.created_at,
+            "product_images": product_images
+        }
+        product_responses.append(ProductResponse(**product_dict))
+    return product_responses
+
+
+def bench(fn, number: int) -> float:
+    """返回每次呼叫的平均耗時（微秒），取 5 輪最佳值"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1_000_000
+
+
+if __name__ == "__main__":
+    print(f"{'products':>8}  {'legacy':>12}  {'serialize':>12}  {'speedup':>7}  {'legacy+json':>12}  {'serialize+json':>14}")
+    for size in PAGE_SIZES:
+        products = make_products(size)
+        number = max(1, 2000 // size)
+        legacy = bench(lambda: legacy_serialize(products), number)
+        fast = bench(lambda: serialize_products(products), number)
+        legacy_json = bench(lambda: products_adapter.dump_json(legacy_serialize(products)), number)
+        fast_json = bench(lambda: products_adapter.dump_json(serialize_products(products)), number)
+        print(
+            f"{size:>8}  {legacy:>10.1f}us  {fast:>10.1f}us  {legacy / fast:>6.2f}x  "
+            f"{legacy_json:>10.1f}us  {fast_json:>12.1f}us"
+        )
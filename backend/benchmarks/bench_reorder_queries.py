@@ -0,0 +1,97 @@
+"""
+批次排序查詢數檢查：原本逐筆 SELECT + UPDATE 的產品圖片排序 對比 app/services/reorder.py（單一 UPDATE ... CASE）
+
+使用記憶體 SQLite，分別對 5、20、50 張產品圖片反轉順序（列表末尾加上其他產品的圖片 ID 與不存在的 ID，兩種寫法都應略過），
+統計 SQL 條數並確認兩種寫法的結果一致，斷言新寫法固定為 1 條查詢
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_reorder_queries
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+from app.models import Product, ProductCategory, ProductImage
+from app.services.reorder import apply_order
+from benchmarks.bench_cart_queries import QueryCounter
+
+SIZES = (5, 20, 50)
+
+
+def seed(session: Session, size: int) -> int:
+    """建立一個含 size 張圖片的產品，返回產品 ID"""
+    category = ProductCategory(name=f"Bench {size}", sort_order=0)
+    session.add(category)
+    session.flush()
+    product = Product(
+        title=f"Product {size}",
+        price=100,
+        description="Lorem ipsum dolor sit amet.",
+        image="/backend/static/uploads/0.webp",
+        category_id=category.id,
+        stock=10,
+        is_active=True
+    )
+    session.add(product)
+    session.flush()
+    for i in range(size):
+        session.add(ProductImage(product_id=product.id, image_url=f"/backend/static/uploads/{size}-{i}.webp", order_index=i))
+    session.commit()
+    return product.id
+
+
+def image_ids(session: Session, product_id: int) -> list:
+    return list(session.scalars(
+        select(ProductImage.id).where(ProductImage.product_id == product_id).order_by(ProductImage.order_index, ProductImage.id)
+    ))
+
+
+def legacy_reorder(session: Session, product_id: int, ids: list) -> None:
+    """重構前 reorder_product_images 的寫法：每個 ID 一次 SELECT，逐筆更新"""
+    for index, image_id in enumerate(ids):
+        image = session.query(ProductImage).filter(
+            ProductImage.id == image_id,
+            ProductImage.product_id == product_id
+        ).first()
+        if image:
+            image.order_index = index
+    session.commit()
+
+
+def bulk(session: Session, product_id: int, ids: list) -> None:
+    apply_order(session, ProductImage, ProductImage.order_index, ids, criteria=(ProductImage.product_id == product_id,))
+    session.commit()
+
+
+if __name__ == "__main__":
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    counter = QueryCounter(engine)
+    
+    print(f"{'images':>6}  {'legacy queries':>14}  {'bulk queries':>12}")
+    for size in SIZES:
+        with SessionLocal() as session:
+            legacy_id = seed(session, size)
+            bulk_id = seed(session, size)
+            legacy_ids = list(reversed(image_ids(session, legacy_id)))
+            bulk_ids = list(reversed(image_ids(session, bulk_id)))
+        # 不屬於該產品與不存在的 ID
+        ignored = [bulk_ids[0], 999999]
+        with SessionLocal() as session:
+            legacy = counter.measure(lambda: legacy_reorder(session, legacy_id, legacy_ids + ignored))
+        ignored = [legacy_ids[0], 999999]
+        with SessionLocal() as session:
+            queries = counter.measure(lambda: bulk(session, bulk_id, bulk_ids + ignored))
+        with SessionLocal() as session:
+            assert image_ids(session, legacy_id) == legacy_ids, "legacy reorder result mismatch"
+            assert image_ids(session, bulk_id) == bulk_ids, "bulk reorder result mismatch"
+        # COMMIT 不經過 cursor，不計入
+        assert queries == 1, f"bulk reorder used {queries} queries"
+        print(f"{size:>6}  {legacy:>14}  {queries:>12}")
+    
+    print("OK: bulk reorder always uses 1 query")
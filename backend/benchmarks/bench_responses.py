@@ -0,0 +1,134 @@
+"""
+回應序列化與壓縮基準測試：每個請求的傳輸位元組數與 CPU 時間
+
+直接以 ASGI 介面呼叫 FastAPI 應用（不經過 HTTP 客戶端），比較：
+- default：FastAPI 預設回應類別，不壓縮（重構前）
+- orjson：ORJSONResponse 為預設回應類別（新版 FastAPI 會因此關閉 Pydantic JSON 快速路徑）
+- identity / gzip / br：預設回應類別 + CompressionMiddleware（預設設定：gzip 6、brotli 4），
+  identity 為客戶端不接受壓縮時中介層本身的成本
+
+端點：100 筆產品的列表頁（response_model）、10 筆訂單各 5 項（OrderResponse 內含 ProductResponse）、
+返回 dict 的後台產品列表（沒有 response_model）
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_responses
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI
+
+from app.core.compression import CompressionMiddleware
+from app.core.responses import PYDANTIC_JSON_FAST_PATH, ORJSONResponse
+from app.schemas.order import OrderResponse
+from app.schemas.product import ProductListResponse
+from app.serializers.product import serialize_products
+from benchmarks.bench_product_serializer import make_products
+
+PAGE_SIZE = 100
+ORDER_COUNT = 10
+ITEMS_PER_ORDER = 5
+REQUESTS = 300
+ROUNDS = 5
+
+
+def make_app(response_class=None, compression: bool = False) -> FastAPI:
+    products = make_products(PAGE_SIZE)
+    page = serialize_products(products)
+    now = datetime.now(timezone.utc)
+    orders = [
+        {
+            "id": i + 1, "user_id": 1, "total_amount": 500.0, "status": "pending",
+            "shipping_name": "王小明", "shipping_address": "忠孝東路一段 1 號", "shipping_city": "台北市",
+            "shipping_zip": "100", "payment_method": "ecpay", "created_at": now, "updated_at": now,
+            "items": [
+                {"id": i * 10 + j, "product_id": j + 1, "quantity": 1, "price": 100.0, "product": page[j]}
+                for j in range(ITEMS_PER_ORDER)
+            ],
+        }
+        for i in range(ORDER_COUNT)
+    ]
+    admin_rows = [
+        {
+            "id": p.id, "title": p.title, "price": p.price, "description": p.description, "image": p.image,
+            "category_id": p.category_id, "stock": p.stock, "is_active": p.is_active, "created_at": p.created_at,
+        }
+        for p in products
+    ]
+    
+    app = FastAPI(default_response_class=response_class) if response_class else FastAPI()
+    if compression:
+        app.add_middleware(CompressionMiddleware)
+
+    @app.get("/products", response_model=ProductListResponse)
+    async def product_list():
+        return ProductListResponse(products=page, total=PAGE_SIZE, page=1, page_size=PAGE_SIZE, total_pages=1)
+
+    @app.get("/orders", response_model=List[OrderResponse])
+    async def order_list():
+        return orders
+
+    @app.get("/admin/products")
+    async def admin_product_list():
+        return {"products": admin_rows, "total": PAGE_SIZE}
+    
+    return app
+
+
+async def call(app: FastAPI, path: str, accept_encoding: str) -> int:
+    """執行一次請求，返回回應內容的位元組數"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+    
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(app: FastAPI, path: str, accept_encoding: str) -> tuple:
+    """返回 (每個請求的位元組數, 每個請求的 CPU 毫秒數)，CPU 時間取 ROUNDS 輪最佳值"""
+    size = await call(app, path, accept_encoding)
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.process_time()
+        for _ in range(REQUESTS):
+            await call(app, path, accept_encoding)
+        best = min(best, time.process_time() - started)
+    return size, best / REQUESTS * 1000
+
+
+async def main() -> None:
+    variants = (
+        ("default", make_app(), "identity"),
+        ("orjson", make_app(ORJSONResponse), "identity"),
+        ("identity", make_app(compression=True), "identity"),
+        ("gzip", make_app(compression=True), "gzip"),
+        ("br", make_app(compression=True), "br, gzip"),
+    )
+    print(f"Pydantic JSON fast path: {PYDANTIC_JSON_FAST_PATH}")
+    print(f"{'endpoint':>16}  {'variant':>9}  {'bytes':>8}  {'cpu':>9}")
+    for path in ("/products", "/orders", "/admin/products"):
+        for name, app, accept_encoding in variants:
+            size, cpu_ms = await measure(app, path, accept_encoding)
+            print(f"{path:>16}  {name:>9}  {size:>8}  {cpu_ms:>7.3f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+產品搜尋基準測試：LIKE '%關鍵字%' 全表掃描 對比 memory 搜尋後端（進程內倒排索引）
+
+以隨機組合的中英文商品名稱產生 100,000 個產品，分別測試命中少量、中量、大量產品的查詢，
+LIKE 查詢在記憶體中的 SQLite 上執行（不含網路往返，實際 MySQL 只會更慢）
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_search
+"""
+import os
+import random
+import time
+import timeit
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, func, insert, or_, select
+
+from app.database import Base
+from app.models import Product, ProductCategory
+from app.services.search import InMemorySearchBackend
+
+PRODUCT_COUNT = 100_000
+PAGE_SIZE = 9
+QUERIES = ("旗艦 耳機", "藍牙耳機", "保溫", "wireless", "pro")
+
+BRANDS = ["Acme", "Nova", "Zen", "Orbit", "Pixel", "Lumen", "Terra", "Vivo", "Kite", "Echo"]
+NOUNS = ["藍牙耳機", "保溫杯", "行動電源", "機械鍵盤", "無線滑鼠", "運動背包", "咖啡豆", "檯燈", "手機殼", "電動牙刷",
+         "wireless charger", "yoga mat", "water bottle", "desk lamp", "phone stand"]
+ADJECTIVES = ["輕量", "旗艦", "限定", "經典", "Pro", "Mini", "Max", "防水", "快充", "降噪"]
+PHRASES = ["適合通勤與旅行使用", "一年保固，享免費維修", "採用環保材質製作", "人體工學設計，長時間使用不疲勞",
+           "supports fast charging", "lightweight and durable", "ideal for home office"]
+
+
+def make_rows(count: int) -> list:
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        title = f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)}{rng.choice(NOUNS)} {rng.randint(1, 99)}"
+        description = "，".join(rng.sample(PHRASES, 3))
+        rows.append({
+            "id": i + 1,
+            "title": title,
+            "price": 100.0,
+            "description": description,
+            "image": f"/backend/static/uploads/{i}.webp",
+            "category_id": 1 + i % 10,
+            "stock": 10,
+            "is_active": True,
+        })
+    return rows
+
+
+def like_search(conn, query: str) -> tuple:
+    """重構前的寫法：每個關鍵字 title / description LIKE '%x%'，依建立順序排序"""
+    filters = [or_(Product.title.contains(term), Product.description.contains(term)) for term in query.split()]
+    ids = conn.execute(select(Product.id).where(*filters).order_by(Product.id.desc()).limit(PAGE_SIZE)).scalars().all()
+    total = conn.execute(select(func.count(Product.id)).where(*filters)).scalar()
+    return ids, total
+
+
+def bench(fn, number: int) -> float:
+    """返回每次呼叫的平均耗時（毫秒），取 5 輪最佳值"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+if __name__ == "__main__":
+    rows = make_rows(PRODUCT_COUNT)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(ProductCategory), [{"id": i, "name": f"Category {i}"} for i in range(1, 11)])
+        conn.execute(insert(Product), rows)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    backend = InMemorySearchBackend()
+    backend._apply(backend._prepare(
+        (row["id"], row["title"], row["description"], row["category_id"], row["is_active"]) for row in rows
+    ))
+    build_seconds = time.perf_counter() - started
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"index: {PRODUCT_COUNT} products built in {build_seconds:.2f}s, {index_bytes / 1024 / 1024:.0f} MiB")
+
+    print(f"{'query':>14}  {'hits':>7}  {'LIKE':>10}  {'memory':>10}  {'+category':>10}")
+    with engine.connect() as conn:
+        for query in QUERIES:
+            total = backend.search(None, query, None, 0, PAGE_SIZE).total
+            like = bench(lambda: like_search(conn, query), 3)
+            memory = bench(lambda: backend.search(None, query, None, 0, PAGE_SIZE), 20)
+            category = bench(lambda: backend.search(None, query, 3, 0, PAGE_SIZE), 20)
+            print(f"{query:>14}  {total:>7}  {like:>8.2f}ms  {memory:>8.2f}ms  {category:>8.2f}ms")
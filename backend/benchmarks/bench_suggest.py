@@ -0,0 +1,63 @@
+"""
+搜尋建議基準測試：10 萬個產品標題的前綴索引建立時間、記憶體用量與每次按鍵的查詢耗時
+
+產品名稱與 bench_search 相同；「冷」為索引剛變更後（前綴結果尚未記住）的耗時
+
+執行方式（在 backend 目錄下）：
+  uv run python -m benchmarks.bench_suggest
+"""
+import os
+import time
+import timeit
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.bench_search import PRODUCT_COUNT, make_rows
+from app.services.suggest import PRODUCT, SuggestIndex
+
+KEYSTROKES = ("a", "ac", "acm", "acme", "acme 旗", "藍", "藍牙", "藍牙耳", "wireless c")
+LIMIT = 8
+
+
+def build(rows: list) -> SuggestIndex:
+    """以與 SuggestIndex.rebuild() 相同的方式建立索引（不經過資料庫）"""
+    index = SuggestIndex()
+    index._lists[PRODUCT].load(
+        ((row["id"], row["title"]) for row in rows),
+        {row["id"]: row["id"] % 50 for row in rows}
+    )
+    return index
+
+
+def bench(fn, number: int) -> float:
+    """返回每次呼叫的平均耗時（微秒），取 5 輪最佳值"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1_000_000
+
+
+def cold(index: SuggestIndex, prefix: str) -> None:
+    index._memo.clear()
+    index.suggest(prefix, PRODUCT, LIMIT)
+
+
+if __name__ == "__main__":
+    rows = make_rows(PRODUCT_COUNT)
+
+    started = time.perf_counter()
+    build(rows)
+    build_seconds = time.perf_counter() - started
+    tracemalloc.start()
+    index = build(rows)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        f"index: {PRODUCT_COUNT} products, {len(index._lists[PRODUCT].entries)} keys, "
+        f"built in {build_seconds:.2f}s, {index_bytes / 1024 / 1024:.0f} MiB"
+    )
+
+    print(f"{'prefix':>12}  {'matches':>7}  {'cold':>10}  {'warm':>10}")
+    for prefix in KEYSTROKES:
+        matches = len(index.suggest(prefix, PRODUCT, PRODUCT_COUNT))
+        cold_us = bench(lambda: cold(index, prefix), 20)
+        warm_us = bench(lambda: index.suggest(prefix, PRODUCT, LIMIT), 200)
+        print(f"{prefix:>12}  {matches:>7}  {cold_us:>8.1f}us  {warm_us:>8.1f}us")
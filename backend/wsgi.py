@@ -1,8 +1,14 @@
 """
 WSGI 應用入口文件（用於 uWSGI）
 """
+from app.config import settings
 from app.main import app
 
+# WSGI 模式不會觸發 ASGI lifespan，資料庫啟動工作需在此明確執行
+if settings.init_db_on_startup:
+    from app.bootstrap import run_startup_tasks
+    run_startup_tasks()
+
 # 供 uWSGI 使用
 application = app
 
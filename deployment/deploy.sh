@@ -35,6 +35,15 @@ if [ ! -f "wsgi.py" ]; then
     echo "警告: wsgi.py 不存在，请确保文件已创建"
 fi
 
+# 执行数据库启动工作（建库、建表、迁移、默认管理员），每次部署执行一次
+# 生产环境可设置 INIT_DB_ON_STARTUP=false，worker 启动时不再访问数据库
+echo "执行数据库初始化与迁移..."
+"${BACKEND_DIR}/.venv/bin/python" -m app.bootstrap
+
+# 预压缩静态文件（app/static 下的 js、css、后台 HTML 生成 .gz / .br，由应用按 Accept-Encoding 提供）
+echo "预压缩静态文件..."
+"${BACKEND_DIR}/.venv/bin/python" -m app.precompress_static
+
 # 测试导入应用
 echo "测试应用导入..."
 "${BACKEND_DIR}/.venv/bin/python" -c "from app.main import app; print('应用导入成功')"
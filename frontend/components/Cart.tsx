@@ -1,7 +1,7 @@
 import React from 'react';
 import { CartItem } from '../types';
 import { Trash2, Plus, Minus, ArrowRight, ShoppingBag } from 'lucide-react';
-import { getImageUrl } from '../utils/imageUrl';
+import { getImageSrcSet, getImageVariantUrl } from '../utils/imageUrl';
 
 interface CartProps {
   items: CartItem[];
@@ -53,13 +53,14 @@ export const Cart: React.FC<CartProps> = ({ items, updateQuantity, removeFromCar
           {items.map((item) => {
             // Get the first image (from product_images array or fallback to item.image)
             const firstImage = getProductImage(item as CartItem & { product_images?: Array<{ image_url: string; order_index: number }> });
-            // Convert relative path to absolute URL
-            const imageUrl = getImageUrl(firstImage);
+            // Use small resized variants for the 96px thumbnail
+            const imageUrl = getImageVariantUrl(firstImage, 160);
+            const imageSrcSet = getImageSrcSet(firstImage, [160, 320]);
 
             return (
             <div key={item.id} className="bg-white p-4 rounded-xl border border-gray-100 shadow-sm flex gap-4 items-center">
               <div className="w-24 h-24 bg-gray-100 rounded-lg overflow-hidden flex-shrink-0">
-                  <img src={imageUrl} alt={item.title} className="w-full h-full object-cover" />
+                  <img src={imageUrl} srcSet={imageSrcSet} sizes="96px" alt={item.title} className="w-full h-full object-cover" />
               </div>
               
               <div className="flex-1 min-w-0">
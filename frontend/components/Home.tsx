@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { ArrowRight, ShieldCheck, Truck, Clock, Newspaper, ChevronRight } from 'lucide-react';
 import { Product, NewsItem } from '../types';
 import { fetchAds, Ad } from '../services/api';
-import { getImageUrl } from '../utils/imageUrl';
+import { getImageUrl, getImageSrcSet, getImageVariantUrl } from '../utils/imageUrl';
 
 interface HomeProps {
   featuredProducts: Product[];
@@ -143,14 +143,17 @@ export const Home: React.FC<HomeProps> = ({ featuredProducts, newsItems, onShopN
                 ? product.product_images[0].image_url
                 : product.image;
               
-              // 转换相对路径为绝对路径
-              const imageUrl = getImageUrl(firstImage || '');
+              // 使用缩图（320 / 640px）而不是原图
+              const imageUrl = getImageVariantUrl(firstImage, 640);
+              const imageSrcSet = getImageSrcSet(firstImage, [320, 640]);
               
               return (
                 <div key={product.id} className="group cursor-pointer" onClick={() => onProductClick(product)}>
                   <div className="bg-gray-100 rounded-2xl overflow-hidden relative aspect-[4/3] mb-4">
                       <img 
                           src={imageUrl} 
+                          srcSet={imageSrcSet}
+                          sizes="(min-width: 768px) 400px, 100vw"
                           alt={product.title} 
                           className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500"
                       />
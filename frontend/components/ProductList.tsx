@@ -1,7 +1,7 @@
 import React from 'react';
 import { Product } from '../services/api';
 import { ShoppingCart, Star, Eye, ChevronLeft, ChevronRight } from 'lucide-react';
-import { getImageUrl } from '../utils/imageUrl';
+import { getImageSrcSet, getImageVariantUrl } from '../utils/imageUrl';
 
 interface ProductListProps {
   products: Product[];
@@ -32,8 +32,9 @@ export const ProductList: React.FC<ProductListProps> = ({
             ? product.product_images[0].image_url
             : product.image;
           
-          // Convert relative path to absolute URL
-          const imageUrl = getImageUrl(firstImage);
+          // Use resized variants (320 / 640px) instead of the full-size upload
+          const imageUrl = getImageVariantUrl(firstImage, 640);
+          const imageSrcSet = getImageSrcSet(firstImage, [320, 640]);
           
           return (
           <div key={product.id} className="bg-white rounded-2xl shadow-sm border border-gray-100 hover:shadow-xl transition-all duration-300 flex flex-col overflow-hidden group">
@@ -43,6 +44,9 @@ export const ProductList: React.FC<ProductListProps> = ({
             >
               <img 
                   src={imageUrl} 
+                  srcSet={imageSrcSet}
+                  sizes="(min-width: 1024px) 400px, (min-width: 640px) 50vw, 100vw"
+                  loading="lazy"
                 alt={product.title} 
                 className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-700" 
               />
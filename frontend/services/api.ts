@@ -81,6 +81,17 @@ export interface ProductListResponse {
   total_pages: number;
 }
 
+export interface SuggestionItem {
+  id: number;
+  text: string;
+}
+
+export interface SuggestResponse {
+  query: string;
+  products: SuggestionItem[];
+  categories: SuggestionItem[];
+}
+
 export interface User {
   id: number;
   email: string;
@@ -290,6 +301,39 @@ export async function fetchProducts(
   return apiRequest<ProductListResponse>(`/products?${params.toString()}`);
 }
 
+export async function searchProducts(
+  query: string,
+  categoryId?: number | null,
+  page: number = 1,
+  pageSize: number = 9
+): Promise<ProductListResponse> {
+  const params = new URLSearchParams({
+    q: query,
+    page: page.toString(),
+    page_size: pageSize.toString(),
+  });
+  
+  if (categoryId) {
+    params.append('category_id', categoryId.toString());
+  }
+  
+  return apiRequest<ProductListResponse>(`/products/search?${params.toString()}`);
+}
+
+// 搜尋建議：每次按鍵呼叫，傳入 AbortSignal 以取消上一次尚未完成的請求
+export async function fetchSuggestions(
+  query: string,
+  signal?: AbortSignal,
+  limit: number = 8
+): Promise<SuggestResponse> {
+  const params = new URLSearchParams({
+    q: query,
+    limit: limit.toString(),
+  });
+  
+  return apiRequest<SuggestResponse>(`/products/suggest?${params.toString()}`, { signal });
+}
+
 export async function fetchProductDetail(productId: number): Promise<Product> {
   return apiRequest<Product>(`/products/${productId}`);
 }
@@ -23,3 +23,35 @@ export function getImageUrl(url: string | null | undefined): string {
   return `https://shopping-react.ai-tracks.com${url.startsWith('/') ? url : '/' + url}`;
 }
 
+
+// 後台上傳圖片路徑與縮圖路徑（縮圖寬度需為 backend IMAGE_VARIANT_WIDTHS 之一）
+const UPLOAD_PATH = '/backend/static/uploads/';
+const VARIANT_PATH = '/backend/static/img/';
+
+/**
+ * 將後台上傳圖片的 URL 轉換為指定寬度的縮圖 URL
+ * 非上傳圖片（外部 URL、其他靜態檔案）直接返回 getImageUrl 的結果
+ */
+export function getImageVariantUrl(url: string | null | undefined, width: number): string {
+  const fullUrl = getImageUrl(url);
+  const index = fullUrl.indexOf(UPLOAD_PATH);
+  if (index === -1 || !fullUrl.endsWith('.webp')) {
+    return fullUrl;
+  }
+  const filename = fullUrl.slice(index + UPLOAD_PATH.length);
+  if (filename.includes('/')) {
+    return fullUrl;
+  }
+  return `${fullUrl.slice(0, index)}${VARIANT_PATH}${width}/${filename}`;
+}
+
+/**
+ * 產生 <img srcSet>，讓瀏覽器依顯示寬度與裝置像素比選擇縮圖
+ * 非上傳圖片返回 undefined（不設定 srcSet）
+ */
+export function getImageSrcSet(url: string | null | undefined, widths: number[]): string | undefined {
+  if (getImageVariantUrl(url, widths[0]) === getImageUrl(url)) {
+    return undefined;
+  }
+  return widths.map((width) => `${getImageVariantUrl(url, width)} ${width}w`).join(', ');
+}